@@ -0,0 +1,61 @@
+'''Precision benchmark of the compact mode.
+
+Runs the same simulation with float64 populations on a platform integer landscape and
+with float32 populations on a compact (uint8/int8) landscape. Reports the time per step
+of the 'inplace' and 'vectorized' engines and the drift of the float32 averages from
+the float64 ones at several times.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_precision --size 1000 --duration 500
+'''
+from argparse import ArgumentParser
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Simulation import Simulation
+from benchmarks.bench_shared_memory import make_landscape, time_steps
+
+
+def main():
+    par = ArgumentParser()
+    par.add_argument("--size", type=int, default=1000, help="Width and height of the landscape")
+    par.add_argument("--land-fraction", type=float, default=0.8, help="Fraction of land squares")
+    par.add_argument("--steps", type=int, default=20, help="Number of timed steps")
+    par.add_argument("--duration", type=float, default=500, help="Simulated time of the drift comparison")
+    par.add_argument("--delta-t", type=float, default=0.5, help="Time step size")
+    par.add_argument("--reports", type=int, default=5, help="Number of times at which the drift is reported")
+    args = par.parse_args()
+
+    modes = {"float64": (make_landscape(args.size, args.land_fraction), float),
+             "float32": (make_landscape(args.size, args.land_fraction, compact=True), np.float32)}
+
+    def simulation(mode, engine):
+        landscape, dtype = modes[mode]
+        return Simulation(Mice(1, 0.2, 0.1, 0.05, landscape, dtype), Fox(1, 0.2, 0.03, 0.09, landscape, dtype),
+                          landscape, args.delta_t, engine=engine)
+
+    print("Landscape {0}x{0}, {1:.0%} land, {2} steps".format(args.size, args.land_fraction, args.steps))
+    print("{:>11} {:>14} {:>14} {:>9}".format("engine", "float64 s/step", "float32 s/step", "speed-up"))
+    for engine in ("inplace", "vectorized"):
+        wide = time_steps(simulation("float64", engine), args.steps)
+        narrow = time_steps(simulation("float32", engine), args.steps)
+        print("{:>11} {:>14.6f} {:>14.6f} {:>9.2f}".format(engine, wide, narrow, wide / narrow))
+
+    # Drift of the float32 averages, relative to the float64 ones
+    steps = int(args.duration / args.delta_t)
+    reports = set(np.linspace(0, steps, args.reports + 1).round().astype(int))
+    wide, narrow = simulation("float64", "inplace"), simulation("float32", "inplace")
+    print()
+    print("{:>8} {:>10} {:>16} {:>16}".format("time", "timestep", "mice rel. drift", "fox rel. drift"))
+    for i in range(steps + 1):
+        if i in reports:
+            drift = [abs(n - w) / abs(w) if w else abs(n) for n, w in
+                     ((narrow.get_mice_avg, wide.get_mice_avg), (narrow.get_fox_avg, wide.get_fox_avg))]
+            print("{:>8.1f} {:>10} {:>16.2e} {:>16.2e}".format(i * args.delta_t, i, *drift))
+        if i < steps:
+            wide.run()
+            narrow.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+'''Scaling benchmark of the shared memory engine.
+
+Times the 'shared' engine on a synthetic landscape for an increasing number of worker
+processes and reports the time per step, the speed-up and the parallel efficiency
+against one worker, alongside the serial 'inplace' engine.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_shared_memory --size 2000 --steps 20
+'''
+from argparse import ArgumentParser
+import contextlib
+import os
+import tempfile
+import time
+import numpy as np
+from predator_prey.Landscape import Landscape
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Simulation import Simulation
+from predator_prey.Parallel import SharedMemorySimulation
+
+
+def write_landscape(filename, size, land_fraction, seed=1):
+    """
+    Writes a random square text landscape file.
+    """
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((size, size)) < land_fraction).astype(int)
+    with open(filename, "w") as f:
+        f.write("{} {}\n".format(size, size))
+        for row in grid:
+            f.write(" ".join(map(str, row)) + "\n")
+
+
+def load_landscape(filename, compact=False):
+    """
+    Loads a landscape file without printing its neighbour counts.
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return Landscape(filename, compact=compact)
+
+
+def make_landscape(size, land_fraction, seed=1, compact=False):
+    """
+    Writes a random square landscape to a temporary file and loads it.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as f:
+        pass
+    try:
+        write_landscape(f.name, size, land_fraction, seed)
+        return load_landscape(f.name, compact)
+    finally:
+        os.remove(f.name)
+
+
+def time_steps(simulation, steps):
+    """
+    Returns the wall time per step of 'steps' steps, after one warm-up step.
+    """
+    simulation.run()
+    start = time.perf_counter()
+    for _ in range(steps):
+        simulation.run()
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    par = ArgumentParser()
+    par.add_argument("--size", type=int, default=2000, help="Width and height of the landscape")
+    par.add_argument("--land-fraction", type=float, default=0.8, help="Fraction of land squares")
+    par.add_argument("--steps", type=int, default=20, help="Number of timed steps")
+    par.add_argument("--workers", type=str, default="1,2,4,8,16", help="Comma separated worker counts")
+    args = par.parse_args()
+
+    landscape = make_landscape(args.size, args.land_fraction)
+
+    def animals():
+        return (Mice(1, 0.2, 0.1, 0.05, landscape), Fox(1, 0.2, 0.03, 0.09, landscape))
+
+    serial = time_steps(Simulation(*animals(), landscape, 0.5, engine="inplace"), args.steps)
+    print("Landscape {0}x{0}, {1:.0%} land, {2} steps".format(args.size, args.land_fraction, args.steps))
+    print("{:>8} {:>14} {:>9} {:>11}".format("workers", "s/step", "speed-up", "efficiency"))
+    print("{:>8} {:>14.6f} {:>9} {:>11}".format("inplace", serial, "-", "-"))
+    base = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        with SharedMemorySimulation(*animals(), landscape, 0.5, workers=workers) as simulation:
+            per_step = time_steps(simulation, args.steps)
+        base = base or per_step
+        print("{:>8} {:>14.6f} {:>9.2f} {:>11.0%}".format(workers, per_step, base / per_step, base / per_step / workers))
+
+
+if __name__ == "__main__":
+    main()
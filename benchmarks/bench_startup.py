@@ -0,0 +1,66 @@
+'''Startup benchmark of the population initialisation.
+
+Times the creation of the initial mice population with the former per-square loop over
+the 'random' module, with the vectorized legacy initialisation that reproduces its
+values and with the default numpy Generator initialisation. Checks that the legacy
+initialisation gives the same values as the loop.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_startup --size 2000
+'''
+from argparse import ArgumentParser
+import random
+import time
+import numpy as np
+from predator_prey.Animal import Mice
+from benchmarks.bench_shared_memory import make_landscape
+
+
+def loop_population(seed, landscape):
+    """
+    The initialisation of versions before the vectorized one, one square at a time.
+    """
+    random.seed(seed)
+    population = landscape.landscape.astype(float).copy()
+    for x in range(1, landscape.landscape.shape[0] - 1):
+        for y in range(1, landscape.landscape.shape[1] - 1):
+            if seed == 0:
+                population[x, y] = 0
+            elif landscape.landscape[x, y]:
+                population[x, y] = random.uniform(0, 5.0)
+            else:
+                population[x, y] = 0
+    return population
+
+
+def timed(function):
+    """
+    Returns the result of function() and the time it took in seconds.
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    par = ArgumentParser()
+    par.add_argument("--size", type=int, default=2000, help="Width and height of the landscape")
+    par.add_argument("--land-fraction", type=float, default=0.8, help="Fraction of land squares")
+    par.add_argument("--seed", type=int, default=1, help="Seed of the population")
+    args = par.parse_args()
+
+    landscape = make_landscape(args.size, args.land_fraction)
+    loop, loop_time = timed(lambda: loop_population(args.seed, landscape))
+    legacy, legacy_time = timed(lambda: Mice(args.seed, 0.2, 0.1, 0.05, landscape, legacy_init=True).population)
+    _, generator_time = timed(lambda: Mice(args.seed, 0.2, 0.1, 0.05, landscape).population)
+
+    print("Landscape {0}x{0}, {1:.0%} land".format(args.size, args.land_fraction))
+    print("{:>10} {:>10} {:>9}".format("init", "seconds", "speed-up"))
+    for name, seconds in (("loop", loop_time), ("legacy", legacy_time), ("generator", generator_time)):
+        print("{:>10} {:>10.4f} {:>9.1f}".format(name, seconds, loop_time / seconds))
+    print("Legacy values identical to the loop: {}".format(np.array_equal(loop, legacy)))
+
+
+if __name__ == "__main__":
+    main()
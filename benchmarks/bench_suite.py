@@ -0,0 +1,204 @@
+'''Benchmark suite across grid sizes, land fractions and engines.
+
+For every combination of size and land fraction a synthetic landscape is generated and
+the following phases are timed:
+
+    load         loading the text landscape file with Landscape
+    init         creating the initial mice and fox populations
+    step/ENGINE  one Simulation.run() step of each engine
+    map          writing one population map with write_population_map
+    csv          writing the averages of 'rows' output intervals with TimeSeriesRecorder
+
+Each phase is reported with its time, its throughput (squares per second, rows per
+second for 'csv') and its peak memory. The time is the best of 'repeat' runs. The peak
+memory is measured with tracemalloc, which numpy reports its arrays to, in a separate
+run so that tracing does not slow down the timed runs.
+
+The results can be saved as JSON with --output and compared against a baseline saved
+the same way with --baseline. A phase that is slower, or uses more memory, than its
+baseline by more than --tolerance is reported as a regression, and the exit status is 1.
+Baselines are only meaningful on the machine they were recorded on.
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.bench_suite --output baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json --output results.json
+'''
+from argparse import ArgumentParser
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Runner import create_simulation
+from predator_prey.Helpers import SimulationHelpers
+from predator_prey.Recorder import TimeSeriesRecorder
+from benchmarks.bench_shared_memory import write_landscape, load_landscape
+
+# Version of the layout of the JSON results
+RESULTS_VERSION = 1
+
+
+def measure(function, repeat):
+    """
+    Runs function() 'repeat' times for the timing and once more under tracemalloc.
+
+    Returns:
+        tuple: The best time in seconds and the peak traced memory in bytes.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def benchmark_case(size, land_fraction, engines, args, directory):
+    """
+    Times every phase on one synthetic landscape.
+
+    Returns:
+        list: A result dict for each phase.
+    """
+    squares = size * size
+    filename = os.path.join(directory, "landscape.dat")
+    write_landscape(filename, size, land_fraction)
+    results = []
+
+    def add(phase, seconds, peak, work=squares, unit="squares"):
+        results.append({"phase": phase, "size": size, "land_fraction": land_fraction,
+                        "seconds": seconds, "{}_per_second".format(unit): work / seconds, "peak_bytes": peak})
+
+    add("load", *measure(lambda: load_landscape(filename), args.repeat))
+    landscape = load_landscape(filename)
+
+    def make_animals():
+        return Mice(1, 0.2, 0.1, 0.05, landscape), Fox(1, 0.2, 0.03, 0.09, landscape)
+
+    add("init", *measure(make_animals, args.repeat))
+
+    for engine in engines:
+        simulation = create_simulation(*make_animals(), landscape, 0.5, engine, args.workers)
+        try:
+            simulation.run()  # Warm-up
+            seconds, peak = measure(lambda: [simulation.run() for _ in range(args.steps)], args.repeat)
+            add("step/" + engine, seconds / args.steps, peak)
+        finally:
+            if hasattr(simulation, "close"):
+                simulation.close()
+
+    helper = SimulationHelpers()
+    simulation = create_simulation(*make_animals(), landscape, 0.5, "vectorized", args.workers)
+    mice, fox = simulation.current_mice_pop, simulation.current_fox_pop
+    mice_max, fox_max = simulation.get_mice_max, simulation.get_fox_max
+    add("map", *measure(lambda: helper.write_population_map(0, mice, fox, mice_max, fox_max, landscape.landscape,
+                                                           directory, args.ppm_format), args.repeat))
+
+    def write_csv():
+        with TimeSeriesRecorder(os.path.join(directory, "averages.csv")) as recorder:
+            for row in range(args.rows):
+                recorder.record(row, row * 0.5, 1.0 / (row + 1), 2.0 / (row + 1))
+    add("csv", *measure(write_csv, args.repeat), work=args.rows, unit="rows")
+    return results
+
+
+def result_key(result):
+    """
+    Returns the key identifying a result across runs.
+    """
+    return "{}[{}x{},{:g}]".format(result["phase"], result["size"], result["size"], result["land_fraction"])
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (list): The result dicts of this run.
+        baseline (list): The result dicts of the baseline run.
+        tolerance (float): Relative slowdown or memory growth allowed before a regression.
+
+    Returns:
+        list: A (key, time ratio, memory ratio, regressed) tuple for every result in the baseline.
+    """
+    reference = {result_key(result): result for result in baseline}
+    comparison = []
+    for result in results:
+        key = result_key(result)
+        if key not in reference:
+            continue
+        time_ratio = result["seconds"] / reference[key]["seconds"]
+        memory_ratio = (result["peak_bytes"] + 1) / (reference[key]["peak_bytes"] + 1)
+        comparison.append((key, time_ratio, memory_ratio, time_ratio > 1 + tolerance or memory_ratio > 1 + tolerance))
+    return comparison
+
+
+def main():
+    par = ArgumentParser()
+    par.add_argument("--sizes", type=str, default="100,500,1000,2000,4000", help="Comma separated widths and heights")
+    par.add_argument("--land-fractions", type=str, default="0.1,0.5,1.0", help="Comma separated fractions of land squares")
+    par.add_argument("--engines", type=str, default="vectorized,inplace,sparse", help="Comma separated engines to time")
+    par.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of workers of the parallel engines")
+    par.add_argument("--steps", type=int, default=5, help="Number of steps per timed run")
+    par.add_argument("--repeat", type=int, default=3, help="Number of timed runs of each phase, the best is reported")
+    par.add_argument("--rows", type=int, default=10000, help="Number of averages rows written by the csv phase")
+    par.add_argument("--ppm-format", type=str, default="P3", help="Format of the population maps")
+    par.add_argument("--output", type=str, help="JSON file the results are saved to")
+    par.add_argument("--baseline", type=str, help="JSON results to compare against")
+    par.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown or memory growth reported as a regression")
+    args = par.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    fractions = [float(fraction) for fraction in args.land_fractions.split(",")]
+    engines = args.engines.split(",")
+
+    results = []
+    directory = tempfile.mkdtemp()
+    try:
+        print("{:<34} {:>12} {:>16} {:>12}".format("phase", "seconds", "per second", "peak MiB"))
+        for size in sizes:
+            for fraction in fractions:
+                for result in benchmark_case(size, fraction, engines, args, directory):
+                    results.append(result)
+                    rate = result.get("squares_per_second", result.get("rows_per_second"))
+                    print("{:<34} {:>12.6f} {:>16.4g} {:>12.1f}".format(result_key(result), result["seconds"], rate,
+                                                                        result["peak_bytes"] / 2**20))
+    finally:
+        shutil.rmtree(directory)
+
+    if args.output:
+        metadata = {"version": RESULTS_VERSION, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                    "cpus": os.cpu_count(), "steps": args.steps, "repeat": args.repeat, "rows": args.rows}
+        with open(args.output, "w") as f:
+            json.dump({"metadata": metadata, "results": results}, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        comparison = compare(results, baseline, args.tolerance)
+        print()
+        print("{:<34} {:>10} {:>10}".format("phase", "time", "memory"))
+        for key, time_ratio, memory_ratio, regressed in comparison:
+            print("{:<34} {:>10.2f} {:>10.2f}{}".format(key, time_ratio, memory_ratio, "  REGRESSION" if regressed else ""))
+        regressions = sum(regressed for *_, regressed in comparison)
+        print("{} of {} phases regressed beyond {:.0%}".format(regressions, len(comparison), args.tolerance))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
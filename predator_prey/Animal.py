@@ -7,7 +7,7 @@ class AnimalModel(object):
     Main class for the animal model simulation.
     This class simulates the population distribution of a particular animal type over time in a landscape.
     """
-    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape, animal_type):
+    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape, animal_type, dtype=float, legacy_init=False):
         """
         Initializes the animal model with given parameters.
 
@@ -18,13 +18,21 @@ class AnimalModel(object):
         death_rate (float): Rate at which animals die.
         landscape (Landscape): The landscape where the animals live.
         animal_type (str): The type of animals being simulated.
+        dtype (type): The floating point type of the population, float (float64) or np.float32.
+        legacy_init (bool): Whether the initial population reproduces the values drawn with the
+                            'random' module by earlier versions, rather than with a numpy Generator.
         """
         self.seed = seed
+        self.legacy_init = legacy_init
         self.diffusion_rate = self.validate_rate(diffusion_rate)  # Validate the input rates
         self.birth_rate = self.validate_rate(birth_rate)
         self.death_rate = self.validate_rate(death_rate)
         self.landscape = landscape
-        self.population = self.initialize_population()  # Initialize the population distribution
+        self.dtype = np.dtype(dtype)
+        if self.dtype.kind != "f":
+            raise ValueError("The population type must be a floating point type.")
+        # Initialize the population distribution, drawn in double precision for every type
+        self.population = self.initialize_population().astype(self.dtype, copy=False)
         self.animal_type = animal_type
 
     def validate_rate(self, rate):
@@ -45,27 +53,36 @@ class AnimalModel(object):
         else:
             raise ValueError("Rate must be between 0 and 1.")
 
-    def calculate_max(self):
+    def calculate_max(self, population=None):
         """
         Calculate the maximum population across the landscape.
 
+        Parameters:
+        population (np.array): Population to use instead of the initial population, optional.
+
         Returns:
         float: Maximum population.
         """
-        return np.max(self.population)
+        if population is None:
+            population = self.population
+        return np.max(population)
 
-    def calculate_average(self, nlands):
+    def calculate_average(self, nlands, population=None):
         """
         Calculate the average population across the landscape.
 
         Parameters:
         nlands (int): The number of lands.
+        population (np.array): Population to use instead of the initial population, optional.
 
         Returns:
         float: Average population.
         """
+        if population is None:
+            population = self.population
         if nlands != 0:
-            average = np.sum(self.population)/nlands
+            # Accumulated in double precision, also for float32 populations
+            average = np.sum(population, dtype=float)/nlands
         else:
             average=0
         return average
@@ -92,33 +109,46 @@ class AnimalModel(object):
         """
         Initializes the population distribution based on the given seed.
 
+        Every land square is set to a random value between 0 and 5.0, drawn in row-major
+        order from a numpy Generator seeded with the seed of this instance only, so models
+        can be created concurrently. With legacy_init the values are drawn from a
+        RandomState holding the state of random.seed(seed), and are the same as those
+        of random.uniform(0, 5.0) in a loop over the land squares. Like random.seed, both
+        use the absolute value of a negative seed.
+
         Returns:
         np.array: Initial population distribution.
         """
-        random.seed(self.seed)
-        population = self.landscape.landscape.astype(float).copy()
-        for x in range(1, self.landscape.landscape.shape[0] - 1):
-            for y in range(1, self.landscape.landscape.shape[1] - 1):
-                if self.seed == 0:
-                    population[x, y] = 0  # No population if seed is zero
-                else:
-                    if self.landscape.landscape[x, y]:
-                        population[x, y] = random.uniform(0, 5.0)  # Random population between 0 and 5.0 if landscape exists
-                    else:
-                        population[x, y] = 0  # No population if no landscape
+        population = self.landscape.landscape.astype(float)
+        interior = population[1:-1, 1:-1]
+        land = interior != 0
+        if self.seed == 0:
+            interior[...] = 0  # No population if seed is zero
+            return population
+        if self.legacy_init:
+            # The Mersenne Twister state of random.seed(seed), without touching the global generator
+            state = random.Random(self.seed).getstate()[1]
+            generator = np.random.RandomState()
+            generator.set_state(("MT19937", np.array(state[:-1], np.uint32), state[-1]))
+            values = 5.0 * generator.random_sample(np.count_nonzero(land))
+        else:
+            # Generators only accept non-negative seeds, mapped like random.seed does
+            values = np.random.default_rng(abs(self.seed)).uniform(0, 5.0, np.count_nonzero(land))
+        interior[...] = 0  # No population if no landscape
+        interior[land] = values
         return population
     
     
     
 class Mice(AnimalModel):
-    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape):
-        super().__init__(seed, diffusion_rate, birth_rate, death_rate, landscape, 'Mice')
+    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape, dtype=float, legacy_init=False):
+        super().__init__(seed, diffusion_rate, birth_rate, death_rate, landscape, 'Mice', dtype, legacy_init)
         # The animal_type is specified directly in the super() call.
 
 
 class Fox(AnimalModel):
-    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape):
-        super().__init__(seed, diffusion_rate, birth_rate, death_rate, landscape, 'Fox')
+    def __init__(self, seed, diffusion_rate, birth_rate, death_rate, landscape, dtype=float, legacy_init=False):
+        super().__init__(seed, diffusion_rate, birth_rate, death_rate, landscape, 'Fox', dtype, legacy_init)
         # The animal_type is specified directly in the super() call.
 
     
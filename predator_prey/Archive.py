@@ -0,0 +1,406 @@
+import json
+import os
+import zlib
+import numpy as np
+from .Helpers import SimulationHelpers
+from .Profiler import Profiler
+
+# Default name of the frame archive, relative to the output directory
+ARCHIVE_FILE = "maps.ppa"
+
+# Contents of the frames: the 8-bit colour codes of the maps or the raw populations
+ARCHIVE_MODES = ("colours", "raw")
+
+# First bytes of every archive, followed by the length of the JSON header
+ARCHIVE_MAGIC = b"PPFRAME1"
+# First bytes of every chunk and of the index
+CHUNK_MAGIC = b"CHNK"
+INDEX_MAGIC = b"INDX"
+# Last bytes of a closed archive, preceded by the offset of the index
+END_MAGIC = b"PPFREND1"
+
+
+def encode_chunk(frames, level):
+    """
+    Delta encodes and compresses a chunk of frames.
+
+    Every frame after the first is replaced by its difference from the previous frame, taken
+    on the bits of the values as unsigned integers (wrapping around, so the encoding is
+    lossless), so squares that changed little are stored as small values. The bytes of the
+    values are then grouped by significance (all first bytes, then all second bytes...),
+    which lets zlib compress the slowly changing exponents of floating point populations.
+
+    Parameters:
+    frames (ndarray): The frames, of shape (frames, 2, height, width).
+    level (int): The zlib compression level.
+
+    Returns:
+    bytes: The compressed chunk.
+    """
+    bits = frames.view("u{}".format(frames.dtype.itemsize))
+    deltas = bits.copy()
+    deltas[1:] -= bits[:-1]
+    shuffled = deltas.view(np.uint8).reshape(-1, frames.dtype.itemsize).T
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), level)
+
+
+def decode_chunk(payload, count, shape, dtype):
+    """
+    Decompresses and decodes a chunk written by encode_chunk.
+
+    Parameters:
+    payload (bytes): The compressed chunk.
+    count (int): The number of frames of the chunk.
+    shape (tuple): The height and width of the frames.
+    dtype (np.dtype): The type of the values.
+
+    Returns:
+    ndarray: The frames, of shape (count, 2, height, width).
+    """
+    shuffled = np.frombuffer(zlib.decompress(payload), np.uint8).reshape(dtype.itemsize, -1)
+    deltas = np.ascontiguousarray(shuffled.T).view("u{}".format(dtype.itemsize)).reshape((count, 2) + tuple(shape))
+    return np.add.accumulate(deltas, axis=0, dtype=deltas.dtype).view(dtype)
+
+
+def read_archive_header(f):
+    """
+    Reads the header and the land squares of an archive, leaving the file at its first chunk.
+
+    Parameters:
+    f (file): The archive, opened in binary mode at its start.
+
+    Returns:
+    tuple: The header dict and the boolean land squares, without halo.
+
+    Raises:
+    ValueError: If the file is not a frame archive.
+    """
+    if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+        raise ValueError("{} is not a frame archive.".format(f.name))
+    length = int(np.frombuffer(f.read(8), np.uint64)[0])
+    header = json.loads(f.read(length).decode("utf-8"))
+    length = int(np.frombuffer(f.read(8), np.uint64)[0])
+    height, width = header["shape"]
+    land = np.unpackbits(np.frombuffer(zlib.decompress(f.read(length)), np.uint8), count=height * width)
+    return header, land.reshape(height, width).astype(bool)
+
+
+def scan_chunks(f):
+    """
+    Reads the chunk headers of an archive from the current position, skipping the payloads.
+    Stops at the index, at the end of the file, or at a chunk cut short by an interrupted write.
+
+    Parameters:
+    f (file): The archive, positioned at its first chunk.
+
+    Returns:
+    list: An (offset, timesteps, payload offset, payload length) tuple per complete chunk.
+    """
+    size = os.fstat(f.fileno()).st_size
+    chunks = []
+    while True:
+        offset = f.tell()
+        head = f.read(20)
+        if len(head) < 20 or head[:4] != CHUNK_MAGIC:
+            break
+        count = int(np.frombuffer(head[4:12], np.uint64)[0])
+        length = int(np.frombuffer(head[12:20], np.uint64)[0])
+        timesteps = np.frombuffer(f.read(8 * count), np.int64)
+        if len(timesteps) < count or f.tell() + length > size:
+            break
+        chunks.append((offset, timesteps, f.tell(), length))
+        f.seek(length, os.SEEK_CUR)
+    f.seek(chunks[-1][2] + chunks[-1][3] if chunks else offset)
+    return chunks
+
+
+class FrameArchiveWriter(object):
+    """
+    Appends the population maps of a run to one chunked, compressed frame archive.
+
+    Writing one PPM file per output interval creates a file per interval, which strains
+    file systems on long runs with short intervals. The archive instead buffers the frames
+    of 'chunk_frames' intervals, delta encodes them against the previous frame and writes
+    them as one zlib-compressed chunk. Each frame holds either the 8-bit colour codes of
+    the map ("colours", 2 bytes per square) or the raw populations ("raw", lossless).
+
+    The archive starts with a JSON header and the land squares, and ends with an index of
+    the chunk and position of every timestep, written by close(). Reading a frame
+    decompresses only its chunk. An archive left without index by an interrupted run is
+    still readable, its chunks are then scanned.
+    """
+
+    def __init__(self, filename, lscape, mode="colours", dtype=float, chunk_frames=64, level=6, resume_step=None,
+                 helper=None):
+        """
+        Creates the archive, truncating any existing one, and writes its header.
+
+        Parameters:
+        filename (str): The archive file.
+        lscape (ndarray): The padded landscape.
+        mode (str): "colours" or "raw".
+        dtype (type): The floating point type of the populations, for "raw" frames.
+        chunk_frames (int): Number of frames per chunk.
+        level (int): The zlib compression level, from 0 to 9.
+        resume_step (int): If given, the existing archive is kept and appended to, after
+                           removing its frames for this timestep and later ones.
+        helper (SimulationHelpers): The helper calculating the colour codes, whose profiler
+                                    times the archive phases.
+        """
+        if mode not in ARCHIVE_MODES:
+            raise ValueError("Archive mode must be one of {}.".format(", ".join(ARCHIVE_MODES)))
+        if chunk_frames < 1:
+            raise ValueError("Chunk frames must be at least 1.")
+        self.filename = filename
+        self.lscape = lscape
+        self.mode = mode
+        self.dtype = np.dtype(np.uint8 if mode == "colours" else dtype)
+        self.level = level
+        self.helper = helper if helper is not None else SimulationHelpers()
+        self.shape = (lscape.shape[0] - 2, lscape.shape[1] - 2)
+        self.frames = np.zeros((chunk_frames, 2) + self.shape, self.dtype)
+        self.timesteps = []
+        # Timestep, chunk offset and position in the chunk of every frame written
+        self.index = []
+        self.bytes_written = 0
+
+        header = json.dumps({"mode": mode, "shape": list(self.shape), "dtype": self.dtype.str,
+                             "chunk frames": chunk_frames}, sort_keys=True).encode("utf-8")
+        land = zlib.compress(np.packbits(lscape[1:-1, 1:-1] != 0).tobytes(), level)
+        preamble = ARCHIVE_MAGIC + np.uint64(len(header)).tobytes() + header + np.uint64(len(land)).tobytes() + land
+
+        if resume_step is not None and os.path.isfile(filename):
+            self.file = self.reopen(preamble, resume_step)
+        else:
+            self.file = open(filename, "wb")
+            self.file.write(preamble)
+        self.file.flush()
+
+    def reopen(self, preamble, resume_step):
+        """
+        Opens the existing archive for appending, after removing its frames for 'resume_step'
+        and later timesteps. Earlier frames of the chunk holding 'resume_step' are buffered
+        again, to be written with the next chunk.
+
+        Parameters:
+        preamble (bytes): The header and land squares this writer would write.
+        resume_step (int): The first timestep to be archived again.
+
+        Returns:
+        file: The open file, positioned at the end of the kept chunks.
+
+        Raises:
+        ValueError: If the archive was written with other settings or on another landscape.
+        """
+        f = open(self.filename, "r+b")
+        try:
+            if f.read(len(preamble)) != preamble:
+                raise ValueError("{} was written with other settings or on another landscape.".format(self.filename))
+            for offset, timesteps, payload_offset, length in scan_chunks(f):
+                if timesteps[-1] < resume_step:
+                    self.index.extend((int(timestep), offset, position) for position, timestep in enumerate(timesteps))
+                    continue
+                kept = timesteps[timesteps < resume_step]
+                if len(kept):
+                    f.seek(payload_offset)
+                    frames = decode_chunk(f.read(length), len(timesteps), self.shape, self.dtype)
+                    self.frames[:len(kept)] = frames[:len(kept)]
+                    self.timesteps = [int(timestep) for timestep in kept]
+                f.seek(offset)
+                break
+            f.truncate()
+        except Exception:
+            f.close()
+            raise
+        return f
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, i, mice, fox, mm, mf):
+        """
+        Appends the map of one output interval, writing a chunk when the buffer is full.
+
+        Parameters:
+        i (int): The timestep.
+        mice, fox (ndarray): The padded populations.
+        mm, mf (float): The maximum populations, used to scale the colour codes.
+        """
+        frame = self.frames[len(self.timesteps)]
+        with self.helper.profiler.phase("archive frame"):
+            if self.mode == "colours":
+                mcols, fcols = self.helper.calculate_color_codes(mice, fox, mm, mf, self.lscape)
+                np.clip(mcols, 0, 255, out=frame[0], casting="unsafe")
+                np.clip(fcols, 0, 255, out=frame[1], casting="unsafe")
+            else:
+                frame[0] = mice[1:-1, 1:-1]
+                frame[1] = fox[1:-1, 1:-1]
+        self.timesteps.append(i)
+        if len(self.timesteps) == len(self.frames):
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered frames as a chunk.
+        """
+        count = len(self.timesteps)
+        if not count:
+            return
+        with self.helper.profiler.phase("archive write"):
+            payload = encode_chunk(self.frames[:count], self.level)
+            offset = self.file.tell()
+            data = (CHUNK_MAGIC + np.uint64(count).tobytes() + np.uint64(len(payload)).tobytes()
+                    + np.array(self.timesteps, np.int64).tobytes() + payload)
+            self.file.write(data)
+            self.file.flush()
+        self.index.extend((timestep, offset, position) for position, timestep in enumerate(self.timesteps))
+        self.timesteps = []
+        self.bytes_written += len(data)
+        self.helper.profiler.count("archive bytes", len(data))
+
+    def close(self):
+        """
+        Writes the buffered frames and the index, and closes the archive.
+        """
+        if self.file.closed:
+            return
+        try:
+            self.flush()
+            offset = self.file.tell()
+            timesteps, offsets, positions = (np.array(column, np.int64).reshape(-1) for column in zip(*self.index)) \
+                if self.index else (np.zeros(0, np.int64),) * 3
+            self.file.write(INDEX_MAGIC + np.uint64(len(timesteps)).tobytes() + timesteps.tobytes()
+                            + offsets.tobytes() + positions.tobytes() + np.uint64(offset).tobytes() + END_MAGIC)
+        finally:
+            self.file.close()
+
+
+class FrameArchive(object):
+    """
+    Reads the frames of an archive written by FrameArchiveWriter, in any order.
+
+    The index of a closed archive is read when it is opened; the chunks of an archive
+    without index are scanned instead. The last chunk read is kept decoded, so reading
+    the frames in order decompresses every chunk once.
+    """
+
+    def __init__(self, filename):
+        """
+        Opens an archive and reads its header and index.
+
+        Parameters:
+        filename (str): The archive file.
+
+        Raises:
+        ValueError: If the file is not a frame archive.
+        """
+        self.file = open(filename, "rb")
+        try:
+            self.header, self.land = read_archive_header(self.file)
+            self.mode = self.header["mode"]
+            self.shape = tuple(self.header["shape"])
+            self.dtype = np.dtype(self.header["dtype"])
+            self.timesteps, self.offsets, self.positions = self.read_index()
+        except Exception:
+            self.file.close()
+            raise
+        order = np.argsort(self.timesteps, kind="stable")
+        self.timesteps, self.offsets, self.positions = self.timesteps[order], self.offsets[order], self.positions[order]
+        self.cached = (None, None)
+        # The padded landscape, for rendering
+        self.lscape = np.zeros((self.shape[0] + 2, self.shape[1] + 2), int)
+        self.lscape[1:-1, 1:-1] = self.land
+
+    def read_index(self):
+        """
+        Reads the index at the end of the archive, or rebuilds it from the chunks.
+
+        Returns:
+        tuple: The timesteps, chunk offsets and positions in their chunk of the frames.
+        """
+        start = self.file.tell()
+        size = os.fstat(self.file.fileno()).st_size
+        if size >= start + 16:
+            self.file.seek(size - 16)
+            trailer = self.file.read(16)
+            if trailer[8:] == END_MAGIC:
+                self.file.seek(int(np.frombuffer(trailer[:8], np.uint64)[0]))
+                if self.file.read(4) == INDEX_MAGIC:
+                    count = int(np.frombuffer(self.file.read(8), np.uint64)[0])
+                    columns = np.frombuffer(self.file.read(24 * count), np.int64).reshape(3, count)
+                    return columns[0], columns[1], columns[2]
+        self.file.seek(start)
+        rows = [(timestep, offset, position) for offset, timesteps, _, _ in scan_chunks(self.file)
+                for position, timestep in enumerate(timesteps)]
+        columns = np.array(rows, np.int64).reshape(-1, 3).T
+        return columns[0], columns[1], columns[2]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of frames.
+        """
+        return len(self.timesteps)
+
+    def close(self):
+        """
+        Closes the archive file.
+        """
+        self.file.close()
+
+    def read(self, timestep):
+        """
+        Reads the frame of a timestep.
+
+        Parameters:
+        timestep (int): The timestep of the frame.
+
+        Returns:
+        tuple: The mice and fox frames, without halo: colour codes (uint8) or populations.
+
+        Raises:
+        KeyError: If the archive holds no frame for the timestep.
+        """
+        index = np.searchsorted(self.timesteps, timestep)
+        if index == len(self.timesteps) or self.timesteps[index] != timestep:
+            raise KeyError("No frame for timestep {} in the archive.".format(timestep))
+        offset = int(self.offsets[index])
+        if self.cached[0] != offset:
+            self.file.seek(offset)
+            head = self.file.read(20)
+            count = int(np.frombuffer(head[4:12], np.uint64)[0])
+            length = int(np.frombuffer(head[12:20], np.uint64)[0])
+            self.file.seek(8 * count, os.SEEK_CUR)
+            self.cached = (offset, decode_chunk(self.file.read(length), count, self.shape, self.dtype))
+        frame = self.cached[1][self.positions[index]]
+        return frame[0], frame[1]
+
+    def render(self, timestep, filename, ppm_format="P3", helper=None):
+        """
+        Writes the map of a timestep as a PPM file, identical to the one write_population_map
+        writes for the same interval.
+
+        Parameters:
+        timestep (int): The timestep of the frame.
+        filename (str): The PPM file.
+        ppm_format (str): "P3" or "P6".
+        helper (SimulationHelpers): The helper formatting the map.
+        """
+        helper = helper if helper is not None else SimulationHelpers(Profiler(enabled=False))
+        mice, fox = self.read(timestep)
+        if self.mode == "colours":
+            mcols, fcols = mice.astype(int), fox.astype(int)
+        else:
+            padded = np.zeros((2,) + self.lscape.shape, self.dtype)
+            padded[0, 1:-1, 1:-1] = mice
+            padded[1, 1:-1, 1:-1] = fox
+            mcols, fcols = helper.calculate_color_codes(padded[0], padded[1], np.max(mice), np.max(fox), self.lscape)
+        helper.write_ppm(filename, helper.calculate_pixels(mcols, fcols, self.lscape), ppm_format)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# First bytes of every checkpoint file, followed by the length of the JSON header
+CHECKPOINT_MAGIC = b"PPCHKPT1"
+
+# Arrays are aligned to this many bytes so that they can be memory mapped efficiently
+ALIGNMENT = 64
+
+# Names of the population buffers saved in a checkpoint
+CHECKPOINT_ARRAYS = ("current_mice_pop", "current_fox_pop", "next_mice_pop", "next_fox_pop")
+
+
+def align(offset):
+    """
+    Rounds an offset up to the next multiple of ALIGNMENT.
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def landscape_digest(landscape):
+    """
+    Calculates the SHA-256 digest of a landscape, used to check that a checkpoint is
+    resumed on the landscape it was saved from.
+
+    Parameters:
+    landscape (Landscape): The landscape.
+
+    Returns:
+    str: The hexadecimal digest of the shape and land squares of the padded landscape.
+    """
+    land = np.ascontiguousarray(landscape.landscape != 0)
+    digest = hashlib.sha256("{}x{}".format(*land.shape).encode("ascii"))
+    digest.update(land.tobytes())
+    return digest.hexdigest()
+
+
+def save_checkpoint(filename, simulation, step, parameters):
+    """
+    Saves the state of a simulation to a checkpoint file.
+
+    The file holds CHECKPOINT_MAGIC, the length of a JSON header, the header itself and
+    the population buffers as raw aligned arrays, each in its own floating point type. The
+    header holds the step index, the simulation parameters (rates, timestep and seeds), the
+    landscape digest, the next step size of an adaptive integrator and the position and
+    type of every array. The file is first
+    written under a temporary name and then renamed over 'filename', so an interrupted
+    save never damages the previous checkpoint.
+
+    Parameters:
+    filename (str): The checkpoint file.
+    simulation (Simulation): The simulation. Next buffers are saved if it keeps them.
+    step (int): Index of the next timestep to run.
+    parameters (dict): The parameters the simulation was started with.
+    """
+    arrays = {}
+    for name in CHECKPOINT_ARRAYS:
+        array = getattr(simulation, name)
+        if array is not None:
+            # Each array keeps its own floating point type, stored little-endian
+            arrays[name] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+
+    offset = 0
+    layout = {}
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+        offset = align(offset + array.nbytes)
+    header = json.dumps({"step": step, "parameters": parameters, "landscape": landscape_digest(simulation.landscape),
+                         "adaptive step": getattr(simulation, "adaptive_step", None), "arrays": layout}, sort_keys=True).encode("utf-8")
+    start = align(len(CHECKPOINT_MAGIC) + 8 + len(header))
+
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(CHECKPOINT_MAGIC + np.uint64(len(header)).tobytes() + header)
+        for name, array in arrays.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+def load_checkpoint(filename):
+    """
+    Loads a checkpoint file saved by save_checkpoint. The arrays are memory mapped
+    read-only rather than read into memory.
+
+    Parameters:
+    filename (str): The checkpoint file.
+
+    Returns:
+    tuple: The header (a dict with the step, parameters and landscape digest) and a
+           dict of the saved arrays.
+
+    Raises:
+    ValueError: If the file is not a checkpoint.
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+            raise ValueError("{} is not a checkpoint file.".format(filename))
+        length = int(np.frombuffer(f.read(8), np.uint64)[0])
+        header = json.loads(f.read(length).decode("utf-8"))
+    start = align(len(CHECKPOINT_MAGIC) + 8 + length)
+
+    arrays = {}
+    for name, layout in header["arrays"].items():
+        arrays[name] = np.memmap(filename, dtype=layout["dtype"], mode="r",
+                                 offset=start + layout["offset"], shape=tuple(layout["shape"]))
+    return header, arrays
+
+
+def resume_checkpoint(filename, simulation, parameters):
+    """
+    Restores the state of a simulation from a checkpoint.
+
+    Parameters:
+    filename (str): The checkpoint file.
+    simulation (Simulation): The simulation, built with the same parameters and landscape.
+    parameters (dict): The parameters the simulation was started with.
+
+    Returns:
+    int: Index of the next timestep to run.
+
+    Raises:
+    ValueError: If the checkpoint was saved on another landscape or with other parameters.
+    """
+    header, arrays = load_checkpoint(filename)
+    if header["landscape"] != landscape_digest(simulation.landscape):
+        raise ValueError("The checkpoint {} was saved on a different landscape.".format(filename))
+    if header["parameters"] != parameters:
+        changed = sorted(key for key in set(header["parameters"]) | set(parameters)
+                         if header["parameters"].get(key) != parameters.get(key))
+        raise ValueError("The checkpoint {} was saved with different parameters: {}.".format(filename, ", ".join(changed)))
+    simulation.restore(*(arrays.get(name) for name in CHECKPOINT_ARRAYS))
+    if header.get("adaptive step") is not None:
+        simulation.adaptive_step = header["adaptive step"]
+    return header["step"]
@@ -0,0 +1,80 @@
+from collections import deque
+
+# Reasons for which a run stops before its duration
+EXTINCTION = "extinction"
+STEADY_STATE = "steady state"
+STEADY_AVERAGES = "steady averages"
+
+
+class ConvergenceMonitor(object):
+    """
+    Decides at each output interval whether a run has settled and can stop early.
+
+    Any of the enabled criteria stops the run:
+
+    * extinction: the largest population of both species is at most 'extinction'.
+    * steady state: without a 'window', the largest absolute change of any population
+      over the last step, per unit of time, is at most 'tolerance'. It is read from the
+      current and next buffers of the simulation (see Simulation.max_change_rate), so
+      checking it costs one pass over the populations and no extra step.
+    * steady averages: with a 'window' of at least 2, the averages of both species over
+      the last 'window' checks vary by at most 'tolerance' relative to their largest
+      value. This also detects a state that is still changing locally but no longer on
+      average, e.g. small travelling waves.
+    """
+
+    def __init__(self, tolerance=None, window=0, extinction=None):
+        """
+        Parameters:
+        tolerance (float): The steady state tolerance, None to disable the steady state criteria.
+        window (int): The number of checks compared by the steady averages criterion, 0 to use
+                      the steady state criterion on the populations instead. A window needs a tolerance.
+        extinction (float): The population at or below which a species is extinct, None to
+                            disable the extinction criterion.
+        """
+        if tolerance is not None and tolerance < 0:
+            raise ValueError("The convergence tolerance must not be negative.")
+        if window < 0 or window == 1:
+            raise ValueError("The convergence window must be 0 or at least 2.")
+        if window and tolerance is None:
+            raise ValueError("The convergence window requires a convergence tolerance.")
+        if extinction is not None and extinction < 0:
+            raise ValueError("The extinction threshold must not be negative.")
+        self.tolerance = tolerance
+        self.window = window
+        self.extinction = extinction
+        self.averages = deque(maxlen=window) if window else None
+
+    @property
+    def enabled(self):
+        """
+        Gets whether any criterion is enabled.
+        """
+        return self.tolerance is not None or self.extinction is not None
+
+    def check(self, simulation, summary):
+        """
+        Checks the criteria after a step.
+
+        Parameters:
+        simulation (Simulation): The simulation, which must have taken at least one step.
+        summary (dict): The averages and maxima of the current populations, as recorded by sim().
+
+        Returns:
+        str: The reason to stop, one of EXTINCTION, STEADY_STATE and STEADY_AVERAGES, or None
+             to continue.
+        """
+        if self.extinction is not None and max(summary["mice max"], summary["fox max"]) <= self.extinction:
+            return EXTINCTION
+        if self.tolerance is None:
+            return None
+        if self.averages is None:
+            return STEADY_STATE if simulation.max_change_rate() <= self.tolerance else None
+
+        self.averages.append((summary["mice avg"], summary["fox avg"]))
+        if len(self.averages) < self.window:
+            return None
+        for values in zip(*self.averages):
+            if max(values) - min(values) > self.tolerance * max(abs(value) for value in values):
+                return None
+        return STEADY_AVERAGES
@@ -0,0 +1,156 @@
+import numpy as np
+from .Landscape import Landscape
+from .Animal import Mice, Fox
+
+class EnsembleSimulation(object):
+    """
+    Steps many replicates of the predator-prey simulation on the same landscape at once.
+
+    The populations of all members are held as (N, height+2, width+2) stacks and the
+    rates as per-member vectors, so a single vectorized pass updates every member. Each
+    member evolves exactly as a Simulation built from the same Mice and Fox would. The
+    stacks keep the floating point type of the populations, float64 or float32; float32
+    members agree with their Simulation to rounding, as the rates are rounded to float32.
+    """
+
+    def __init__(self, mice, fox, landscape, timestep):
+        """
+        Initializes EnsembleSimulation with lists of Mice and Fox instances, a Landscape and a timestep.
+
+        mice (list): Mice instances, one per ensemble member.
+        fox (list): Fox instances, one per ensemble member.
+        landscape (Landscape): Instance of Landscape class shared by all members.
+        timestep (float): The time interval for each simulation step.
+        """
+        # Input validation
+        if not all(isinstance(x, Mice) for x in mice) or not all(isinstance(x, Fox) for x in fox):
+            raise ValueError("Mice and Fox should be lists of instances of the Mice and Fox classes.")
+        if len(mice) != len(fox) or len(mice) == 0:
+            raise ValueError("Mice and Fox lists should be non-empty and of the same length.")
+        if not isinstance(landscape, Landscape):
+            raise ValueError("Landscape should be an instance of the Landscape class.")
+
+        self.landscape = landscape
+        self.timestep = timestep
+        self.members = len(mice)
+
+        # Stack the populations and broadcastable (N, 1, 1) rate vectors, in the type of the populations
+        dtype = np.result_type(*(animal.population for animal in mice + fox))
+        self.current_mice_pop = np.stack([animal.population for animal in mice]).astype(dtype)
+        self.next_mice_pop = self.current_mice_pop.copy()
+        self.current_fox_pop = np.stack([animal.population for animal in fox]).astype(dtype)
+        self.next_fox_pop = self.current_fox_pop.copy()
+        self.mice_rates = self.stack_rates(mice, dtype)
+        self.fox_rates = self.stack_rates(fox, dtype)
+
+        # Boolean mask of the land squares in the interior (halo excluded)
+        self.land_mask = self.landscape.landscape[1:-1, 1:-1] != 0
+
+    @staticmethod
+    def stack_rates(animals, dtype=float):
+        """
+        Collects the birth, death and diffusion rates of the members into vectors.
+
+        Parameters:
+        animals (list): AnimalModel instances, one per ensemble member.
+        dtype (type): The floating point type of the populations.
+
+        Returns:
+        dict: Arrays of shape (N, 1, 1) keyed by 'birth', 'death' and 'diffusion'.
+        """
+        return {name: np.array([getattr(animal, name + "_rate") for animal in animals], dtype).reshape(-1, 1, 1)
+                for name in ("birth", "death", "diffusion")}
+
+    def calculate_grid_diffusion(self, current_pop, diffusion_rate):
+        """
+        Calculates the diffusion for every interior cell of every member at once.
+
+        Parameters:
+        current_pop (ndarray): The current (padded) population stack.
+        diffusion_rate (ndarray): Per-member diffusion rates of shape (N, 1, 1).
+
+        Returns:
+        ndarray: The calculated diffusion for the interior cells, shape (N, height, width).
+        """
+        return diffusion_rate * (current_pop[:, :-2, 1:-1] + current_pop[:, 2:, 1:-1] + current_pop[:, 1:-1, :-2] + current_pop[:, 1:-1, 2:] - self.landscape.neighbours[1:-1, 1:-1] * current_pop[:, 1:-1, 1:-1])
+
+    def run(self):
+        """
+        Runs the simulation of every member for one time step.
+        """
+        mice = self.current_mice_pop[:, 1:-1, 1:-1]
+        fox = self.current_fox_pop[:, 1:-1, 1:-1]
+
+        mouse_birth = self.mice_rates["birth"] * mice
+        mouse_death = self.mice_rates["death"] * mice * fox
+        mouse_diffusion = self.calculate_grid_diffusion(self.current_mice_pop, self.mice_rates["diffusion"])
+        fox_birth = self.fox_rates["birth"] * mice * fox
+        fox_death = self.fox_rates["death"] * fox
+        fox_diffusion = self.calculate_grid_diffusion(self.current_fox_pop, self.fox_rates["diffusion"])
+
+        next_mice = np.maximum(0, mice + self.timestep * (mouse_birth - mouse_death + mouse_diffusion))
+        next_fox = np.maximum(0, fox + self.timestep * (fox_birth - fox_death + fox_diffusion))
+
+        # Only land cells are updated, water cells keep their (zero) population
+        self.next_mice_pop[:, 1:-1, 1:-1][:, self.land_mask] = next_mice[:, self.land_mask]
+        self.next_fox_pop[:, 1:-1, 1:-1][:, self.land_mask] = next_fox[:, self.land_mask]
+
+        # Swap the current and next populations for the next iteration
+        self.current_mice_pop, self.next_mice_pop = self.next_mice_pop, self.current_mice_pop
+        self.current_fox_pop, self.next_fox_pop = self.next_fox_pop, self.current_fox_pop
+
+    def calculate_average(self, population):
+        """
+        Calculate the average population of each member across the landscape.
+
+        Parameters:
+        population (ndarray): A population stack of shape (N, height+2, width+2).
+
+        Returns:
+        ndarray: Average population of each member.
+        """
+        nlands = self.landscape.land_squares
+        if nlands == 0:
+            return np.zeros(self.members)
+        # Accumulated in double precision, also for float32 populations
+        return np.array([np.sum(member, dtype=float) for member in population]) / nlands
+
+    @property
+    def get_mice_max(self):
+        """
+        Gets the maximum population of mice of each member.
+
+        Returns:
+        ndarray: The maximum population of mice of each member.
+        """
+        return np.max(self.current_mice_pop, axis=(1, 2))
+
+    @property
+    def get_fox_max(self):
+        """
+        Gets the maximum population of fox of each member.
+
+        Returns:
+        ndarray: The maximum population of fox of each member.
+        """
+        return np.max(self.current_fox_pop, axis=(1, 2))
+
+    @property
+    def get_mice_avg(self):
+        """
+        Gets the average population of mice of each member.
+
+        Returns:
+        ndarray: The average population of mice of each member.
+        """
+        return self.calculate_average(self.current_mice_pop)
+
+    @property
+    def get_fox_avg(self):
+        """
+        Gets the average population of fox of each member.
+
+        Returns:
+        ndarray: The average population of fox of each member.
+        """
+        return self.calculate_average(self.current_fox_pop)
@@ -1,8 +1,23 @@
 
+import os
 import numpy as np
+from .Profiler import Profiler
+
+# Formats of the population maps: plain-text and binary PPM
+PPM_FORMATS = ("P3", "P6")
+
+# RGB colour of the cells where animals cannot live
+WATER_COLOR = (0, 200, 255)
 
 class SimulationHelpers(object):
 
+    def __init__(self, profiler=None):
+        """
+        Args:
+        profiler (Profiler): The profiler timing the logging and the file writing, disabled if not given.
+        """
+        self.profiler = profiler if profiler is not None else Profiler(enabled=False)
+
 
     def getVersion(self):
         """
@@ -27,7 +42,56 @@ class SimulationHelpers(object):
 
         """
 
-        print("Averages. Timestep: {} Time (s): {:.1f} Mice: {:.17f} Foxes: {:.17f}".format(i, step, mice_avg, fox_avg))
+        with self.profiler.phase("log"):
+            print("Averages. Timestep: {} Time (s): {:.1f} Mice: {:.17f} Foxes: {:.17f}".format(i, step, mice_avg, fox_avg))
+
+    def log_activity(self, stepped, skipped):
+        """
+        Logs how many tile updates the active-region engine performed and skipped.
+
+        Args:
+        stepped (int): The number of tile updates performed.
+        skipped (int): The number of tile updates skipped.
+        """
+        total = stepped + skipped
+        fraction = skipped / total if total else 0.0
+        print("Active regions. Tiles stepped: {} Tiles skipped: {} Skipped fraction: {:.3f}".format(stepped, skipped, fraction))
+
+    def log_adaptive_steps(self, taken, rejected):
+        """
+        Logs how many steps an adaptive integrator took and rejected.
+
+        Args:
+        taken (int): The number of accepted steps.
+        rejected (int): The number of rejected steps.
+        """
+        print("Adaptive steps. Steps taken: {} Steps rejected: {}".format(taken, rejected))
+
+    def log_stop(self, i, time, reason):
+        """
+        Logs that a run stopped before its duration.
+
+        Args:
+        i (int): The timestep at which the run stopped.
+        time (float): The time at which the run stopped.
+        reason (str): Why the run stopped.
+        """
+        print("Stopped early. Timestep: {} Time (s): {:.1f} Reason: {}".format(i, time, reason))
+
+    def write_stop_record(self, filename, i, time, reason, filled):
+        """
+        Writes the record of a run that stopped before its duration.
+
+        Args:
+        filename (str): The record file, a one-row CSV table.
+        i (int): The timestep at which the run stopped.
+        time (float): The time at which the run stopped.
+        reason (str): Why the run stopped.
+        filled (bool): Whether the outputs of the remaining intervals were filled with the final state.
+        """
+        with open(filename, "w") as f:
+            f.write("Timestep,Time,Reason,Filled\n")
+            f.write("{},{},{},{}\n".format(i, time, reason, int(filled)))
 
     
     def calculate_color_codes(self, mice, fox, mm, mf, lscape):
@@ -45,21 +109,36 @@ class SimulationHelpers(object):
             mcols (numpy.ndarray): A 2D array representing the mouse color codes for each cell.
             fcols (numpy.ndarray): A 2D array representing the fox color codes for each cell.
         """
-        h, w = lscape.shape[0] - 2, lscape.shape[1] - 2
-        mcols = np.zeros((h, w), int)
-        fcols = np.zeros((h, w), int)
-
-        for x in range(1, h+1):
-            for y in range(1, w+1):
-                if lscape[x, y]:
-                    mcol = (mice[x, y] / mm) * 255 if mm != 0 else 0
-                    fcol = (fox[x, y] / mf) * 255 if mf != 0 else 0
-                    mcols[x-1, y-1] = mcol
-                    fcols[x-1, y-1] = fcol
+        # Colour codes are truncated to integers, water cells are left at zero
+        land = lscape[1:-1, 1:-1] != 0
+        mcols = np.zeros(land.shape, int)
+        fcols = np.zeros(land.shape, int)
+        if mm != 0:
+            mcols[land] = (mice[1:-1, 1:-1][land] / mm) * 255
+        if mf != 0:
+            fcols[land] = (fox[1:-1, 1:-1][land] / mf) * 255
         
         return mcols, fcols
 
-    def write_population_map(self, i, mice, fox, mm, mf, lscape):
+    def calculate_pixels(self, mcols, fcols, lscape):
+        """
+        Assembles the RGB pixels of a population map from the color codes.
+
+        Args:
+            mcols (numpy.ndarray): A 2D array of the mouse color codes, used as the green channel.
+            fcols (numpy.ndarray): A 2D array of the fox color codes, used as the red channel.
+            lscape (numpy.ndarray): A 2D array representing the padded landscape.
+
+        Returns:
+            pixels (numpy.ndarray): A 3D array of shape (height, width, 3) holding the RGB value of each cell.
+        """
+        pixels = np.zeros(mcols.shape + (3,), int)
+        pixels[..., 0] = fcols
+        pixels[..., 1] = mcols
+        pixels[lscape[1:-1, 1:-1] == 0] = WATER_COLOR
+        return pixels
+
+    def write_population_map(self, i, mice, fox, mm, mf, lscape, directory=".", ppm_format="P3"):
         """
         Writes the population data of mice and foxes on a landscape to a PPM image file.
 
@@ -74,26 +153,47 @@ class SimulationHelpers(object):
             mm (float): The maximum number of mice, used for normalizing the mouse color code.
             mf (float): The maximum number of foxes, used for normalizing the fox color code.
             lscape (numpy.ndarray): A 2D array representing the landscape. Non-zero values indicate cells where animals can live.
+            directory (str): The directory in which the PPM file is written.
+            ppm_format (str): "P3" writes a plain-text PPM, "P6" a binary PPM written with a single buffer write.
 
         Outputs:
             A PPM file named "map_{i:04d}.ppm" where `i` is the current timestep. The PPM file visualizes the populations of mice and foxes on the landscape.
             Each pixel's RGB values are determined by the number of foxes (R), mice (G), and a fixed zero value (B).
             Cells where animals cannot live are colored with a fixed RGB value (0, 200, 255).
         """
-        mcols, fcols = self.calculate_color_codes(mice, fox, mm, mf, lscape)
-        
-        h, w = lscape.shape[0] - 2, lscape.shape[1] - 2
-
-        with open("map_{:04d}.ppm".format(i), "w") as f:
-            hdr = "P3\n{} {}\n{}\n".format(w, h, 255)
-            f.write(hdr)
-            for x in range(0, h):
-                for y in range(0, w):
-                    if lscape[x+1, y+1]:
-                        f.write("{} {} {}\n".format(fcols[x, y], mcols[x, y], 0))
-                    else:
-                        f.write("{} {} {}\n".format(0, 200, 255))
-    
+        if ppm_format not in PPM_FORMATS:
+            raise ValueError("PPM format must be one of {}.".format(", ".join(PPM_FORMATS)))
+        with self.profiler.phase("map colours"):
+            mcols, fcols = self.calculate_color_codes(mice, fox, mm, mf, lscape)
+        with self.profiler.phase("map pixels"):
+            pixels = self.calculate_pixels(mcols, fcols, lscape)
+        self.write_ppm(os.path.join(directory, "map_{:04d}.ppm".format(i)), pixels, ppm_format)
+
+    def write_ppm(self, filename, pixels, ppm_format="P3"):
+        """
+        Writes an image to a PPM file.
+
+        Args:
+            filename (str): The PPM file.
+            pixels (numpy.ndarray): The RGB values of the image, of shape (height, width, 3).
+            ppm_format (str): "P3" writes a plain-text PPM, "P6" a binary PPM written with a single buffer write.
+        """
+        if ppm_format not in PPM_FORMATS:
+            raise ValueError("PPM format must be one of {}.".format(", ".join(PPM_FORMATS)))
+        h, w = pixels.shape[0], pixels.shape[1]
+        hdr = "{}\n{} {}\n{}\n".format(ppm_format, w, h, 255)
+
+        with self.profiler.phase("map format"):
+            if ppm_format == "P6":
+                data = hdr.encode("ascii") + np.clip(pixels, 0, 255).astype(np.uint8).tobytes()
+            else:
+                data = hdr + "".join("{} {} {}\n".format(*pixel) for pixel in pixels.reshape(-1, 3).tolist())
+        with self.profiler.phase("map write"):
+            with open(filename, "wb" if ppm_format == "P6" else "w") as f:
+                f.write(data)
+        # The plain-text map is ASCII, one byte per character
+        self.profiler.count("map bytes", len(data))
+
 
 
     def write_avg_file(self, filename, timestep, time, mice, foxes):
@@ -108,8 +208,11 @@ class SimulationHelpers(object):
             foxes (float): The average number of foxes.
         """
      
-        with open(filename,"a") as f:
-            f.write("{},{:.1f},{:.17f},{:.17f}\n".format(timestep,time,mice,foxes))
+        with self.profiler.phase("averages write"):
+            row = "{},{:.1f},{:.17f},{:.17f}\n".format(timestep,time,mice,foxes)
+            with open(filename,"a") as f:
+                f.write(row)
+        self.profiler.count("averages bytes", len(row))
 
 
     def validate_log_interval(self, log_interval, duration):
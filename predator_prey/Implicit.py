@@ -0,0 +1,248 @@
+import numpy as np
+import scipy.sparse
+from scipy.linalg import lapack
+from scipy.sparse.linalg import splu
+from .Sparse import SparseSimulation
+
+
+def laplacian_matrix(graph, dtype=float):
+    """
+    Builds the diffusion operator of the land squares as a sparse matrix.
+
+    Row i holds 1 for every land neighbour of square i and minus its number of land
+    neighbours on the diagonal, so that 'laplacian @ p' is the sum of the neighbour
+    populations minus neighbours * p, the bracket of the diffusion term of every engine.
+
+    Parameters:
+    graph (LandGraph): The land squares and their neighbour index.
+    dtype (type): The floating point type of the matrix.
+
+    Returns:
+    scipy.sparse.csr_matrix: The N x N matrix, N being the number of land squares.
+    """
+    adjacency = scipy.sparse.csr_matrix((np.ones(graph.indices.size, dtype), graph.indices, graph.indptr),
+                                        shape=(graph.size, graph.size))
+    return (adjacency - scipy.sparse.diags(graph.neighbours[:graph.size].astype(dtype))).tocsr()
+
+
+class AlternatingDirectionSolver(object):
+    """
+    Approximate inverse of I - coefficient * L, split into the two directions of the grid.
+
+    L is the sum of the diffusion operators along the rows and along the columns. In
+    row-major order of the land squares the row operator is tridiagonal, and so is the
+    column operator in column-major order. Both factors of
+
+        (I - coefficient * L_rows) (I - coefficient * L_columns)
+
+    are symmetric positive definite tridiagonal matrices, factorized once with LAPACK's
+    ?pttrf and solved in linear time with ?pttrs. The splitting adds an error of order
+    coefficient ** 2 but keeps the solve stable for any coefficient and conserves the
+    total population.
+    """
+
+    def __init__(self, graph, coefficient, dtype=float):
+        """
+        Parameters:
+        graph (LandGraph): The land squares and their neighbour index.
+        coefficient (float): The timestep multiplied by the diffusion rate.
+        dtype (type): The floating point type of the factors.
+        """
+        size = graph.size
+        up, down, left, right = (direction[:size] for direction in graph.directions)
+        self.factor, self.solve_factored = lapack.get_lapack_funcs(("pttrf", "pttrs"), dtype=np.dtype(dtype))
+
+        # Land squares in column-major order, and the position of every square in that order
+        row = graph.shape[1]
+        self.order = np.lexsort((graph.positions // row, graph.positions % row))
+
+        index = np.arange(size)
+        self.rows = self.factorize(coefficient, (left < size).astype(dtype) + (right < size), right[:-1] == index[1:], dtype)
+        self.columns = self.factorize(coefficient, ((up < size).astype(dtype) + (down < size))[self.order],
+                                      down[self.order[:-1]] == self.order[1:], dtype)
+
+    def factorize(self, coefficient, neighbours, coupled, dtype):
+        """
+        Factorizes one tridiagonal factor.
+
+        Parameters:
+        coefficient (float): The timestep multiplied by the diffusion rate.
+        neighbours (ndarray): The number of land neighbours of every square along the direction.
+        coupled (ndarray): Whether each square and the next one in the order are neighbours.
+        dtype (type): The floating point type of the factors.
+
+        Returns:
+        tuple: The factorized diagonal and off-diagonal, or the diagonal alone for a single square.
+        """
+        diagonal = (1 + coefficient * neighbours).astype(dtype)
+        if diagonal.size < 2:
+            return (diagonal,)
+        diagonal, offdiagonal, info = self.factor(diagonal, (-coefficient * coupled).astype(dtype))
+        if info != 0:
+            raise RuntimeError("The diffusion matrix could not be factorized (LAPACK info {}).".format(info))
+        return diagonal, offdiagonal
+
+    def apply(self, factors, values):
+        """
+        Solves one factorized tridiagonal system.
+        """
+        if len(factors) == 1:
+            return values / factors[0]
+        return self.solve_factored(*factors, values)[0]
+
+    def solve(self, values):
+        """
+        Applies the approximate inverse to a land vector.
+
+        Parameters:
+        values (ndarray): The land vector, without the sentinel.
+
+        Returns:
+        ndarray: The solution.
+        """
+        solution = np.empty_like(values)
+        solution[self.order] = self.apply(self.columns, self.apply(self.rows, values)[self.order])
+        return solution
+
+
+class ImexSimulation(SparseSimulation):
+    """
+    Simulation treating diffusion implicitly and the birth and death terms explicitly.
+
+    Each step solves, for every species over the land squares,
+
+        (I - timestep * diffusion_rate * L) next = current + timestep * (birth - death)
+
+    where L is the diffusion operator of laplacian_matrix. The implicit diffusion is
+    stable for any step size, so runs with high diffusion rates are no longer limited
+    by the explicit limit timestep < 1 / (4 * diffusion_rate), at which the explicit
+    engines start to oscillate and clamp at zero. The matrix is factorized once with a
+    sparse LU decomposition and the factors are reused by every step; species with the
+    same diffusion rate share them. The update conserves the total population moved by
+    diffusion, and is first-order accurate in time like the explicit engines, which it
+    approaches as the step size decreases.
+
+    Populations are held as land vectors, as in SparseSimulation.
+    """
+
+    ENGINES = ("imex",)
+
+    def __init__(self, mice, fox, landscape, timestep):
+        """
+        Initializes ImexSimulation with Mice, Fox, Landscape instances, and a timestep.
+
+        mice (Mice): Instance of Mice class representing the mice population.
+        fox (Fox): Instance of Fox class representing the fox population.
+        landscape (Landscape): Instance of Landscape class representing the environment.
+        timestep (float): The time interval for each simulation step.
+        """
+        super().__init__(mice, fox, landscape, timestep)
+        self.engine = "imex"
+        # Built on the first factorization
+        self.laplacian = None
+        # LU factors of the implicit diffusion matrices, keyed by timestep * diffusion_rate
+        self.factors = {}
+        self.mice_solver = self.factorize(self.mice.diffusion_rate)
+        self.fox_solver = self.factorize(self.fox.diffusion_rate)
+
+    def factorize(self, diffusion_rate):
+        """
+        Returns the LU factors of I - timestep * diffusion_rate * L, computing them on first use.
+
+        Parameters:
+        diffusion_rate (float): The diffusion rate.
+
+        Returns:
+        object: The factors, whose solve() method applies the inverse of the matrix to a land
+                vector without its sentinel, or None if there are no land squares.
+        """
+        coefficient = self.timestep * diffusion_rate
+        if self.graph.size == 0:
+            return None
+        if coefficient not in self.factors:
+            if self.laplacian is None:
+                self.laplacian = laplacian_matrix(self.graph, self.mice_land.dtype)
+            identity = scipy.sparse.identity(self.graph.size, self.laplacian.dtype, format="csr")
+            self.factors[coefficient] = splu((identity - coefficient * self.laplacian).tocsc(), permc_spec="COLAMD")
+        return self.factors[coefficient]
+
+    def apply_implicit_update(self, current, birth, death, solver, out):
+        """
+        Writes 'max(0, solve(current + timestep * (birth - death)))' into 'out'.
+        The 'birth' vector is overwritten.
+        """
+        size = self.graph.size
+        np.subtract(birth, death, out=birth)
+        np.multiply(birth, self.timestep, out=birth)
+        np.add(current, birth, out=birth)
+        if size:
+            out[:size] = solver.solve(birth[:size])
+        out[size] = 0
+        np.maximum(out, 0, out=out)
+
+    def run(self):
+        """
+        Runs the simulation for one time step over the land squares.
+        """
+        mice, fox = self.mice_land, self.fox_land
+        _, birth, death, _ = self.scratch
+
+        # Mice: birth = r * mice, death = a * mice * fox
+        np.multiply(mice, self.mice.birth_rate, out=birth)
+        np.multiply(mice, self.mice.death_rate, out=death)
+        np.multiply(death, fox, out=death)
+        self.apply_implicit_update(mice, birth, death, self.mice_solver, self.next_mice_land)
+
+        # Fox: birth = b * mice * fox, death = m * fox
+        np.multiply(mice, self.fox.birth_rate, out=birth)
+        np.multiply(birth, fox, out=birth)
+        np.multiply(fox, self.fox.death_rate, out=death)
+        self.apply_implicit_update(fox, birth, death, self.fox_solver, self.next_fox_land)
+
+        # Swap the current and next populations for the next iteration
+        self.mice_land, self.next_mice_land = self.next_mice_land, self.mice_land
+        self.fox_land, self.next_fox_land = self.next_fox_land, self.fox_land
+
+
+class AdiSimulation(ImexSimulation):
+    """
+    Simulation treating diffusion implicitly with alternating-direction tridiagonal solves.
+
+    The steps are those of ImexSimulation, but the implicit diffusion matrix is replaced by
+    the product of its row and column factors (see AlternatingDirectionSolver). Factorizing
+    and solving take time and memory linear in the number of land squares, where the sparse
+    LU factors of ImexSimulation grow faster, so this engine suits large landscapes. It is
+    stable for any step size, at the price of a splitting error of order
+    (timestep * diffusion_rate) ** 2 per step.
+    """
+
+    ENGINES = ("adi",)
+
+    def __init__(self, mice, fox, landscape, timestep):
+        """
+        Initializes AdiSimulation with Mice, Fox, Landscape instances, and a timestep.
+
+        mice (Mice): Instance of Mice class representing the mice population.
+        fox (Fox): Instance of Fox class representing the fox population.
+        landscape (Landscape): Instance of Landscape class representing the environment.
+        timestep (float): The time interval for each simulation step.
+        """
+        super().__init__(mice, fox, landscape, timestep)
+        self.engine = "adi"
+
+    def factorize(self, diffusion_rate):
+        """
+        Returns the alternating-direction factors for a diffusion rate, computing them on first use.
+
+        Parameters:
+        diffusion_rate (float): The diffusion rate.
+
+        Returns:
+        AlternatingDirectionSolver: The factors, or None if there are no land squares.
+        """
+        coefficient = self.timestep * diffusion_rate
+        if self.graph.size == 0:
+            return None
+        if coefficient not in self.factors:
+            self.factors[coefficient] = AlternatingDirectionSolver(self.graph, coefficient, self.mice_land.dtype)
+        return self.factors[coefficient]
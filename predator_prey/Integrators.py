@@ -0,0 +1,152 @@
+import numpy as np
+
+# Growth limits of the adaptive step size after an accepted or rejected step
+MIN_STEP_FACTOR = 0.2
+MAX_STEP_FACTOR = 5.0
+# Safety factor of the step size controller
+SAFETY = 0.9
+
+
+class ButcherTableau(object):
+    """
+    Coefficients of an explicit Runge-Kutta method, with an optional embedded
+    lower order method for error estimation.
+    """
+
+    def __init__(self, name, a, b, c, order, error_weights=None, error_order=None, fsal_error=False):
+        """
+        Parameters:
+        name (str): The name of the method.
+        a (list): The lower triangular stage coefficients, one list per stage.
+        b (list): The weights of the stages in the solution.
+        c (list): The time fractions of the stages.
+        order (int): The order of the method.
+        error_weights (list): The weights of the stages in the error estimate, i.e. the difference
+                              between the weights of the method and of its embedded method.
+        error_order (int): The order of the embedded method.
+        fsal_error (bool): Whether the error estimate needs one more stage, evaluated at the new solution.
+        """
+        self.name = name
+        self.a = a
+        self.b = b
+        self.c = c
+        self.order = order
+        self.error_weights = error_weights
+        self.error_order = error_order
+        self.fsal_error = fsal_error
+
+    @property
+    def adaptive(self):
+        """
+        Gets whether the method has an error estimate and can adapt its step size.
+        """
+        return self.error_weights is not None
+
+
+# Forward Euler, the update of the stepping engines
+EULER = ButcherTableau("euler", [[]], [1.0], [0.0], 1)
+
+# Heun's method, with forward Euler as embedded method
+HEUN = ButcherTableau("heun", [[], [1.0]], [0.5, 0.5], [0.0, 1.0], 2,
+                      error_weights=[-0.5, 0.5], error_order=1)
+
+# The classic fourth-order Runge-Kutta method. Its third-order embedded method uses the weights
+# (1/6, 1/3, 1/3, 0, 1/6), where the fifth stage is evaluated at the new solution.
+RK4 = ButcherTableau("rk4", [[], [0.5], [0.0, 0.5], [0.0, 0.0, 1.0]], [1 / 6, 1 / 3, 1 / 3, 1 / 6], [0.0, 0.5, 0.5, 1.0], 4,
+                     error_weights=[0.0, 0.0, 0.0, 1 / 6, -1 / 6], error_order=3, fsal_error=True)
+
+# Integrators selectable by name
+TABLEAUS = {tableau.name: tableau for tableau in (EULER, HEUN, RK4)}
+
+
+class RungeKuttaIntegrator(object):
+    """
+    Explicit Runge-Kutta integrator of the population equations.
+
+    The state is an array holding the padded mice and fox populations, and 'derivatives'
+    returns its time derivative, zero outside of the land squares. Each step is clamped at
+    zero, like the forward Euler update of the engines; intermediate stages are not.
+    """
+
+    def __init__(self, tableau, derivatives):
+        """
+        Parameters:
+        tableau (ButcherTableau): The coefficients of the method.
+        derivatives (callable): Function of the state returning its time derivative.
+        """
+        self.tableau = tableau
+        self.derivatives = derivatives
+        self.evaluations = 0
+
+    def evaluate(self, state):
+        """
+        Evaluates and counts one derivative.
+        """
+        self.evaluations += 1
+        return self.derivatives(state)
+
+    def step(self, state, timestep, estimate_error=False):
+        """
+        Takes one step of the method.
+
+        Parameters:
+        state (ndarray): The current state.
+        timestep (float): The step size.
+        estimate_error (bool): Whether the error of the step is estimated.
+
+        Returns:
+        tuple: The new state, not yet clamped at zero, and the error estimate, or None.
+        """
+        tableau = self.tableau
+        stages = []
+        for a in tableau.a:
+            stage = state
+            for weight, k in zip(a, stages):
+                if weight:
+                    stage = stage + (timestep * weight) * k
+            stages.append(self.evaluate(stage))
+
+        increment = tableau.b[0] * stages[0]
+        for weight, k in zip(tableau.b[1:], stages[1:]):
+            increment += weight * k
+        new_state = state + timestep * increment
+
+        error = None
+        if estimate_error:
+            if not tableau.adaptive:
+                raise ValueError("The {} method has no error estimate.".format(tableau.name))
+            if tableau.fsal_error:
+                stages.append(self.evaluate(new_state))
+            error = sum(weight * k for weight, k in zip(tableau.error_weights, stages) if weight)
+            error *= timestep
+        return new_state, error
+
+    def error_norm(self, error, state, new_state, tolerance):
+        """
+        Scales an error estimate by the tolerance: a step is accepted if the norm is at most 1.
+
+        Parameters:
+        error (ndarray): The error estimate of the step.
+        state, new_state (ndarray): The states before and after the step.
+        tolerance (float): The relative and absolute tolerance.
+
+        Returns:
+        float: The largest scaled error of any square.
+        """
+        scale = tolerance * (1 + np.maximum(np.abs(state), np.abs(new_state)))
+        return float(np.max(np.abs(error) / scale)) if error.size else 0.0
+
+    def step_factor(self, norm):
+        """
+        Calculates the factor by which the step size changes after a step with the given error norm.
+
+        Parameters:
+        norm (float): The scaled error norm of the step.
+
+        Returns:
+        float: The factor, between MIN_STEP_FACTOR and MAX_STEP_FACTOR.
+        """
+        if norm == 0:
+            return MAX_STEP_FACTOR
+        factor = SAFETY * norm ** (-1 / (self.tableau.error_order + 1))
+        return min(MAX_STEP_FACTOR, max(MIN_STEP_FACTOR, factor))
@@ -0,0 +1,202 @@
+import numpy as np
+
+
+def split_rows(height, workers):
+    """
+    Splits the interior rows 1..height of the padded grid into contiguous bands.
+
+    Parameters:
+    height (int): Number of interior rows.
+    workers (int): Number of bands.
+
+    Returns:
+    list: (first row, one past last row) of each non-empty band.
+    """
+    bounds = np.linspace(1, height + 1, workers + 1).round().astype(int)
+    return [(int(r0), int(r1)) for r0, r1 in zip(bounds[:-1], bounds[1:]) if r1 > r0]
+
+
+class StencilKernel(object):
+    """
+    Allocation-free predator-prey update of a band of rows of the padded grid.
+
+    The rows of the band are flattened to 1-D, halo columns included, so the up, down,
+    left and right neighbours of every cell are contiguous slices offset by one row or
+    one element. Every operand of every ufunc call is therefore contiguous and NumPy
+    never needs an internal iteration buffer; all intermediate results go to a fixed set
+    of scratch buffers through 'out=' arguments.
+
+    The update evaluates the same expression, in the same order, as the per-cell update
+    of the Simulation class, so its results are identical to the 'loop' engine.
+    """
+
+    def __init__(self, land_rows, neighbour_rows, first_row, dtype=float):
+        """
+        Initializes the kernel for a band of rows.
+
+        Parameters:
+        land_rows (ndarray): The rows of the padded landscape covered by the band.
+        neighbour_rows (ndarray): The matching rows of the habitable neighbour counts.
+        first_row (int): Index of the first row of the band in the padded grid (at least 1).
+        dtype (type): The dtype of the population arrays.
+        """
+        self.first_row = first_row
+        self.last_row = first_row + land_rows.shape[0]
+        self.row_length = land_rows.shape[1]
+        self.start = self.first_row * self.row_length
+        self.stop = self.last_row * self.row_length
+
+        # Three scratch buffers shared by both species, plus float copies of the land mask
+        # (whose zeros keep water and halo cells empty) and of the neighbour counts (so the
+        # stencil never needs a casting buffer)
+        self.scratch = [np.empty(land_rows.size, dtype) for _ in range(3)]
+        self.land_weight = (land_rows != 0).astype(dtype).reshape(-1)
+        self.flat_neighbours = neighbour_rows.astype(dtype).reshape(-1)
+        self.views = []
+
+    def get_views(self, current_mice, current_fox, next_mice, next_fox):
+        """
+        Returns the flat slices of the population buffers covered by the band.
+
+        The views depend only on which buffer is current, so they are built once for
+        each of the two buffer arrangements of the double buffer and reused afterwards.
+
+        Parameters:
+        current_mice, current_fox, next_mice, next_fox (ndarray): The padded population buffers.
+
+        Returns:
+        tuple: Stencils (centre, up, down, left and right views) of the current mice and
+               fox populations, followed by the matching views of the next populations.
+
+        Raises:
+        ValueError: If a population buffer is not C-contiguous.
+        """
+        key = (current_mice, current_fox, next_mice, next_fox)
+        for cached, views in self.views:
+            if all(x is y for x, y in zip(cached, key)):
+                return views
+
+        for pop in key:
+            if not pop.flags.c_contiguous:
+                raise ValueError("The stencil kernel requires C-contiguous population arrays.")
+
+        row, start, stop = self.row_length, self.start, self.stop
+
+        def stencil(pop):
+            flat = pop.reshape(-1)
+            return flat[start:stop], flat[start - row:stop - row], flat[start + row:stop + row], flat[start - 1:stop - 1], flat[start + 1:stop + 1]
+
+        views = (stencil(current_mice), stencil(current_fox),
+                 next_mice.reshape(-1)[start:stop], next_fox.reshape(-1)[start:stop])
+        # Only the two most recent arrangements (the double buffer) are kept
+        self.views = self.views[-1:] + [(key, views)]
+        return views
+
+    def calculate_diffusion(self, stencil, diffusion_rate, out, tmp):
+        """
+        Calculates the diffusion for every cell of the band into 'out'.
+
+        Parameters:
+        stencil (tuple): Centre, up, down, left and right flat views of the padded population.
+        diffusion_rate (float): The diffusion rate.
+        out (ndarray): Scratch buffer receiving the diffusion.
+        tmp (ndarray): Scratch buffer.
+
+        Returns:
+        ndarray: The 'out' buffer.
+        """
+        centre, up, down, left, right = stencil
+        np.add(up, down, out=out)
+        np.add(out, left, out=out)
+        np.add(out, right, out=out)
+        np.multiply(self.flat_neighbours, centre, out=tmp)
+        np.subtract(out, tmp, out=out)
+        return np.multiply(out, diffusion_rate, out=out)
+
+    def apply_update(self, current, birth, death, diffusion, timestep, out):
+        """
+        Writes 'max(0, current + timestep * (birth - death + diffusion))' into 'out' for land cells.
+
+        Water and halo cells are multiplied by the zero entries of the land weight so they stay empty.
+        The 'birth' buffer is overwritten.
+        """
+        np.subtract(birth, death, out=birth)
+        np.add(birth, diffusion, out=birth)
+        np.multiply(birth, timestep, out=birth)
+        np.add(current, birth, out=out)
+        np.maximum(out, 0, out=out)
+        np.multiply(out, self.land_weight, out=out)
+
+    def step(self, mice_rates, fox_rates, timestep, current_mice, current_fox, next_mice, next_fox, statistics=None):
+        """
+        Computes the next mice and fox populations of the band.
+
+        If 'statistics' is given, the sum and maximum of each next population over the
+        band are computed as soon as it has been written, while it is still in cache.
+
+        Parameters:
+        mice_rates (tuple): Birth, death and diffusion rates of the mice.
+        fox_rates (tuple): Birth, death and diffusion rates of the fox.
+        timestep (float): The time interval of the step.
+        current_mice, current_fox (ndarray): The padded current populations, read.
+        next_mice, next_fox (ndarray): The padded next populations, written within the band.
+        statistics (ndarray): Optional array of 4 values receiving the sum and maximum of the
+                              next mice, then the sum and maximum of the next fox, over the band.
+        """
+        mice_stencil, fox_stencil, mice_out, fox_out = self.get_views(current_mice, current_fox, next_mice, next_fox)
+        mice, fox = mice_stencil[0], fox_stencil[0]
+        diffusion, birth, death = self.scratch
+
+        # Mice: birth = r * mice, death = a * mice * fox
+        self.calculate_diffusion(mice_stencil, mice_rates[2], diffusion, birth)
+        np.multiply(mice, mice_rates[0], out=birth)
+        np.multiply(mice, mice_rates[1], out=death)
+        np.multiply(death, fox, out=death)
+        self.apply_update(mice, birth, death, diffusion, timestep, mice_out)
+        if statistics is not None:
+            statistics[0], statistics[1] = np.sum(mice_out, dtype=float), np.max(mice_out)
+
+        # Fox: birth = b * mice * fox, death = m * fox
+        self.calculate_diffusion(fox_stencil, fox_rates[2], diffusion, birth)
+        np.multiply(mice, fox_rates[0], out=birth)
+        np.multiply(birth, fox, out=birth)
+        np.multiply(fox, fox_rates[1], out=death)
+        self.apply_update(fox, birth, death, diffusion, timestep, fox_out)
+        if statistics is not None:
+            statistics[2], statistics[3] = np.sum(fox_out, dtype=float), np.max(fox_out)
+
+    def statistics(self, mice, fox):
+        """
+        Calculates the partial sums and maxima of the populations over the band.
+
+        Parameters:
+        mice, fox (ndarray): The padded populations.
+
+        Returns:
+        tuple: Sum and maximum of the mice, then sum and maximum of the fox, over the band.
+        """
+        mice_band = mice.reshape(-1)[self.start:self.stop]
+        fox_band = fox.reshape(-1)[self.start:self.stop]
+        return np.sum(mice_band, dtype=float), np.max(mice_band), np.sum(fox_band, dtype=float), np.max(fox_band)
+
+    def is_populated(self, mice, fox):
+        """
+        Checks whether any cell of the band holds mice or foxes.
+
+        Parameters:
+        mice, fox (ndarray): The padded populations.
+
+        Returns:
+        bool: True if the band holds a non-zero population.
+        """
+        return bool(mice.reshape(-1)[self.start:self.stop].any() or fox.reshape(-1)[self.start:self.stop].any())
+
+    def clear(self, mice, fox):
+        """
+        Sets the populations of every cell of the band to zero.
+
+        Parameters:
+        mice, fox (ndarray): The padded populations.
+        """
+        mice.reshape(-1)[self.start:self.stop] = 0
+        fox.reshape(-1)[self.start:self.stop] = 0
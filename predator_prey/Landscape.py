@@ -1,24 +1,118 @@
+import json
+import os
 import numpy as np
 from scipy.signal import convolve2d
 
+# Suffixes of the binary landscape cache written next to a text landscape file
+CACHE_SUFFIX = ".cache.npy"
+CACHE_KEY_SUFFIX = ".cache.json"
+
+
+def validate_grid(grid):
+    """
+    Validates the grid of a landscape, without its halo.
+
+    Parameters:
+    grid (np.array): The grid to validate.
+
+    Returns:
+    np.array: The grid.
+
+    Raises:
+    ValueError: If the grid is not a non-empty 2D integer grid.
+    """
+    if grid.ndim != 2 or grid.dtype.kind not in "biu":
+        raise ValueError(f"Expected a 2D integer grid, but found {grid.ndim} dimensions of {grid.dtype}")
+    if not (grid.shape[0] > 0 and grid.shape[1] > 0):
+        raise ValueError(f"Invalid landscape dimensions: {grid.shape[1]}, {grid.shape[0]}")
+    return grid
+
+
+def read_landscape_binary(filename):
+    """
+    Reads a binary landscape file: a '.npy' file holding the 2-D grid of the landscape
+    without its halo. The file is memory mapped rather than read into memory.
+
+    Parameters:
+    filename (str): The binary landscape file.
+
+    Returns:
+    np.array: The memory mapped 2D array of the landscape.
+
+    Raises:
+    ValueError: If the file does not hold a non-empty 2D integer grid.
+    """
+    return validate_grid(np.load(filename, mmap_mode="r", allow_pickle=False))
+
+
+def write_landscape_binary(filename, grid):
+    """
+    Writes the grid of a landscape, without its halo, to a binary landscape file. Grids
+    holding only values from 0 to 255 are stored as uint8. The file is written under a
+    temporary name and then renamed, so readers never see a partial file.
+
+    Parameters:
+    filename (str): The binary landscape file.
+    grid (np.array): The 2D array of the landscape.
+    """
+    if grid.size and grid.min() >= 0 and grid.max() <= 255:
+        grid = grid.astype(np.uint8)
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as f:
+        np.save(f, np.ascontiguousarray(grid))
+    os.replace(temporary, filename)
+
 class Landscape(object):
     """
-    Class representing a landscape, which is a spatial grid loaded from a file.
+    Class representing a landscape, which is a spatial grid loaded from a file or given as an array.
     Each cell in the grid can either be habitable or not.
     """
 
-    def __init__(self, landscape_file):
+    def __init__(self, landscape_file, cache=False, compact=False, verbose=True):
         """
         Initializes the landscape by loading it from a file.
 
         Parameters:
-        landscape_file (str): The file from which to load the landscape.
+        landscape_file (str): The file from which to load the landscape, a text map or a binary '.npy' landscape.
+                              A 2D integer array is used as the grid of the landscape, without its halo.
+        cache (bool): Whether a text map is cached in binary form next to the file and reloaded from
+                      the cache while the file is unchanged.
+        compact (bool): Whether the landscape is stored as uint8 and the neighbour counts as int8
+                        rather than as platform integers.
+        verbose (bool): Whether the neighbour counts are printed when they are calculated.
         """
         self.width = None
         self.height = None
+        self.cache = cache
+        self.compact = compact
+        self.verbose = verbose
+        self.land_squares_cache = None
         self.landscape = self.load_landscape(landscape_file)
+        if compact:
+            # Grids are mostly built in uint8 already, only those parsed line by line are converted
+            self.landscape = self.landscape.astype(self.landscape_dtype(self.landscape), copy=False)
         self.neighbours = self.calculate_neighbours()
 
+    def landscape_dtype(self, grid):
+        """
+        Returns the type in which a landscape grid is stored: uint8 for a compact landscape,
+        platform integers otherwise.
+
+        Parameters:
+        grid (np.array): The 2D array of the landscape.
+
+        Returns:
+        type: The type of the padded landscape.
+
+        Raises:
+        RuntimeError: If a compact landscape holds values outside 0 to 255.
+        """
+        if not self.compact:
+            return int
+        if grid.dtype != np.uint8 and grid.size and (grid.min() < 0 or grid.max() > 255):
+            raise RuntimeError("Error loading landscape file: compact landscapes must hold values from 0 to 255")
+        return np.uint8
+
     def load_landscape(self, landscape_file):
         """
         Loads a landscape from a file.
@@ -29,30 +123,22 @@ class Landscape(object):
         Returns:
         np.array: 2D numpy array representing the landscape.
         """
+        if isinstance(landscape_file, np.ndarray):
+            return self.pad_landscape(validate_grid(landscape_file))
         try:
-            with open(landscape_file, "r") as f:
-                lines = f.readlines()
-            if not lines:
-                raise ValueError("File is empty.")
-
-            w, h = map(int, lines[0].split())
-            self.width = w
-            self.height = h
-            if not (w > 0 and h > 0):
-                raise ValueError(f"Invalid landscape dimensions: {w}, {h}")
-
-            if len(lines[1:]) != h:
-                raise ValueError(f"Expected {h} lines in file, but found {len(lines[1:])}")
-
-            landscape = np.zeros((h+2, w+2), int)
+            if landscape_file.endswith(".npy"):
+                return self.pad_landscape(read_landscape_binary(landscape_file))
+            if self.cache:
+                grid = self.read_cache(landscape_file)
+                if grid is not None:
+                    return self.pad_landscape(grid)
 
-            # Load landscape from the file, line by line
-            for i, line in enumerate(lines[1:]):
-                row = [0] + list(map(int, line.split())) + [0]
-                if len(row) != w + 2:
-                    raise ValueError(f"Line {i+1} in the file does not have {w} integers.")
-                landscape[i+1] = row
+            with open(landscape_file, "r") as f:
+                lines = f.read().splitlines()
+            landscape = self.parse_landscape(lines)
 
+            if self.cache:
+                self.write_cache(landscape_file, landscape[1:-1, 1:-1])
             return landscape
 
         except (IOError, FileNotFoundError):
@@ -60,6 +146,112 @@ class Landscape(object):
         except ValueError as ve:
             raise RuntimeError(f"Error loading landscape file: {ve}")
 
+    def parse_landscape(self, lines):
+        """
+        Parses the lines of a text landscape file.
+
+        Maps made of single digits separated by single spaces are converted all at once
+        from their bytes. Any other map is parsed line by line.
+
+        Parameters:
+        lines (list): The lines of the file, without line endings.
+
+        Returns:
+        np.array: 2D numpy array representing the landscape, with a halo of water.
+
+        Raises:
+        ValueError: If the dimensions or a line are invalid.
+        """
+        if not lines:
+            raise ValueError("File is empty.")
+
+        w, h = map(int, lines[0].split())
+        self.width = w
+        self.height = h
+        if not (w > 0 and h > 0):
+            raise ValueError(f"Invalid landscape dimensions: {w}, {h}")
+
+        if len(lines[1:]) != h:
+            raise ValueError(f"Expected {h} lines in file, but found {len(lines[1:])}")
+
+        # Fast path: every line is exactly 'd d ... d', so the digits sit at the even bytes
+        if all(len(line) == 2 * w - 1 for line in lines[1:]):
+            rows = np.frombuffer("".join(lines[1:]).encode("latin1", "replace"), np.uint8).reshape(h, 2 * w - 1)
+            digits = rows[:, ::2] - ord("0")
+            if (rows[:, 1::2] == ord(" ")).all() and (digits <= 9).all():
+                landscape = np.zeros((h+2, w+2), self.landscape_dtype(digits))
+                landscape[1:-1, 1:-1] = digits
+                return landscape
+
+        # Load landscape from the file, line by line
+        landscape = np.zeros((h+2, w+2), int)
+        for i, line in enumerate(lines[1:]):
+            row = [0] + list(map(int, line.split())) + [0]
+            if len(row) != w + 2:
+                raise ValueError(f"Line {i+1} in the file does not have {w} integers.")
+            landscape[i+1] = row
+
+        return landscape
+
+    def pad_landscape(self, grid):
+        """
+        Surrounds a landscape grid with a halo of water and sets the width and height.
+
+        Parameters:
+        grid (np.array): The 2D array of the landscape, without halo.
+
+        Returns:
+        np.array: 2D numpy array representing the landscape, with a halo of water.
+        """
+        self.height, self.width = grid.shape
+        landscape = np.zeros((self.height+2, self.width+2), self.landscape_dtype(grid))
+        landscape[1:-1, 1:-1] = grid
+        return landscape
+
+    @staticmethod
+    def cache_key(landscape_file):
+        """
+        Returns the key identifying the current contents of a landscape file: its size and modification time.
+        """
+        stat = os.stat(landscape_file)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def read_cache(self, landscape_file):
+        """
+        Reads the binary cache of a text landscape file, if it matches the current file.
+
+        Parameters:
+        landscape_file (str): The text landscape file.
+
+        Returns:
+        np.array: The memory mapped grid of the landscape, or None if there is no valid cache.
+        """
+        try:
+            with open(landscape_file + CACHE_KEY_SUFFIX, "r") as f:
+                key = json.load(f)
+            if key != self.cache_key(landscape_file):
+                return None
+            return read_landscape_binary(landscape_file + CACHE_SUFFIX)
+        except (OSError, ValueError):
+            return None
+
+    def write_cache(self, landscape_file, grid):
+        """
+        Writes the binary cache of a text landscape file. A cache that cannot be written,
+        e.g. in a read-only directory, is skipped.
+
+        Parameters:
+        landscape_file (str): The text landscape file.
+        grid (np.array): The 2D array of the landscape, without halo.
+        """
+        try:
+            key = self.cache_key(landscape_file)
+            write_landscape_binary(landscape_file + CACHE_SUFFIX, grid)
+            with open(landscape_file + CACHE_KEY_SUFFIX, "w") as f:
+                json.dump(key, f)
+        except OSError:
+            pass
+
     def calculate_neighbours(self):
         """
         Calculates the number of habitable neighbours for each cell in the landscape.
@@ -67,9 +259,16 @@ class Landscape(object):
         Returns:
         np.array: 2D numpy array where each cell contains the number of habitable neighbours.
         """
-        kernel = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+        # The landscape may have been edited, the land squares are counted again
+        self.land_squares_cache = None
+        # A small kernel keeps the counts of a uint8 landscape in int16 rather than int64
+        kernel = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]], np.int8)
         neighbours = convolve2d(self.landscape, kernel, mode='same', boundary='wrap')
-        print(neighbours)
+        if self.compact:
+            # At most 4 neighbours, int8 is enough
+            neighbours = neighbours.astype(np.int8)
+        if self.verbose:
+            print(neighbours)
         return neighbours
 
     def __repr__(self):
@@ -86,7 +285,12 @@ class Landscape(object):
         """
         Returns the number of land squares in the landscape.
 
+        The count is cached. It is recalculated when the landscape array is replaced or when
+        calculate_neighbours() is called, which must follow any edit of the landscape.
+
         Returns:
         int: The number of land squares in the landscape.
         """
-        return np.count_nonzero(self.landscape)
\ No newline at end of file
+        if self.land_squares_cache is None or self.land_squares_cache[0] is not self.landscape:
+            self.land_squares_cache = (self.landscape, np.count_nonzero(self.landscape))
+        return self.land_squares_cache[1]
\ No newline at end of file
@@ -0,0 +1,155 @@
+import numpy as np
+from .Landscape import Landscape
+from .Animal import AnimalModel, Mice, Fox
+
+class MultiSpeciesSimulation(object):
+    """
+    Steps any number of interacting species on one landscape at once.
+
+    Every species s follows
+
+        dP_s/dt = (birth_s - death_s) * P_s + P_s * sum_j interactions[s, j] * P_j + diffusion_s * D(P_s)
+
+    where D is the diffusion stencil of the other engines. A positive interaction is a gain,
+    e.g. a predator feeding on its prey, and a negative one a loss, e.g. prey being eaten or
+    species competing for the same squares. The two-species model of Simulation is the
+    special case built by predator_prey().
+
+    The populations of all species are held as one contiguous (S, height+2, width+2) stack
+    and the rates as per-species vectors. A forward Euler step evaluates the interactions
+    of all species with a single matrix product over the stack and their diffusion with a
+    single stencil, so there is no loop over the species in Python. The dense product costs
+    S * S multiply-adds per square, against a few passes over the stack per species for the
+    stencil and the update, so the step is quadratic in the number of species. For the tens
+    of species of a food web the linear, memory-bound passes still dominate.
+    """
+
+    def __init__(self, species, interactions, landscape, timestep):
+        """
+        Initializes MultiSpeciesSimulation with AnimalModel instances, an interaction matrix, a
+        Landscape and a timestep.
+
+        species (list): AnimalModel instances, one per species, whose birth and death rates are
+                        the per-capita rates of the species alone.
+        interactions (array_like): S x S matrix, whose entry [i, j] is the per-capita effect of
+                                   species j on the growth rate of species i.
+        landscape (Landscape): Instance of Landscape class shared by all species.
+        timestep (float): The time interval for each simulation step.
+        """
+        # Input validation
+        if len(species) == 0 or not all(isinstance(animal, AnimalModel) for animal in species):
+            raise ValueError("Species should be a non-empty list of AnimalModel instances.")
+        if not isinstance(landscape, Landscape):
+            raise ValueError("Landscape should be an instance of the Landscape class.")
+        interactions = np.array(interactions, dtype=float)
+        if interactions.shape != (len(species), len(species)) or not np.all(np.isfinite(interactions)):
+            raise ValueError("Interactions should be a finite {0} x {0} matrix.".format(len(species)))
+
+        self.landscape = landscape
+        self.timestep = timestep
+        self.species = len(species)
+        self.names = [animal.animal_type for animal in species]
+
+        # Stack the populations and the per-species rate vectors
+        dtype = np.result_type(*(animal.population for animal in species))
+        self.current_pop = np.stack([animal.population for animal in species]).astype(dtype)
+        self.next_pop = self.current_pop.copy()
+        self.growth = np.array([animal.birth_rate - animal.death_rate for animal in species], dtype).reshape(-1, 1)
+        self.diffusion = np.array([animal.diffusion_rate for animal in species], dtype).reshape(-1, 1, 1)
+        self.interactions = interactions.astype(dtype)
+
+        # Land weight of the interior squares (halo excluded), zero on water so that water keeps no population
+        self.land_weight = (self.landscape.landscape[1:-1, 1:-1] != 0).astype(dtype)
+        self.neighbours = self.landscape.neighbours[1:-1, 1:-1].astype(dtype)
+
+        # Scratch buffers of the per-capita rates over the padded grid and of the diffusion
+        self.rates = np.empty(self.current_pop.shape, dtype)
+        self.scratch = np.empty((self.species,) + self.land_weight.shape, dtype)
+
+    @classmethod
+    def predator_prey(cls, mice, fox, landscape, timestep):
+        """
+        Creates the two-species simulation of the Mice and Fox model of Simulation.
+
+        The death rate of the mice is the rate at which foxes eat them and the birth rate of the
+        foxes the rate at which eating mice feeds them, so both enter the interaction matrix
+        rather than the per-species rates.
+
+        Parameters:
+        mice (Mice): Instance of Mice class representing the mice population.
+        fox (Fox): Instance of Fox class representing the fox population.
+        landscape (Landscape): Instance of Landscape class representing the environment.
+        timestep (float): The time interval for each simulation step.
+
+        Returns:
+        MultiSpeciesSimulation: The simulation of the species 'Mice' and 'Fox', in that order.
+        """
+        if not isinstance(mice, Mice) or not isinstance(fox, Fox):
+            raise ValueError("Mice and Fox should be instances of the Mice and Fox classes.")
+        simulation = cls([mice, fox], [[0, -mice.death_rate], [fox.birth_rate, 0]], landscape, timestep)
+        simulation.growth[:, 0] = [mice.birth_rate, -fox.death_rate]
+        return simulation
+
+    def run(self):
+        """
+        Runs the simulation of every species for one time step.
+        """
+        current = self.current_pop
+        inner = current[:, 1:-1, 1:-1]
+
+        # Per-capita rates over the padded grid: growth + interactions @ populations. The halo
+        # and water squares hold no population, so they add nothing.
+        rates = self.rates.reshape(self.species, -1)
+        np.matmul(self.interactions, current.reshape(self.species, -1), out=rates)
+        rates += self.growth
+        rates *= current.reshape(self.species, -1)
+
+        # Diffusion of every species, into the scratch buffer
+        diffusion = self.scratch
+        np.add(current[:, :-2, 1:-1], current[:, 2:, 1:-1], out=diffusion)
+        diffusion += current[:, 1:-1, :-2]
+        diffusion += current[:, 1:-1, 2:]
+        diffusion -= self.neighbours * inner
+        diffusion *= self.diffusion
+
+        # next = max(0, current + timestep * (rates + diffusion)) on land, zero on water
+        diffusion += self.rates[:, 1:-1, 1:-1]
+        diffusion *= self.timestep
+        diffusion += inner
+        np.maximum(diffusion, 0, out=diffusion)
+        np.multiply(diffusion, self.land_weight, out=self.next_pop[:, 1:-1, 1:-1])
+
+        # Swap the current and next populations for the next iteration
+        self.current_pop, self.next_pop = self.next_pop, self.current_pop
+
+    def max_change_rate(self):
+        """
+        Calculates the largest rate of change of any population over the last step.
+
+        Returns:
+        float: The largest absolute change divided by the time step.
+        """
+        return float(np.max(np.abs(self.current_pop - self.next_pop))) / self.timestep
+
+    @property
+    def get_max(self):
+        """
+        Gets the maximum population of each species.
+
+        Returns:
+        ndarray: The maximum population of each species.
+        """
+        return np.max(self.current_pop, axis=(1, 2))
+
+    @property
+    def get_avg(self):
+        """
+        Gets the average population of each species.
+
+        Returns:
+        ndarray: The average population of each species, accumulated in double precision.
+        """
+        nlands = self.landscape.land_squares
+        if nlands == 0:
+            return np.zeros(self.species)
+        return np.sum(self.current_pop, axis=(1, 2), dtype=float) / nlands
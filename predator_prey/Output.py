@@ -0,0 +1,130 @@
+import queue
+import threading
+import numpy as np
+from .Helpers import SimulationHelpers
+
+
+class AsyncOutputWriter(object):
+    """
+    Writes the console log and population maps on a background thread.
+
+    The step loop hands each output interval over with submit() and carries on stepping
+    while the writer thread formats and writes the files. The populations are copied
+    into one of a fixed set of preallocated snapshot buffers, so the simulation may
+    overwrite its own buffers straight away and no arrays are allocated per interval.
+    When every snapshot buffer is waiting to be written, submit() blocks until the
+    writer thread frees one, which bounds the memory used if the disk falls behind.
+
+    Outputs are written in the order they were submitted. An error raised while writing
+    is re-raised in the main thread by the next submit() or by close().
+    """
+
+    def __init__(self, shape, lscape, directory=".", ppm_format="P3", depth=2, helper=None, archive=None, dtype=float):
+        """
+        Initializes the writer and starts its thread.
+
+        Parameters:
+        shape (tuple): Shape of the padded population grids.
+        lscape (ndarray): The padded landscape.
+        directory (str): The directory in which the maps are written.
+        ppm_format (str): The format of the population maps, "P3" or "P6".
+        depth (int): Number of snapshot buffers, i.e. of intervals that may wait to be written.
+        helper (SimulationHelpers): The helper used to write the outputs.
+        archive (FrameArchiveWriter): The frame archive receiving the maps instead of PPM files, or None.
+        dtype (type): The floating point type of the populations, used for the snapshot buffers.
+        """
+        if depth < 1:
+            raise ValueError("Depth must be at least 1.")
+        self.lscape = lscape
+        self.directory = directory
+        self.ppm_format = ppm_format
+        self.helper = helper if helper is not None else SimulationHelpers()
+        self.archive = archive
+        self.error = None
+        self.reported = False
+
+        # Snapshot buffers are handed back through 'free' once written
+        self.free = queue.Queue()
+        for _ in range(depth):
+            self.free.put((np.empty(shape, dtype), np.empty(shape, dtype)))
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.work, name="output-writer", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, i, time, mice_avg, fox_avg, mice_max, fox_max, mice, fox):
+        """
+        Queues the outputs of one interval. Blocks while all snapshot buffers are in use.
+
+        Parameters:
+        i (int): The current timestep.
+        time (float): The current time.
+        mice_avg, fox_avg (float): The average populations.
+        mice_max, fox_max (float): The maximum populations, used to scale the map colours.
+        mice, fox (ndarray): The padded populations, copied before returning.
+
+        Raises:
+        RuntimeError: If the writer has been closed.
+        """
+        self.raise_error()
+        if not self.thread.is_alive():
+            raise RuntimeError("The output writer has been closed.")
+        mice_snapshot, fox_snapshot = self.free.get()
+        np.copyto(mice_snapshot, mice)
+        np.copyto(fox_snapshot, fox)
+        self.jobs.put((i, time, mice_avg, fox_avg, mice_max, fox_max, mice_snapshot, fox_snapshot))
+
+    def work(self):
+        """
+        Body of the writer thread: writes the queued intervals until it receives None.
+        After an error the remaining intervals are discarded, but their buffers are still
+        released so that submit() never blocks forever.
+        """
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                break
+            i, time, mice_avg, fox_avg, mice_max, fox_max, mice, fox = job
+            try:
+                if self.error is None:
+                    self.helper.log_averages(i, time, mice_avg, fox_avg)
+                    if self.archive is not None:
+                        self.archive.append(i, mice, fox, mice_max, fox_max)
+                    else:
+                        self.helper.write_population_map(i, mice, fox, mice_max, fox_max, self.lscape, self.directory, self.ppm_format)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.free.put((mice, fox))
+                self.jobs.task_done()
+
+    def raise_error(self):
+        """
+        Re-raises in the calling thread an error raised by the writer thread. The error is
+        raised only once, but the writer keeps discarding the later intervals.
+        """
+        if self.error is not None and not self.reported:
+            self.reported = True
+            raise self.error
+
+    def flush(self):
+        """
+        Waits until all queued intervals have been written and re-raises any write error.
+        """
+        self.jobs.join()
+        self.raise_error()
+
+    def close(self):
+        """
+        Writes all queued intervals, stops the writer thread and re-raises any write error.
+        """
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()
+        self.raise_error()
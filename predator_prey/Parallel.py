@@ -0,0 +1,304 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import weakref
+import numpy as np
+from .Simulation import Simulation
+from .Kernel import StencilKernel, split_rows
+
+# Commands sent from the main process to the workers through the control array
+STOP, RUN, STATISTICS = 0, 1, 2
+
+
+def attach(name, shape, dtype=float):
+    """
+    Attaches to a shared memory block and wraps it in an array.
+
+    Returns:
+    tuple: The SharedMemory instance and the array viewing it.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def band_worker(index, names, shape, first_row, land_rows, neighbour_rows, mice_rates, fox_rates, timestep, sync, step_barrier):
+    """
+    Worker process stepping one band of rows of the shared populations.
+
+    The worker waits on 'sync' for a command from the main process. For RUN it performs
+    the requested number of steps, waiting on 'step_barrier' after each one so that the
+    rows next to its band (its halo) written by the neighbouring workers are complete
+    before they are read. For STATISTICS it writes the partial sums and maxima of its
+    band. Each command is acknowledged by waiting on 'sync' again.
+
+    Parameters:
+    index (int): Index of the worker, used as its row in the statistics array.
+    names (dict): Names of the shared memory blocks.
+    shape (tuple): Shape of the padded population grids.
+    first_row (int): First padded row of the band.
+    land_rows, neighbour_rows (ndarray): The landscape and neighbour count rows of the band.
+    mice_rates, fox_rates (tuple): Birth, death and diffusion rates.
+    timestep (float): The time interval for each simulation step.
+    sync (Barrier): Barrier shared with the main process.
+    step_barrier (Barrier): Barrier shared by the workers only.
+    """
+    blocks = []
+    try:
+        buffers = {}
+        for key in ("mice_a", "mice_b", "fox_a", "fox_b"):
+            block, buffers[key] = attach(names[key], shape, names["dtype"])
+            blocks.append(block)
+        block, control = attach(names["control"], (2,), np.int64)
+        blocks.append(block)
+        block, stats = attach(names["stats"], (len(names["bands"]), 4))
+        blocks.append(block)
+
+        kernel = StencilKernel(land_rows, neighbour_rows, first_row, names["dtype"])
+        current_mice, next_mice = buffers["mice_a"], buffers["mice_b"]
+        current_fox, next_fox = buffers["fox_a"], buffers["fox_b"]
+
+        while True:
+            sync.wait()
+            command, steps = int(control[0]), int(control[1])
+            if command == STOP:
+                break
+            if command == RUN:
+                for _ in range(steps):
+                    kernel.step(mice_rates, fox_rates, timestep, current_mice, current_fox, next_mice, next_fox)
+                    step_barrier.wait()
+                    current_mice, next_mice = next_mice, current_mice
+                    current_fox, next_fox = next_fox, current_fox
+            elif command == STATISTICS:
+                stats[index] = kernel.statistics(current_mice, current_fox)
+            sync.wait()
+    except Exception:
+        # Release everybody waiting on this worker, the main process then raises
+        sync.abort()
+        step_barrier.abort()
+        raise
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class SharedMemorySimulation(Simulation):
+    """
+    Simulation stepping one landscape on several worker processes.
+
+    The padded grid is split into row bands, one per worker. The current and next
+    populations live in 'multiprocessing.shared_memory', so the one-row halo of each
+    band is exchanged by reading the rows of the neighbouring bands after a barrier
+    that ends every timestep. Each worker runs the allocation-free stencil kernel of the
+    'inplace' engine on its band, so the populations are bitwise identical to the serial
+    engines. Maxima are reduced from per-worker partial results and are exact. By
+    default the averages are summed over the shared populations in the same order as
+    the serial engines, so they are bitwise identical too. With 'exact_averages' off
+    they are reduced from per-worker partial sums instead, which agree with the serial
+    engines to within the rounding of the summation order (about 1e-15 relative).
+
+    The workers must be released with close(), or by using the simulation as a context manager.
+    """
+
+    ENGINES = ("shared",)
+
+    def __init__(self, mice, fox, landscape, timestep, workers=2, exact_averages=True):
+        """
+        Initializes SharedMemorySimulation and starts its worker processes.
+
+        mice (Mice): Instance of Mice class representing the mice population.
+        fox (Fox): Instance of Fox class representing the fox population.
+        landscape (Landscape): Instance of Landscape class representing the environment.
+        timestep (float): The time interval for each simulation step.
+        workers (int): Number of worker processes (at most one per interior row).
+        exact_averages (bool): Whether averages are summed in the order of the serial engines.
+        """
+        super().__init__(mice, fox, landscape, timestep, engine="vectorized")
+        if workers < 1:
+            raise ValueError("Workers must be at least 1.")
+        self.engine = "shared"
+        self.exact_averages = exact_averages
+
+        shape = self.current_mice_pop.shape
+        dtype = np.result_type(self.current_mice_pop, self.current_fox_pop, np.float32)
+        self.bands = split_rows(shape[0] - 2, workers)
+        self.workers = len(self.bands)
+
+        # Allocate the shared blocks and copy the initial populations into them
+        self.blocks = {}
+        arrays = {}
+        for key, initial in (("mice_a", self.current_mice_pop), ("mice_b", self.next_mice_pop),
+                             ("fox_a", self.current_fox_pop), ("fox_b", self.next_fox_pop)):
+            self.blocks[key] = shared_memory.SharedMemory(create=True, size=initial.size * dtype.itemsize)
+            arrays[key] = np.ndarray(shape, dtype, buffer=self.blocks[key].buf)
+            arrays[key][...] = initial
+        self.blocks["control"] = shared_memory.SharedMemory(create=True, size=2 * np.dtype(np.int64).itemsize)
+        self.control = np.ndarray((2,), np.int64, buffer=self.blocks["control"].buf)
+        self.blocks["stats"] = shared_memory.SharedMemory(create=True, size=self.workers * 4 * np.dtype(float).itemsize)
+        self.stats = np.ndarray((self.workers, 4), float, buffer=self.blocks["stats"].buf)
+
+        self.current_mice_pop, self.next_mice_pop = arrays["mice_a"], arrays["mice_b"]
+        self.current_fox_pop, self.next_fox_pop = arrays["fox_a"], arrays["fox_b"]
+
+        names = {key: block.name for key, block in self.blocks.items()}
+        names["bands"] = self.bands
+        names["dtype"] = dtype.str
+        context = multiprocessing.get_context("spawn")
+        self.sync = context.Barrier(self.workers + 1)
+        # The parent must keep the worker-only barrier alive for the workers to use it
+        self.step_barrier = context.Barrier(self.workers)
+        mice_rates = (mice.birth_rate, mice.death_rate, mice.diffusion_rate)
+        fox_rates = (fox.birth_rate, fox.death_rate, fox.diffusion_rate)
+        self.processes = []
+        for index, (r0, r1) in enumerate(self.bands):
+            process = context.Process(target=band_worker, daemon=True,
+                                      args=(index, names, shape, r0, landscape.landscape[r0:r1], landscape.neighbours[r0:r1],
+                                            mice_rates, fox_rates, timestep, self.sync, self.step_barrier))
+            process.start()
+            self.processes.append(process)
+
+        # Make sure the workers and shared blocks are released even without close()
+        self.finalizer = weakref.finalize(self, SharedMemorySimulation.release, self.processes, self.sync, self.blocks)
+
+    @staticmethod
+    def release(processes, sync, blocks):
+        """
+        Stops the worker processes and frees the shared memory blocks.
+        """
+        if any(process.is_alive() for process in processes):
+            np.ndarray((2,), np.int64, buffer=blocks["control"].buf)[0] = STOP
+            try:
+                sync.wait(timeout=10)
+            except Exception:
+                pass
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for block in blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # Arrays viewing the block are still referenced, the mapping goes with them
+                pass
+            block.unlink()
+
+    def close(self):
+        """
+        Stops the worker processes and frees the shared memory. The populations are copied
+        out of shared memory first so they remain readable.
+        """
+        super().close()
+        if self.finalizer.alive:
+            self.current_mice_pop, self.next_mice_pop = self.current_mice_pop.copy(), self.next_mice_pop.copy()
+            self.current_fox_pop, self.next_fox_pop = self.current_fox_pop.copy(), self.next_fox_pop.copy()
+            self.control, self.stats = self.control.copy(), self.stats.copy()
+            self.finalizer()
+
+    def command(self, command, steps=0):
+        """
+        Sends a command to the workers and waits until all of them have completed it.
+
+        Parameters:
+        command (int): STOP, RUN or STATISTICS.
+        steps (int): Number of steps for RUN.
+
+        Raises:
+        RuntimeError: If the workers have been stopped or one of them failed.
+        """
+        if not self.finalizer.alive:
+            raise RuntimeError("The workers of this simulation have been stopped.")
+        self.control[0], self.control[1] = command, steps
+        try:
+            self.sync.wait()
+            self.sync.wait()
+        except Exception:
+            raise RuntimeError("A worker process of the shared memory simulation failed.")
+
+    def run_steps(self, steps):
+        """
+        Runs the simulation for several time steps without returning control in between.
+
+        Parameters:
+        steps (int): Number of time steps.
+        """
+        self.command(RUN, steps)
+        if steps % 2:
+            self.current_mice_pop, self.next_mice_pop = self.next_mice_pop, self.current_mice_pop
+            self.current_fox_pop, self.next_fox_pop = self.next_fox_pop, self.current_fox_pop
+
+    def run(self):
+        """
+        Runs the simulation for one time step on the worker processes.
+        """
+        self.run_steps(1)
+
+    def reduce_statistics(self):
+        """
+        Collects the partial sums and maxima of the populations from the workers.
+
+        Returns:
+        tuple: Sum and maximum of the mice, then sum and maximum of the fox.
+        """
+        if not self.finalizer.alive:
+            # The workers are gone, reduce the copied populations directly
+            return (np.sum(self.current_mice_pop, dtype=float), np.max(self.current_mice_pop),
+                    np.sum(self.current_fox_pop, dtype=float), np.max(self.current_fox_pop))
+        self.command(STATISTICS)
+        return np.sum(self.stats[:, 0]), np.max(self.stats[:, 1]), np.sum(self.stats[:, 2]), np.max(self.stats[:, 3])
+
+    def average(self, population, index):
+        """
+        Calculates the average of a population over the land squares.
+
+        Parameters:
+        population (ndarray): The current population, used for exact averages.
+        index (int): Position of the population sum in the reduced statistics.
+
+        Returns:
+        float: The average population.
+        """
+        nlands = self.landscape.land_squares
+        if nlands == 0:
+            return 0
+        if self.exact_averages:
+            return np.sum(population, dtype=float) / nlands
+        return self.reduce_statistics()[index] / nlands
+
+    @property
+    def get_mice_max(self):
+        """
+        Gets the maximum population of mice, reduced across the workers.
+
+        Returns:
+        float: The maximum population of mice.
+        """
+        return self.reduce_statistics()[1]
+
+    @property
+    def get_fox_max(self):
+        """
+        Gets the maximum population of fox, reduced across the workers.
+
+        Returns:
+        float: The maximum population of fox.
+        """
+        return self.reduce_statistics()[3]
+
+    @property
+    def get_mice_avg(self):
+        """
+        Gets the average population of mice.
+
+        Returns:
+        float: The average population of mice.
+        """
+        return self.average(self.current_mice_pop, 0)
+
+    @property
+    def get_fox_avg(self):
+        """
+        Gets the average population of fox.
+
+        Returns:
+        float: The average population of fox.
+        """
+        return self.average(self.current_fox_pop, 2)
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+
+
+class NullPhase(object):
+    """
+    Phase timer of a disabled profiler: entering and leaving it does nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class PhaseTimer(object):
+    """
+    Accumulates the number of calls and the total time of one named phase.
+    """
+
+    def __init__(self, profiler, name):
+        """
+        Parameters:
+        profiler (Profiler): The profiler the phase belongs to.
+        name (str): The name of the phase.
+        """
+        self.profiler = profiler
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.calls += 1
+        self.seconds += end - self.start
+        if self.profiler.events is not None:
+            self.profiler.events.append((self.name, self.start, end - self.start, threading.get_ident()))
+        return False
+
+
+class Profiler(object):
+    """
+    Lightweight instrumentation of a simulation run: named phase timers and counters.
+
+    Code is instrumented with 'with profiler.phase(name):' blocks and profiler.count(name, value)
+    calls. A disabled profiler hands out a shared do-nothing phase and ignores counts, so the
+    instrumentation costs one method call per phase when profiling is off.
+
+    Each phase should be timed by a single thread at a time, as with the main loop and the
+    background output writer, which use different phase names.
+    """
+
+    def __init__(self, enabled=True, trace=False):
+        """
+        Parameters:
+        enabled (bool): Whether phases and counters are recorded.
+        trace (bool): Whether every phase call is also kept as an event, for write_trace().
+        """
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self.events = [] if enabled and trace else None
+        self.origin = time.perf_counter()
+
+    def phase(self, name):
+        """
+        Returns the timer of a phase, to be used as a context manager around the phase.
+
+        Parameters:
+        name (str): The name of the phase.
+
+        Returns:
+        PhaseTimer: The timer of the phase, or a do-nothing timer if the profiler is disabled.
+        """
+        if not self.enabled:
+            return NULL_PHASE
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers.setdefault(name, PhaseTimer(self, name))
+        return timer
+
+    def count(self, name, value=1):
+        """
+        Adds a value to a named counter, e.g. a number of steps or of bytes written.
+
+        Parameters:
+        name (str): The name of the counter.
+        value (int): The value added.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def wall(self):
+        """
+        Gets the wall time in seconds since the profiler was created.
+        """
+        return time.perf_counter() - self.origin
+
+    def summary(self):
+        """
+        Returns the recorded phases and counters.
+
+        Returns:
+        dict: The wall time, the calls and seconds of each phase, the counters and the
+              steps per second of the 'step' phase and of the whole run.
+        """
+        wall = self.wall
+        steps = self.counters.get("steps", 0)
+        step = self.timers.get("step")
+        return {"wall seconds": wall,
+                "phases": {name: {"calls": timer.calls, "seconds": timer.seconds} for name, timer in self.timers.items()},
+                "counters": dict(self.counters),
+                "steps per second": steps / step.seconds if step is not None and step.seconds > 0 else 0.0,
+                "steps per wall second": steps / wall if wall > 0 else 0.0}
+
+    def report(self):
+        """
+        Formats the summary as a table of the phases, slowest first, followed by the counters.
+
+        Returns:
+        str: The report.
+        """
+        summary = self.summary()
+        wall = summary["wall seconds"]
+        lines = ["{:<16} {:>10} {:>12} {:>12} {:>7}".format("phase", "calls", "total (s)", "mean (ms)", "% wall")]
+        phases = sorted(summary["phases"].items(), key=lambda item: -item[1]["seconds"])
+        for name, phase in phases:
+            lines.append("{:<16} {:>10} {:>12.4f} {:>12.4f} {:>7.1f}".format(
+                name, phase["calls"], phase["seconds"], 1e3 * phase["seconds"] / phase["calls"],
+                100 * phase["seconds"] / wall if wall > 0 else 0.0))
+        lines.append("{:<16} {:>10} {:>12.4f}".format("wall", "", wall))
+        for name, value in sorted(summary["counters"].items()):
+            lines.append("{:<16} {:>10}".format(name, value))
+        lines.append("Steps per second: {:.2f} stepping, {:.2f} overall".format(
+            summary["steps per second"], summary["steps per wall second"]))
+        return "\n".join(lines)
+
+    def write_trace(self, filename):
+        """
+        Writes the summary and the recorded events as a JSON trace, in the Trace Event
+        format read by chrome://tracing and Perfetto. Times are in microseconds since
+        the profiler was created.
+
+        Parameters:
+        filename (str): The trace file.
+        """
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": 1e6 * (start - self.origin), "dur": 1e6 * duration,
+                   "pid": pid, "tid": tid} for name, start, duration, tid in (self.events or [])]
+        with open(filename, "w") as f:
+            json.dump({"traceEvents": events, "summary": self.summary()}, f)
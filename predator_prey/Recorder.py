@@ -0,0 +1,198 @@
+import ast
+import os
+import numpy as np
+
+# Formats of the time series file: the plain-text averages table or a binary NumPy array
+AVERAGES_FORMATS = ("csv", "npy")
+
+# Record type of the binary time series, one record per output interval
+AVERAGES_DTYPE = np.dtype([("Timestep", "<i8"), ("Time", "<f8"), ("Mice", "<f8"), ("Foxes", "<f8")])
+
+# Size of the '.npy' header, fixed so that it can be rewritten in place as records are appended
+NPY_HEADER_SIZE = 192
+
+
+def npy_header(records):
+    """
+    Builds the fixed-size header of a version 1.0 '.npy' file holding 'records' time series records.
+
+    Parameters:
+    records (int): The number of records in the file.
+
+    Returns:
+    bytes: The header, NPY_HEADER_SIZE bytes long.
+    """
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(AVERAGES_DTYPE.descr, records)
+    padding = NPY_HEADER_SIZE - 10 - len(header) - 1
+    return b"\x93NUMPY\x01\x00" + np.uint16(NPY_HEADER_SIZE - 10).tobytes() + (header + " " * padding + "\n").encode("latin1")
+
+
+def read_npy_records(filename):
+    """
+    Reads the number of records from the header of a time series '.npy' file.
+
+    Parameters:
+    filename (str): The '.npy' file.
+
+    Returns:
+    int: The number of records.
+    """
+    with open(filename, "rb") as f:
+        header = f.read(NPY_HEADER_SIZE)[10:].decode("latin1")
+    return ast.literal_eval(header)["shape"][0]
+
+
+class TimeSeriesRecorder(object):
+    """
+    Records the averages of every output interval and writes them to disk in batches.
+
+    The timesteps, times and averages are kept in preallocated column buffers holding
+    'capacity' rows. When the buffers are full, or on flush() and close(), all buffered
+    rows are written with a single write call. This replaces the open, append and close
+    of the averages file for every row.
+
+    In "csv" format the file is the usual 'averages.csv' table, identical to the one
+    written row by row with SimulationHelpers.write_avg_file. In "npy" format it is a
+    NumPy array of AVERAGES_DTYPE records, readable with numpy.load. Its fixed-size
+    header is rewritten after every batch, so the file is valid after each flush.
+    """
+
+    def __init__(self, filename, capacity=1024, file_format="csv", resume_step=None):
+        """
+        Creates the time series file, truncating any existing one, and writes its header.
+
+        Parameters:
+        filename (str): The time series file.
+        capacity (int): Number of rows buffered before they are written.
+        file_format (str): "csv" or "npy".
+        resume_step (int): If given, the existing file is kept and appended to, after
+                           removing its rows for this timestep and later ones.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1.")
+        if file_format not in AVERAGES_FORMATS:
+            raise ValueError("Averages format must be one of {}.".format(", ".join(AVERAGES_FORMATS)))
+        self.filename = filename
+        self.file_format = file_format
+        self.columns = {name: np.zeros(capacity, AVERAGES_DTYPE[name]) for name in AVERAGES_DTYPE.names}
+        self.count = 0
+        self.written = 0
+        # Bytes of rows written by this recorder, headers excluded
+        self.bytes_written = 0
+
+        if resume_step is not None:
+            self.file = self.reopen(resume_step)
+        elif file_format == "npy":
+            self.file = open(filename, "wb")
+            self.file.write(npy_header(0))
+        else:
+            self.file = open(filename, "w")
+            self.file.write("Timestep,Time,Mice,Foxes\n")
+        self.file.flush()
+
+    def reopen(self, resume_step):
+        """
+        Opens the existing time series file for appending, after truncating it before the
+        first row whose timestep is 'resume_step' or later.
+
+        Parameters:
+        resume_step (int): The first timestep to be recorded again.
+
+        Returns:
+        file: The open file, positioned at its end.
+        """
+        if self.file_format == "npy":
+            records = read_npy_records(self.filename)
+            timesteps = np.memmap(self.filename, dtype=AVERAGES_DTYPE, mode="r", offset=NPY_HEADER_SIZE, shape=(records,))["Timestep"]
+            self.written = int(np.searchsorted(timesteps, resume_step))
+            del timesteps
+            f = open(self.filename, "r+b")
+            f.truncate(NPY_HEADER_SIZE + self.written * AVERAGES_DTYPE.itemsize)
+            f.write(npy_header(self.written))
+        else:
+            # Binary mode keeps byte offsets exact, rows are plain ASCII
+            f = open(self.filename, "r+b")
+            f.readline()
+            end = f.tell()
+            for line in iter(f.readline, b""):
+                # A row cut short by an interrupted write is dropped too
+                if not line.endswith(b"\n") or int(line.split(b",")[0]) >= resume_step:
+                    break
+                end = f.tell()
+                self.written += 1
+            f.truncate(end)
+            f.close()
+            f = open(self.filename, "a")
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def capacity(self):
+        """
+        Gets the number of rows buffered before they are written.
+        """
+        return self.columns["Timestep"].size
+
+    def record(self, timestep, time, mice, foxes):
+        """
+        Buffers the averages of one output interval, writing the batch if the buffers are full.
+
+        Parameters:
+        timestep (int): The current timestep.
+        time (float): The current time.
+        mice (float): The average number of mice.
+        foxes (float): The average number of foxes.
+        """
+        if self.file is None:
+            raise RuntimeError("The recorder has been closed.")
+        row = self.count
+        self.columns["Timestep"][row] = timestep
+        self.columns["Time"][row] = time
+        self.columns["Mice"][row] = mice
+        self.columns["Foxes"][row] = foxes
+        self.count += 1
+        if self.count == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows to the file.
+        """
+        if self.file is None or self.count == 0:
+            return
+        rows = self.count
+        if self.file_format == "npy":
+            records = np.empty(rows, AVERAGES_DTYPE)
+            for name in AVERAGES_DTYPE.names:
+                records[name] = self.columns[name][:rows]
+            data = records.tobytes()
+            self.file.write(data)
+            self.written += rows
+            self.file.seek(0)
+            self.file.write(npy_header(self.written))
+            self.file.seek(0, os.SEEK_END)
+        else:
+            columns = [self.columns[name][:rows].tolist() for name in AVERAGES_DTYPE.names]
+            data = "".join("{},{:.1f},{:.17f},{:.17f}\n".format(*row) for row in zip(*columns))
+            self.file.write(data)
+            self.written += rows
+        self.file.flush()
+        self.bytes_written += len(data)
+        self.count = 0
+
+    def close(self):
+        """
+        Writes the buffered rows and closes the file.
+        """
+        if self.file is not None:
+            try:
+                self.flush()
+            finally:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,257 @@
+import os
+import numpy as np
+from .Landscape import Landscape
+from .Animal import Mice, Fox
+from .Simulation import Simulation
+from .Parallel import SharedMemorySimulation
+from .Sparse import SparseSimulation
+from .Implicit import ImexSimulation, AdiSimulation
+from .Helpers import SimulationHelpers
+from .Recorder import TimeSeriesRecorder
+
+# Engines selectable by name, as in sim()
+ENGINES = (Simulation.ENGINES + SharedMemorySimulation.ENGINES + SparseSimulation.ENGINES
+           + ImexSimulation.ENGINES + AdiSimulation.ENGINES)
+
+# Floating point types of the populations
+PRECISIONS = ("float64", "float32")
+
+
+def create_simulation(mice, fox, landscape, timestep, engine="loop", workers=1, fused_statistics=False,
+                      integrator="euler", tolerance=None):
+    """
+    Creates the simulation of the given engine.
+
+    Parameters:
+    mice (Mice): Instance of Mice class representing the mice population.
+    fox (Fox): Instance of Fox class representing the fox population.
+    landscape (Landscape): Instance of Landscape class representing the environment.
+    timestep (float): The time interval for each simulation step.
+    engine (str): The stepping engine, one of ENGINES.
+    workers (int): Number of workers of the 'threaded' and 'shared' engines.
+    fused_statistics (bool): Whether the kernel engines compute the statistics while stepping.
+    integrator (str): The time integrator, one of Simulation.INTEGRATORS.
+    tolerance (float): The error allowed per step of an adaptive integrator, or None.
+
+    Returns:
+    Simulation: The simulation, to be closed after use.
+    """
+    if engine in SharedMemorySimulation.ENGINES:
+        return SharedMemorySimulation(mice, fox, landscape, timestep, workers)
+    if engine in SparseSimulation.ENGINES:
+        return SparseSimulation(mice, fox, landscape, timestep)
+    if engine in ImexSimulation.ENGINES:
+        return ImexSimulation(mice, fox, landscape, timestep)
+    if engine in AdiSimulation.ENGINES:
+        return AdiSimulation(mice, fox, landscape, timestep)
+    return Simulation(mice, fox, landscape, timestep, engine, workers, fused_statistics, integrator, tolerance)
+
+
+class SimulationParameters(object):
+    """
+    Parameters of a run, named and defaulted like the flags of the command-line interface,
+    except for the engine: it defaults to "vectorized", as in the parameter sweep, rather than
+    to the reference "loop" engine of the command line, which is much slower and gives the
+    same populations.
+    """
+
+    def __init__(self, birth_mice=0.1, death_mice=0.05, diffusion_mice=0.2, birth_foxes=0.03, death_foxes=0.09,
+                 diffusion_foxes=0.2, delta_t=0.5, time_step=10, duration=500, mouse_seed=1, fox_seed=1,
+                 engine="vectorized", workers=1, precision="float64", fused_stats=False, legacy_init=False,
+                 integrator="euler", tolerance=None):
+        """
+        Parameters:
+        birth_mice (float): Birth rate of mice.
+        death_mice (float): Rate at which foxes eat mice.
+        diffusion_mice (float): Diffusion rate of mice.
+        birth_foxes (float): Birth rate of foxes.
+        death_foxes (float): Rate at which foxes starve.
+        diffusion_foxes (float): Diffusion rate of foxes.
+        delta_t (float): Time step size.
+        time_step (int): Number of time steps between outputs.
+        duration (int): Time to run the simulation.
+        mouse_seed (int): Random seed for initialising mouse densities.
+        fox_seed (int): Random seed for initialising fox densities.
+        engine (str): Engine used to step the populations, one of ENGINES. Unlike the command line,
+                      whose default is "loop", the default is "vectorized".
+        workers (int): Number of workers of the parallel engines.
+        precision (str): Floating point type of the populations, "float64" or "float32".
+        fused_stats (bool): Whether the kernel engines compute the averages and maxima while stepping.
+        legacy_init (bool): Whether the initial densities are those of versions before the vectorized initialisation.
+        integrator (str): Time integrator, "euler", "heun" or "rk4".
+        tolerance (float): Error allowed per step of an adaptive heun or rk4 integrator, or None.
+        """
+        self.birth_mice = birth_mice
+        self.death_mice = death_mice
+        self.diffusion_mice = diffusion_mice
+        self.birth_foxes = birth_foxes
+        self.death_foxes = death_foxes
+        self.diffusion_foxes = diffusion_foxes
+        self.delta_t = delta_t
+        self.time_step = time_step
+        self.duration = duration
+        self.mouse_seed = mouse_seed
+        self.fox_seed = fox_seed
+        self.engine = engine
+        self.workers = workers
+        self.precision = precision
+        self.fused_stats = fused_stats
+        self.legacy_init = legacy_init
+        self.integrator = integrator
+        self.tolerance = tolerance
+
+    def validate(self):
+        """
+        Validates the parameters that are not checked when the populations and the engine are created.
+
+        Raises:
+        ValueError: If a parameter is invalid.
+        """
+        helper = SimulationHelpers()
+        helper.validate_delta(self.delta_t)
+        helper.validate_duration(self.duration)
+        helper.validate_log_interval(self.time_step, self.duration)
+        if self.time_step < 1:
+            raise ValueError("Time Step must be at least 1.")
+        if self.engine not in ENGINES:
+            raise ValueError("Engine must be one of {}.".format(", ".join(ENGINES)))
+        if self.precision not in PRECISIONS:
+            raise ValueError("Precision must be one of {}.".format(", ".join(PRECISIONS)))
+        if (self.integrator != "euler" or self.tolerance is not None) and self.engine != "vectorized":
+            raise ValueError("The {} integrator and a tolerance require the vectorized engine.".format(self.integrator))
+
+    @property
+    def total_time_steps(self):
+        """
+        Gets the number of time steps of the run.
+        """
+        return int(self.duration / self.delta_t)
+
+    @property
+    def output_timesteps(self):
+        """
+        Gets the timesteps at which the outputs are recorded, every 'time_step' time steps before the end.
+        """
+        return np.arange(0, self.total_time_steps, self.time_step)
+
+
+class RunResult(object):
+    """
+    Results of a run held in memory: the time series of the averages and maxima, one value
+    per output interval, and the selected frames of the populations.
+    """
+
+    def __init__(self, timesteps, delta_t, frame_timesteps, shape, dtype):
+        """
+        Allocates the time series and the frames.
+
+        Parameters:
+        timesteps (ndarray): The timesteps of the output intervals.
+        delta_t (float): The time step size.
+        frame_timesteps (ndarray): The timesteps of the frames kept.
+        shape (tuple): The height and width of the landscape.
+        dtype (type): The floating point type of the populations.
+        """
+        self.timesteps = timesteps
+        self.times = timesteps * delta_t
+        self.mice_avg = np.zeros(len(timesteps))
+        self.fox_avg = np.zeros(len(timesteps))
+        self.mice_max = np.zeros(len(timesteps))
+        self.fox_max = np.zeros(len(timesteps))
+        self.frame_timesteps = frame_timesteps
+        self.mice_frames = np.zeros((len(frame_timesteps),) + shape, dtype)
+        self.fox_frames = np.zeros((len(frame_timesteps),) + shape, dtype)
+
+    def __len__(self):
+        """
+        Returns the number of output intervals.
+        """
+        return len(self.timesteps)
+
+
+def load_landscape(landscape, compact=False):
+    """
+    Returns a Landscape for a Landscape, a grid array or a landscape file, without console output.
+    """
+    if isinstance(landscape, Landscape):
+        return landscape
+    return Landscape(landscape, compact=compact, verbose=False)
+
+
+def run_simulation(parameters, landscape, frames=None, log=False, outdir=None, ppm_format="P3", averages_format="csv"):
+    """
+    Runs a simulation and returns its results in memory.
+
+    The outputs are recorded at the same timesteps as by sim(), and their values are the same.
+    Nothing is printed or written unless asked for: with 'log' the averages of every output
+    interval are printed, and with 'outdir' the averages file and the population maps are
+    written into that directory, as by sim().
+
+    Parameters:
+    parameters (SimulationParameters): The parameters of the run, or None for the defaults.
+    landscape (Landscape): The landscape, which may also be given as a 2D integer grid without
+                           its halo or as a landscape file.
+    frames (object): The output timesteps whose populations are kept, as a sequence of timesteps,
+                     "all" for every output interval, or None for none.
+    log (bool): Whether the averages are printed.
+    outdir (str): The directory receiving the averages file and the maps, or None for no files.
+    ppm_format (str): The format of the maps written into 'outdir', "P3" or "P6".
+    averages_format (str): The format of the averages file written into 'outdir', "csv" or "npy".
+
+    Returns:
+    RunResult: The time series of the averages and maxima and the frames kept.
+
+    Raises:
+    ValueError: If a parameter is invalid, or a frame is not an output timestep.
+    """
+    parameters = parameters or SimulationParameters()
+    parameters.validate()
+    landscape = load_landscape(landscape)
+
+    timesteps = parameters.output_timesteps
+    if frames is None:
+        frame_timesteps = timesteps[:0]
+    elif isinstance(frames, str) and frames == "all":
+        frame_timesteps = timesteps
+    else:
+        frame_timesteps = np.unique(np.asarray(frames, dtype=int))
+        missing = np.setdiff1d(frame_timesteps, timesteps)
+        if missing.size:
+            raise ValueError("Frames must be output timesteps, not {}.".format(", ".join(map(str, missing))))
+    keep = np.isin(timesteps, frame_timesteps)
+
+    helper = SimulationHelpers()
+    mice = Mice(parameters.mouse_seed, parameters.diffusion_mice, parameters.birth_mice, parameters.death_mice, landscape,
+                parameters.precision, parameters.legacy_init)
+    fox = Fox(parameters.fox_seed, parameters.diffusion_foxes, parameters.birth_foxes, parameters.death_foxes, landscape,
+              parameters.precision, parameters.legacy_init)
+    simulation = create_simulation(mice, fox, landscape, parameters.delta_t, parameters.engine, parameters.workers,
+                                   parameters.fused_stats, parameters.integrator, parameters.tolerance)
+    result = RunResult(timesteps, parameters.delta_t, frame_timesteps, (landscape.height, landscape.width), mice.dtype)
+
+    recorder = None
+    try:
+        if outdir is not None:
+            recorder = TimeSeriesRecorder(os.path.join(outdir, "averages." + averages_format), file_format=averages_format)
+        frame = 0
+        # The run stops at the last output, the steps after it would not change any result
+        for index, record in enumerate(simulation.iter_steps(int(timesteps[-1]), every=parameters.time_step)):
+            result.mice_avg[index] = record.mice_avg
+            result.fox_avg[index] = record.fox_avg
+            result.mice_max[index] = record.mice_max
+            result.fox_max[index] = record.fox_max
+            if keep[index]:
+                result.mice_frames[frame] = record.mice
+                result.fox_frames[frame] = record.fox
+                frame += 1
+            if log:
+                helper.log_averages(record.timestep, record.time, record.mice_avg, record.fox_avg)
+            if recorder is not None:
+                recorder.record(record.timestep, record.time, record.mice_avg, record.fox_avg)
+                helper.write_population_map(record.timestep, simulation.current_mice_pop, simulation.current_fox_pop,
+                                            record.mice_max, record.fox_max, landscape.landscape, outdir, ppm_format)
+    finally:
+        simulation.close()
+        if recorder is not None:
+            recorder.close()
+    return result
@@ -1,13 +1,57 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from .Landscape import Landscape
 from .Animal import Mice, Fox
+from .Kernel import StencilKernel, split_rows
+from .Integrators import RungeKuttaIntegrator, TABLEAUS
+
+# State of a simulation yielded by Simulation.iter_steps()
+StepRecord = namedtuple("StepRecord", ["timestep", "time", "mice_avg", "fox_avg", "mice_max", "fox_max", "mice", "fox"])
 
 class Simulation(object):
     """
     Main class for the animal model simulation.
+
+    The following stepping engines are available:
+
+    * ``loop`` updates each land cell in turn with a Python double loop.
+    * ``vectorized`` updates the whole land mask at once with array stencils on the
+      padded halo. It evaluates the same expression in the same order as the loop
+      engine, so the two engines agree to within 1e-12 (in practice they are equal).
+    * ``inplace`` evaluates the same stencil as ``vectorized`` but writes every
+      intermediate into a fixed set of preallocated scratch buffers with ``out=``
+      ufunc calls, so stepping performs no per-step array allocations.
+    * ``threaded`` splits the rows into one tile per worker thread and runs the
+      ``inplace`` kernel of each tile in a thread pool. NumPy releases the GIL inside
+      the ufunc loops, so the tiles are stepped concurrently. Every tile reads the
+      current populations and writes only its own rows of the next populations, and
+      the buffers are swapped once all tiles are done.
+    * ``active`` splits the rows into tiles of TILE_ROWS rows and keeps a bitmap of the
+      tiles that may hold mice or foxes. Only tiles that are populated, or next to a
+      populated tile, are stepped, so the active region grows by at least one cell per
+      step to follow diffusion. Every other tile is known to stay at exactly zero, so
+      the results are identical to a full update. 'tiles_stepped' and 'tiles_skipped'
+      count the tile updates performed and avoided.
+
+    Engines holding resources (the thread pool) release them in close(); a Simulation
+    can also be used as a context manager.
+
+    The engines take forward Euler steps. With the ``vectorized`` engine the populations
+    can instead be integrated with Heun's method (``heun``) or the classic fourth-order
+    Runge-Kutta method (``rk4``). Given a 'tolerance', these adapt their step size to an
+    embedded error estimate, and advance() lands exactly on the requested time.
     """
 
-    def __init__(self, mice, fox, landscape, timestep):
+    ENGINES = ("loop", "vectorized", "inplace", "threaded", "active")
+
+    INTEGRATORS = tuple(TABLEAUS)
+
+    # Number of rows of each tile of the 'active' engine
+    TILE_ROWS = 16
+
+    def __init__(self, mice, fox, landscape, timestep, engine="loop", workers=1, fused_statistics=False,
+                 integrator="euler", tolerance=None):
 
         """
         Initializes Simulation with Mice, Fox, Landscape instances, and a timestep.
@@ -16,6 +60,14 @@ class Simulation(object):
         fox (Fox): Instance of Fox class representing the fox population.
         landscape (Landscape): Instance of Landscape class representing the environment.
         timestep (int): The time interval for each simulation step.
+        engine (str): The stepping engine, one of Simulation.ENGINES.
+        workers (int): Number of threads of the 'threaded' engine.
+        fused_statistics (bool): Whether the 'inplace', 'threaded' and 'active' engines compute the
+                                 statistics of the populations while stepping.
+        integrator (str): The time integrator, one of Simulation.INTEGRATORS. Integrators other than
+                          "euler" need the 'vectorized' engine.
+        tolerance (float): If given, the relative and absolute error allowed per step, and the step
+                           size of the integrator is adapted to it. The 'timestep' is the first step size.
         """
               
         # Input validation
@@ -23,6 +75,16 @@ class Simulation(object):
             raise ValueError("Mice and Fox should be instances of the Mice and Fox classes.")
         if not isinstance(landscape, Landscape):
             raise ValueError("Landscape should be an instance of the Landscape class.")
+        if engine not in Simulation.ENGINES:
+            raise ValueError(f"Engine must be one of {', '.join(Simulation.ENGINES)}.")
+        if workers < 1:
+            raise ValueError("Workers must be at least 1.")
+        if integrator not in Simulation.INTEGRATORS:
+            raise ValueError(f"Integrator must be one of {', '.join(Simulation.INTEGRATORS)}.")
+        if integrator != "euler" and engine != "vectorized":
+            raise ValueError(f"The {integrator} integrator requires the vectorized engine.")
+        if tolerance is not None and (tolerance <= 0 or not TABLEAUS[integrator].adaptive):
+            raise ValueError("A tolerance must be positive and needs the heun or rk4 integrator.")
 
         # Initialize the parameters
         self.mice = mice
@@ -33,32 +95,126 @@ class Simulation(object):
         self.current_fox_pop = fox.population
         self.next_fox_pop = fox.population.copy()
         self.timestep = timestep
+        self.engine = engine
+        self.workers = workers
+        self.integrator = integrator
+        self.tolerance = tolerance
 
         # Cache the indices of land squares for efficiency
         self.land_squares = np.where(self.landscape.landscape == 1)
+        # Boolean mask of the land squares in the interior (halo excluded)
+        self.land_mask = self.landscape.landscape[1:-1, 1:-1] != 0
+
+        # Stencil kernels (one per tile) owning the scratch buffers of the 'inplace' and
+        # 'threaded' engines, and the thread pool of the 'threaded' engine
+        self.kernels = []
+        self.executor = None
+        if self.engine == "inplace":
+            self.allocate_scratch_buffers()
+        elif self.engine == "threaded":
+            self.allocate_scratch_buffers(self.workers)
+            self.executor = ThreadPoolExecutor(max_workers=len(self.kernels))
+        elif self.engine == "active":
+            self.allocate_scratch_buffers(-(-(self.landscape.landscape.shape[0] - 2) // self.TILE_ROWS))
+
+        # Activity bitmaps of the current and next buffers for the 'active' engine: a
+        # tile whose flag is off holds only zeros
+        self.tiles_stepped = 0
+        self.tiles_skipped = 0
+        if self.engine == "active":
+            self.calculate_activity()
+
+        # Per-tile sums and maxima of the current populations, computed by the kernels while
+        # stepping if 'fused_statistics' is on, and valid while 'statistics_fresh' is set
+        self.fused_statistics = fused_statistics and bool(self.kernels)
+        self.tile_statistics = np.zeros((len(self.kernels), 4))
+        self.statistics_fresh = False
+
+        # Runge-Kutta integrator of the populations, None for the forward Euler of the engines.
+        # 'adaptive_step' is the step size the adaptive integrator tries next.
+        self.stepper = None
+        if integrator != "euler":
+            self.stepper = RungeKuttaIntegrator(TABLEAUS[integrator], self.calculate_derivatives)
+            self.land_weight = self.land_mask.astype(self.current_mice_pop.dtype)
+        self.adaptive_step = timestep
+        self.steps_taken = 0
+        self.steps_rejected = 0
+        # Duration of the last step, or of the last adaptive advance()
+        self.last_duration = timestep
+
+    def calculate_activity(self):
+        """
+        Sets the activity bitmaps of the 'active' engine from the contents of the population buffers.
+        """
+        self.current_activity = np.array([kernel.is_populated(self.current_mice_pop, self.current_fox_pop) for kernel in self.kernels])
+        self.next_activity = np.array([kernel.is_populated(self.next_mice_pop, self.next_fox_pop) for kernel in self.kernels])
+
+    def allocate_scratch_buffers(self, tiles=1):
+        """
+        Creates the stencil kernels, and with them the scratch buffers, used by the 'inplace' and 'threaded' engines.
+
+        Parameters:
+        tiles (int): Number of row tiles, each one with its own kernel.
+        """
+        # Scratch buffers match float32 populations, anything else is computed in float64
+        dtype = np.result_type(self.current_mice_pop, self.current_fox_pop, np.float32)
+        self.kernels = [StencilKernel(self.landscape.landscape[r0:r1], self.landscape.neighbours[r0:r1], r0, dtype)
+                        for r0, r1 in split_rows(self.landscape.landscape.shape[0] - 2, tiles)]
+
+    def close(self):
+        """
+        Releases the resources held by the engine.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def restore(self, current_mice, current_fox, next_mice=None, next_fox=None):
+        """
+        Replaces the populations, e.g. with those saved in a checkpoint. The values are
+        copied into the existing buffers, which the engine keeps using. With fused statistics
+        the per-tile sums and maxima are recomputed by the kernels, over the same bands and
+        in the same order as while stepping, so the averages of a resumed run are identical
+        to those of an uninterrupted one.
+
+        Parameters:
+        current_mice, current_fox (ndarray): The padded current populations.
+        next_mice, next_fox (ndarray): The padded next populations, if saved.
+        """
+        np.copyto(self.current_mice_pop, current_mice)
+        np.copyto(self.current_fox_pop, current_fox)
+        if next_mice is not None and next_fox is not None:
+            np.copyto(self.next_mice_pop, next_mice)
+            np.copyto(self.next_fox_pop, next_fox)
+        if self.engine == "active":
+            self.calculate_activity()
+        if self.fused_statistics:
+            for index, kernel in enumerate(self.kernels):
+                self.tile_statistics[index] = kernel.statistics(self.current_mice_pop, self.current_fox_pop)
+        self.statistics_fresh = self.fused_statistics
+
+    def __enter__(self):
+        return self
 
-    def calculate_diffusion(self, current_pop, diffusion_rate):
-        # Make use of numpy's vectorized operations to calculate diffusion for all cells at once
+    def __exit__(self, *exc):
+        self.close()
 
+    def calculate_grid_diffusion(self, current_pop, diffusion_rate):
         """
-        Calculates diffusion based on the current population state and diffusion rate.
+        Calculates the diffusion for every interior cell of the landscape at once.
+
+        The stencil is built from slices of the padded population grid, so the halo
+        provides the zero boundary and no wrap-around takes place.
+
+        Parameters:
+        current_pop (ndarray): The current (padded) population grid.
+        diffusion_rate (float): The diffusion rate.
 
-        current_pop (ndarray): Current population grid.
-        x (int): x-coordinate of the landscape.
-        y (int): y-coordinate of the landscape.
-        diffusion_rate (float): Diffusion rate.
-        
         Returns:
-        float: Calculated diffusion.
-        """
-        
-        diffused_pop = diffusion_rate * (
-            np.roll(current_pop, -1, axis=0) + np.roll(current_pop, 1, axis=0) +
-            np.roll(current_pop, -1, axis=1) + np.roll(current_pop, 1, axis=1) -
-            self.landscape.neighbours * current_pop
-        )
-        return diffused_pop
-    
+        ndarray: The calculated diffusion for the interior cells, shape (height, width).
+        """
+        return diffusion_rate * (current_pop[:-2, 1:-1] + current_pop[2:, 1:-1] + current_pop[1:-1, :-2] + current_pop[1:-1, 2:] - self.landscape.neighbours[1:-1, 1:-1] * current_pop[1:-1, 1:-1])
+
     @property
     def get_mice_max(self):
 
@@ -68,8 +224,9 @@ class Simulation(object):
         Returns:
         int: The maximum population of mice.
         """
-        
-        return self.mice.calculate_max()
+        if self.statistics_fresh:
+            return self.tile_statistics[:, 1].max()
+        return self.mice.calculate_max(self.current_mice_pop)
 
     @property
     def get_fox_max(self):
@@ -79,8 +236,9 @@ class Simulation(object):
         Returns:
         int: The maximum population of fox.
         """
-
-        return self.fox.calculate_max()
+        if self.statistics_fresh:
+            return self.tile_statistics[:, 3].max()
+        return self.fox.calculate_max(self.current_fox_pop)
     
     @property
     def get_mice_avg(self):
@@ -90,8 +248,9 @@ class Simulation(object):
         Returns:
         float: The average population of mice.
         """
-        
-        return self.mice.calculate_average(self.landscape.land_squares)
+        if self.statistics_fresh:
+            return self.fused_average(0)
+        return self.mice.calculate_average(self.landscape.land_squares, self.current_mice_pop)
 
     @property
     def get_fox_avg(self):
@@ -101,7 +260,22 @@ class Simulation(object):
         Returns:
         float: The average population of fox.
         """
-        return self.fox.calculate_average(self.landscape.land_squares)
+        if self.statistics_fresh:
+            return self.fused_average(2)
+        return self.fox.calculate_average(self.landscape.land_squares, self.current_fox_pop)
+
+    def fused_average(self, column):
+        """
+        Calculates an average population from the per-tile sums computed while stepping.
+
+        Parameters:
+        column (int): Column of the population sums in 'tile_statistics', 0 for mice and 2 for fox.
+
+        Returns:
+        float: The average population.
+        """
+        nlands = self.landscape.land_squares
+        return np.sum(self.tile_statistics[:, column]) / nlands if nlands != 0 else 0
 
     def calculate_diffusion(self, current_pop, x, y, diffusion_rate):
         """
@@ -148,11 +322,10 @@ class Simulation(object):
         # Update next population
         self.next_fox_pop[x, y] = max(0, self.current_fox_pop[x, y] + self.timestep * (fox_birth - fox_death + fox_diffusion))
 
-    def run(self):
+    def update_populations_loop(self):
         """
-        Runs the simulation for each time step.
+        Updates the mice and fox populations of every land cell, one cell at a time.
         """
-        # Loop over each time step
         for x in range(1, self.landscape.height + 1):
             for y in range(1, self.landscape.width + 1):
                 # If the cell at (x, y) is land, update the mice and fox populations
@@ -160,6 +333,255 @@ class Simulation(object):
                     self.update_mice_population(x, y)
                     self.update_fox_population(x, y)
 
+    def update_populations_vectorized(self):
+        """
+        Updates the mice and fox populations of all land cells at once using array stencils.
+        """
+        mice = self.current_mice_pop[1:-1, 1:-1]
+        fox = self.current_fox_pop[1:-1, 1:-1]
+
+        # Calculate birth, death, and diffusion rates for the whole grid
+        mouse_birth = self.mice.birth_rate * mice
+        mouse_death = self.mice.death_rate * mice * fox
+        mouse_diffusion = self.calculate_grid_diffusion(self.current_mice_pop, self.mice.diffusion_rate)
+        fox_birth = self.fox.birth_rate * mice * fox
+        fox_death = self.fox.death_rate * fox
+        fox_diffusion = self.calculate_grid_diffusion(self.current_fox_pop, self.fox.diffusion_rate)
+
+        next_mice = np.maximum(0, mice + self.timestep * (mouse_birth - mouse_death + mouse_diffusion))
+        next_fox = np.maximum(0, fox + self.timestep * (fox_birth - fox_death + fox_diffusion))
+
+        # Only land cells are updated, water cells keep their (zero) population
+        self.next_mice_pop[1:-1, 1:-1][self.land_mask] = next_mice[self.land_mask]
+        self.next_fox_pop[1:-1, 1:-1][self.land_mask] = next_fox[self.land_mask]
+
+    def update_populations_inplace(self):
+        """
+        Updates the mice and fox populations of all land cells without allocating temporary arrays.
+        """
+        self.kernels[0].step((self.mice.birth_rate, self.mice.death_rate, self.mice.diffusion_rate),
+                             (self.fox.birth_rate, self.fox.death_rate, self.fox.diffusion_rate),
+                             self.timestep, self.current_mice_pop, self.current_fox_pop, self.next_mice_pop, self.next_fox_pop,
+                             self.tile_statistics[0] if self.fused_statistics else None)
+
+    def update_populations_threaded(self):
+        """
+        Updates the mice and fox populations with one thread per tile of rows.
+
+        All tiles read the current populations and write disjoint rows of the next
+        populations, and this method returns only once every tile is complete.
+        """
+        args = ((self.mice.birth_rate, self.mice.death_rate, self.mice.diffusion_rate),
+                (self.fox.birth_rate, self.fox.death_rate, self.fox.diffusion_rate),
+                self.timestep, self.current_mice_pop, self.current_fox_pop, self.next_mice_pop, self.next_fox_pop)
+        futures = [self.executor.submit(kernel.step, *args, self.tile_statistics[index] if self.fused_statistics else None)
+                   for index, kernel in enumerate(self.kernels)]
+        for future in futures:
+            future.result()
+
+    def update_populations_active(self):
+        """
+        Updates the mice and fox populations of the active tiles only.
+
+        A tile is active if it, or a tile next to it, may hold a non-zero population.
+        Inactive tiles are skipped; their rows of the next populations are cleared if
+        they still hold values from two steps ago.
+        """
+        populated = self.current_activity
+        active = populated.copy()
+        active[1:] |= populated[:-1]
+        active[:-1] |= populated[1:]
+
+        mice_rates = (self.mice.birth_rate, self.mice.death_rate, self.mice.diffusion_rate)
+        fox_rates = (self.fox.birth_rate, self.fox.death_rate, self.fox.diffusion_rate)
+        for index, kernel in enumerate(self.kernels):
+            if active[index]:
+                if self.fused_statistics:
+                    # Populations are never negative, so a tile is populated if either maximum is positive
+                    statistics = self.tile_statistics[index]
+                    kernel.step(mice_rates, fox_rates, self.timestep, self.current_mice_pop, self.current_fox_pop, self.next_mice_pop, self.next_fox_pop, statistics)
+                    self.next_activity[index] = statistics[1] > 0 or statistics[3] > 0
+                else:
+                    kernel.step(mice_rates, fox_rates, self.timestep, self.current_mice_pop, self.current_fox_pop, self.next_mice_pop, self.next_fox_pop)
+                    self.next_activity[index] = kernel.is_populated(self.next_mice_pop, self.next_fox_pop)
+                self.tiles_stepped += 1
+            else:
+                if self.next_activity[index]:
+                    kernel.clear(self.next_mice_pop, self.next_fox_pop)
+                    self.next_activity[index] = False
+                self.tile_statistics[index] = 0
+                self.tiles_skipped += 1
+
+        self.current_activity, self.next_activity = self.next_activity, self.current_activity
+
+    def calculate_derivatives(self, state):
+        """
+        Calculates the time derivative of the populations, the right-hand side of the equations
+        that the engines step with forward Euler.
+
+        Parameters:
+        state (ndarray): The padded mice and fox populations, stacked along the first axis.
+
+        Returns:
+        ndarray: The derivative of the state, zero on water and on the halo.
+        """
+        mice, fox = state[0], state[1]
+        inner_mice = mice[1:-1, 1:-1]
+        inner_fox = fox[1:-1, 1:-1]
+        derivatives = np.zeros_like(state)
+        derivatives[0, 1:-1, 1:-1] = (self.mice.birth_rate * inner_mice - self.mice.death_rate * inner_mice * inner_fox
+                                      + self.calculate_grid_diffusion(mice, self.mice.diffusion_rate))
+        derivatives[1, 1:-1, 1:-1] = (self.fox.birth_rate * inner_mice * inner_fox - self.fox.death_rate * inner_fox
+                                      + self.calculate_grid_diffusion(fox, self.fox.diffusion_rate))
+        # Only land cells change, water cells keep their (zero) population
+        derivatives[:, 1:-1, 1:-1] *= self.land_weight
+        return derivatives
+
+    def update_populations_integrator(self):
+        """
+        Updates the mice and fox populations with one fixed-size step of the Runge-Kutta integrator.
+        """
+        state, _ = self.stepper.step(np.stack((self.current_mice_pop, self.current_fox_pop)), self.timestep)
+        np.maximum(state, 0, out=state)
+        np.copyto(self.next_mice_pop, state[0])
+        np.copyto(self.next_fox_pop, state[1])
+
+    def advance(self, duration):
+        """
+        Advances the populations by 'duration', ending exactly at that time.
+
+        Without a tolerance this takes duration / timestep steps with run(). Otherwise the
+        adaptive integrator takes steps of any size, each one accepted only if its estimated
+        error is within the tolerance, and shortens the last step to land on 'duration'.
+
+        Parameters:
+        duration (float): The time to advance by.
+
+        Raises:
+        RuntimeError: If the step size becomes too small to make progress.
+        """
+        if self.tolerance is None:
+            for _ in range(int(round(duration / self.timestep))):
+                self.run()
+            return
+
+        state = np.stack((self.current_mice_pop, self.current_fox_pop))
+        # The next buffers keep the populations before the advance, like after run()
+        np.copyto(self.next_mice_pop, self.current_mice_pop)
+        np.copyto(self.next_fox_pop, self.current_fox_pop)
+        self.last_duration = duration
+        elapsed = 0.0
+        while elapsed < duration:
+            step = min(self.adaptive_step, duration - elapsed)
+            last = step == duration - elapsed
+            if step <= 1e-12 * duration:
+                raise RuntimeError(f"The step size of the {self.integrator} integrator fell below {step:.3g}.")
+            new_state, error = self.stepper.step(state, step, estimate_error=True)
+            norm = self.stepper.error_norm(error, state, new_state, self.tolerance)
+            factor = self.stepper.step_factor(norm)
+            if norm <= 1:
+                state = np.maximum(new_state, 0, out=new_state)
+                elapsed = duration if last else elapsed + step
+                self.steps_taken += 1
+                # A last step cut short says little about the next step size
+                if not (last and step < self.adaptive_step):
+                    self.adaptive_step = step * factor
+            else:
+                self.steps_rejected += 1
+                self.adaptive_step = step * factor
+
+        np.copyto(self.current_mice_pop, state[0])
+        np.copyto(self.current_fox_pop, state[1])
+        self.statistics_fresh = False
+
+    @property
+    def skipped_fraction(self):
+        """
+        Gets the fraction of tile updates skipped by the 'active' engine so far.
+
+        Returns:
+        float: The skipped fraction, 0 if no step has been taken.
+        """
+        total = self.tiles_stepped + self.tiles_skipped
+        return self.tiles_skipped / total if total else 0.0
+
+    def iter_steps(self, n, every=1, copy=False, start=0):
+        """
+        Runs the simulation for 'n' time steps, yielding the state before the first step and after
+        every 'every' steps.
+
+        The populations of each record are read-only views of the interior (halo excluded) of the
+        current buffers, so no data is copied. They are only valid until the generator is resumed,
+        since the next steps reuse the buffers. Consumers keeping the populations of several
+        records ask for copies with 'copy'.
+
+        Parameters:
+        n (int): The number of time steps to run.
+        every (int): The number of time steps between records.
+        copy (bool): Whether the populations of each record are copies owned by the consumer.
+        start (int): The timestep of the current state, e.g. after resuming from a checkpoint.
+
+        Yields:
+        StepRecord: The timestep, time, averages, maxima and populations of the mice and fox, at
+                    timesteps start, start + every, ... and start + n.
+        """
+        if n < 0 or every < 1:
+            raise ValueError("The number of steps must not be negative and 'every' must be at least 1.")
+        i = start
+        while True:
+            mice = self.current_mice_pop[1:-1, 1:-1]
+            fox = self.current_fox_pop[1:-1, 1:-1]
+            if copy:
+                mice, fox = mice.copy(), fox.copy()
+            else:
+                mice, fox = mice.view(), fox.view()
+                mice.flags.writeable = fox.flags.writeable = False
+            yield StepRecord(i, i * self.timestep, self.get_mice_avg, self.get_fox_avg, self.get_mice_max, self.get_fox_max, mice, fox)
+
+            steps = min(every, start + n - i)
+            if steps == 0:
+                return
+            if self.tolerance is not None:
+                self.advance(steps * self.timestep)
+            else:
+                for _ in range(steps):
+                    self.run()
+            i += steps
+
+    def max_change_rate(self):
+        """
+        Calculates the largest rate of change of any population over the last step.
+
+        After a step the next buffers hold the populations before it, so the change is
+        the difference between the current and next buffers.
+
+        Returns:
+        float: The largest absolute change divided by the duration of the step.
+        """
+        change = max(np.max(np.abs(self.current_mice_pop - self.next_mice_pop)),
+                     np.max(np.abs(self.current_fox_pop - self.next_fox_pop)))
+        return float(change) / self.last_duration
+
+    def run(self):
+        """
+        Runs the simulation for one time step with the selected engine.
+        """
+        if self.stepper is not None:
+            self.update_populations_integrator()
+        elif self.engine == "active":
+            self.update_populations_active()
+        elif self.engine == "threaded":
+            self.update_populations_threaded()
+        elif self.engine == "inplace":
+            self.update_populations_inplace()
+        elif self.engine == "vectorized":
+            self.update_populations_vectorized()
+        else:
+            self.update_populations_loop()
+
+        self.steps_taken += 1
         # Swap the current and next populations for the next iteration
         self.current_mice_pop, self.next_mice_pop = self.next_mice_pop, self.current_mice_pop
-        self.current_fox_pop, self.next_fox_pop = self.next_fox_pop, self.current_fox_pop
\ No newline at end of file
+        self.current_fox_pop, self.next_fox_pop = self.next_fox_pop, self.current_fox_pop
+        # The statistics computed while stepping are those of the new current populations
+        self.statistics_fresh = self.fused_statistics
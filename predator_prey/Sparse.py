@@ -0,0 +1,285 @@
+import numpy as np
+from .Simulation import Simulation
+
+
+class LandGraph(object):
+    """
+    Compact representation of the land squares of a landscape.
+
+    Land squares are numbered 0..N-1 in row-major order of the padded grid. Their
+    land neighbours are stored CSR-style: the neighbours of square i are
+    'indices[indptr[i]:indptr[i+1]]', in the order up, down, left, right.
+
+    For stepping, the same index is also kept as a fixed-width table 'directions' of
+    shape (4, N+1): row d holds the neighbour of every square in direction d (up, down,
+    left, right). Water neighbours point to a sentinel square N that always holds zero,
+    so the neighbour sum is accumulated in exactly the order of the dense stencil.
+    Population vectors therefore have length N+1.
+    """
+
+    def __init__(self, landscape):
+        """
+        Builds the land numbering and the neighbour index from a landscape.
+
+        Parameters:
+        landscape (Landscape): The landscape. Its halo must be water.
+        """
+        grid = landscape.landscape
+        self.shape = grid.shape
+        land = (grid != 0).reshape(-1)
+        row = grid.shape[1]
+
+        # Flat positions of the land squares in the padded grid, and the inverse numbering
+        self.positions = np.flatnonzero(land)
+        self.size = self.positions.size
+        numbering = np.full(land.size, self.size, np.int64)
+        numbering[self.positions] = np.arange(self.size)
+
+        # Neighbours in the same order as the dense stencil: up, down, left, right
+        candidates = np.stack([self.positions - row, self.positions + row, self.positions - 1, self.positions + 1], axis=1)
+        valid = land[candidates]
+        counts = valid.sum(axis=1)
+        self.indptr = np.zeros(self.size + 1, np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        # Row-major boolean indexing keeps the neighbours of each square together and in order
+        self.indices = numbering[candidates[valid]]
+
+        # Water neighbours are numbered as the sentinel, which is its own neighbour
+        self.directions = np.full((4, self.size + 1), self.size, np.int64)
+        self.directions[:, :self.size] = numbering[candidates].T
+
+        # Neighbour counts of Landscape.neighbours folded in, zero for the sentinel
+        self.neighbours = np.append(landscape.neighbours.reshape(-1)[self.positions], 0).astype(float)
+
+    def gather(self, grid, out=None):
+        """
+        Collects the land squares of a padded grid into a vector of length N+1.
+
+        Parameters:
+        grid (ndarray): A padded 2-D array.
+        out (ndarray): Optional vector receiving the values, of the grid's floating point type if not given.
+
+        Returns:
+        ndarray: The land values followed by the zero sentinel.
+        """
+        if out is None:
+            out = np.zeros(self.size + 1, np.result_type(grid, np.float32))
+        out[:self.size] = grid.reshape(-1)[self.positions]
+        out[self.size] = 0
+        return out
+
+    def scatter(self, values, out=None):
+        """
+        Writes a land vector back into a padded 2-D grid. Water squares are left untouched.
+
+        Parameters:
+        values (ndarray): A vector of length N or N+1.
+        out (ndarray): Optional padded grid receiving the values, zero-filled and of the type of 'values' if not given.
+
+        Returns:
+        ndarray: The padded grid.
+        """
+        if out is None:
+            out = np.zeros(self.shape, values.dtype)
+        out.reshape(-1)[self.positions] = values[:self.size]
+        return out
+
+
+class SparseSimulation(Simulation):
+    """
+    Simulation stepping only the land squares, for water-heavy landscapes.
+
+    The populations are held as vectors of land squares (see LandGraph) and each step
+    gathers the neighbour populations through the CSR index, so the work and the
+    scratch memory of a step scale with the number of land squares rather than with
+    the bounding box. The populations are scattered back to 2-D grids only when
+    'current_mice_pop' or 'current_fox_pop' is read, e.g. to write a map.
+
+    The update evaluates the same expression in the same order as the 'loop' engine,
+    skipping only the zero contributions of water neighbours, so the populations are
+    identical. Averages are summed over the land vector and agree with the dense
+    engines to within the rounding of the summation order.
+    """
+
+    ENGINES = ("sparse",)
+
+    def __init__(self, mice, fox, landscape, timestep):
+        """
+        Initializes SparseSimulation with Mice, Fox, Landscape instances, and a timestep.
+
+        mice (Mice): Instance of Mice class representing the mice population.
+        fox (Fox): Instance of Fox class representing the fox population.
+        landscape (Landscape): Instance of Landscape class representing the environment.
+        timestep (float): The time interval for each simulation step.
+        """
+        # The graph must exist before the base class assigns the populations
+        self.graph = LandGraph(landscape)
+        self.mice_grid = None
+        self.fox_grid = None
+        self.mice_land = None
+        self.fox_land = None
+        super().__init__(mice, fox, landscape, timestep, engine="vectorized")
+        self.engine = "sparse"
+
+        # The dense next buffers are not needed
+        self.next_mice_pop = self.next_fox_pop = None
+        dtype = np.result_type(self.mice_land, self.fox_land)
+        self.next_mice_land = np.zeros(self.graph.size + 1, dtype)
+        self.next_fox_land = np.zeros(self.graph.size + 1, dtype)
+        self.scratch = [np.empty(self.graph.size + 1, dtype) for _ in range(4)]
+        self.neighbours = self.graph.neighbours.astype(dtype)
+
+    @property
+    def current_mice_pop(self):
+        """
+        The current mice population as a padded 2-D grid, scattered from the land vector.
+        """
+        self.mice_grid = self.graph.scatter(self.mice_land, self.mice_grid)
+        return self.mice_grid
+
+    @current_mice_pop.setter
+    def current_mice_pop(self, grid):
+        # Once allocated, the vector keeps its type whatever the type of the grid
+        self.mice_land = self.graph.gather(grid, self.mice_land)
+
+    @property
+    def current_fox_pop(self):
+        """
+        The current fox population as a padded 2-D grid, scattered from the land vector.
+        """
+        self.fox_grid = self.graph.scatter(self.fox_land, self.fox_grid)
+        return self.fox_grid
+
+    @current_fox_pop.setter
+    def current_fox_pop(self, grid):
+        self.fox_land = self.graph.gather(grid, self.fox_land)
+
+    def restore(self, current_mice, current_fox, next_mice=None, next_fox=None):
+        """
+        Replaces the populations with padded grids, e.g. those saved in a checkpoint. The
+        values are gathered into the existing land vectors, keeping their type. The next
+        populations are not needed, since every step overwrites them.
+        """
+        self.current_mice_pop = current_mice
+        self.current_fox_pop = current_fox
+
+    def calculate_land_diffusion(self, current, diffusion_rate, out, tmp):
+        """
+        Calculates the diffusion of every land square into 'out'.
+
+        Parameters:
+        current (ndarray): The current land population vector.
+        diffusion_rate (float): The diffusion rate.
+        out (ndarray): Vector receiving the diffusion.
+        tmp (ndarray): Scratch vector.
+
+        Returns:
+        ndarray: The 'out' vector.
+        """
+        up, down, left, right = self.graph.directions
+        # The indices are known to be valid, 'clip' spares the bounds-checking buffer
+        np.take(current, up, out=out, mode="clip")
+        np.take(current, down, out=tmp, mode="clip")
+        np.add(out, tmp, out=out)
+        np.take(current, left, out=tmp, mode="clip")
+        np.add(out, tmp, out=out)
+        np.take(current, right, out=tmp, mode="clip")
+        np.add(out, tmp, out=out)
+        np.multiply(self.neighbours, current, out=tmp)
+        np.subtract(out, tmp, out=out)
+        return np.multiply(out, diffusion_rate, out=out)
+
+    def apply_update(self, current, birth, death, diffusion, out):
+        """
+        Writes 'max(0, current + timestep * (birth - death + diffusion))' into 'out'.
+        The 'birth' vector is overwritten.
+        """
+        np.subtract(birth, death, out=birth)
+        np.add(birth, diffusion, out=birth)
+        np.multiply(birth, self.timestep, out=birth)
+        np.add(current, birth, out=out)
+        np.maximum(out, 0, out=out)
+
+    def run(self):
+        """
+        Runs the simulation for one time step over the land squares.
+        """
+        mice, fox = self.mice_land, self.fox_land
+        diffusion, birth, death, tmp = self.scratch
+
+        # Mice: birth = r * mice, death = a * mice * fox
+        self.calculate_land_diffusion(mice, self.mice.diffusion_rate, diffusion, tmp)
+        np.multiply(mice, self.mice.birth_rate, out=birth)
+        np.multiply(mice, self.mice.death_rate, out=death)
+        np.multiply(death, fox, out=death)
+        self.apply_update(mice, birth, death, diffusion, self.next_mice_land)
+
+        # Fox: birth = b * mice * fox, death = m * fox
+        self.calculate_land_diffusion(fox, self.fox.diffusion_rate, diffusion, tmp)
+        np.multiply(mice, self.fox.birth_rate, out=birth)
+        np.multiply(birth, fox, out=birth)
+        np.multiply(fox, self.fox.death_rate, out=death)
+        self.apply_update(fox, birth, death, diffusion, self.next_fox_land)
+
+        # Swap the current and next populations for the next iteration
+        self.mice_land, self.next_mice_land = self.next_mice_land, self.mice_land
+        self.fox_land, self.next_fox_land = self.next_fox_land, self.fox_land
+
+    def max_change_rate(self):
+        """
+        Calculates the largest rate of change of any population over the last step, from the
+        current and next land vectors.
+
+        Returns:
+        float: The largest absolute change divided by the time step.
+        """
+        change = max(np.max(np.abs(self.mice_land - self.next_mice_land)),
+                     np.max(np.abs(self.fox_land - self.next_fox_land)))
+        return float(change) / self.timestep
+
+    def average(self, values):
+        """
+        Calculates the average of a land vector over the land squares.
+        """
+        nlands = self.landscape.land_squares
+        return np.sum(values[:self.graph.size], dtype=float) / nlands if nlands != 0 else 0
+
+    @property
+    def get_mice_max(self):
+        """
+        Gets the maximum population of mice.
+
+        Returns:
+        float: The maximum population of mice.
+        """
+        return np.max(self.mice_land)
+
+    @property
+    def get_fox_max(self):
+        """
+        Gets the maximum population of fox.
+
+        Returns:
+        float: The maximum population of fox.
+        """
+        return np.max(self.fox_land)
+
+    @property
+    def get_mice_avg(self):
+        """
+        Gets the average population of mice.
+
+        Returns:
+        float: The average population of mice.
+        """
+        return self.average(self.mice_land)
+
+    @property
+    def get_fox_avg(self):
+        """
+        Gets the average population of fox.
+
+        Returns:
+        float: The average population of fox.
+        """
+        return self.average(self.fox_land)
@@ -0,0 +1,53 @@
+'''Landscape conversion. Converts text landscape files to the binary landscape format and back.
+
+Binary landscapes are '.npy' files of the grid without its halo, stored as uint8 when
+possible. They can be given to the simulation instead of the text file and are memory
+mapped when loaded.
+'''
+from argparse import ArgumentParser
+import numpy as np
+from .Landscape import Landscape, write_landscape_binary
+
+
+def convert(source, destination):
+    """
+    Converts a landscape file. A text map is written as a binary landscape, a binary
+    landscape ('.npy') as a text map.
+
+    Args:
+        source (str): The landscape file to convert.
+        destination (str): The converted file. Binary landscapes must end with '.npy'.
+
+    Returns:
+        tuple: The width and height of the landscape.
+
+    Raises:
+        ValueError: If both or neither of the files are binary landscapes.
+    """
+    if source.endswith(".npy") == destination.endswith(".npy"):
+        raise ValueError("Exactly one of the source and destination must be a binary '.npy' landscape.")
+    landscape = Landscape(source)
+    grid = landscape.landscape[1:-1, 1:-1]
+    if destination.endswith(".npy"):
+        write_landscape_binary(destination, grid)
+    else:
+        with open(destination, "w") as f:
+            f.write("{} {}\n".format(landscape.width, landscape.height))
+            np.savetxt(f, grid, fmt="%d")
+    return landscape.width, landscape.height
+
+
+def convertCommLineIntf():
+    """
+    The command-line interface for the landscape conversion.
+    """
+    par=ArgumentParser()
+    par.add_argument("source",type=str,help="Landscape file to convert, a text map or a binary '.npy' landscape")
+    par.add_argument("destination",type=str,help="Converted landscape file, binary if it ends with '.npy'")
+    args=par.parse_args()
+    w, h = convert(args.source, args.destination)
+    print("Converted {} ({} x {}) to {}".format(args.source, w, h, args.destination))
+
+
+if __name__ == "__main__":
+    convertCommLineIntf()
@@ -0,0 +1,63 @@
+'''Frame archive rendering. Writes maps of a frame archive as PPM files.
+
+Runs with '--map-archive' append their population maps to one compressed archive,
+'maps.ppa', instead of writing a PPM file per output interval. This tool lists the
+timesteps of an archive and renders any of them, giving the same files the run would
+have written.
+'''
+from argparse import ArgumentParser
+import os
+from .Archive import FrameArchive
+from .Helpers import PPM_FORMATS
+
+
+def render(filename, timesteps=None, directory=".", ppm_format="P3"):
+    """
+    Renders maps of a frame archive as PPM files named 'map_{timestep:04d}.ppm'.
+
+    Args:
+        filename (str): The frame archive.
+        timesteps (list): The timesteps to render, or None for all of them.
+        directory (str): The directory in which the maps are written.
+        ppm_format (str): "P3" or "P6".
+
+    Returns:
+        list: The files written.
+
+    Raises:
+        KeyError: If the archive holds no frame for one of the timesteps.
+    """
+    written = []
+    with FrameArchive(filename) as archive:
+        for timestep in (archive.timesteps.tolist() if timesteps is None else timesteps):
+            name = os.path.join(directory, "map_{:04d}.ppm".format(timestep))
+            archive.render(timestep, name, ppm_format)
+            written.append(name)
+    return written
+
+
+def renderCommLineIntf():
+    """
+    The command-line interface for rendering frame archives.
+    """
+    par=ArgumentParser()
+    par.add_argument("archive",type=str,help="Frame archive written with --map-archive")
+    par.add_argument("-s","--timestep",type=int,action="append",default=None,help="Timestep to render, may be repeated")
+    par.add_argument("-a","--all",action="store_true",help="Render every timestep of the archive")
+    par.add_argument("-l","--list",action="store_true",help="List the mode, size and timesteps of the archive")
+    par.add_argument("-o","--output-dir",type=str,default=".",help="Directory in which the maps are written")
+    par.add_argument("-p","--ppm-format",type=str,default="P3",choices=PPM_FORMATS,help="Format of the maps: plain-text P3 or binary P6")
+    args=par.parse_args()
+    if args.list:
+        with FrameArchive(args.archive) as archive:
+            print("{} maps of {} x {}, {}".format(len(archive), archive.shape[1], archive.shape[0], archive.mode))
+            print(" ".join(map(str, archive.timesteps.tolist())))
+    if args.all or args.timestep:
+        written = render(args.archive, None if args.all else args.timestep, args.output_dir, args.ppm_format)
+        print("Rendered {} maps into {}".format(len(written), args.output_dir))
+    elif not args.list:
+        par.error("Nothing to do: give --timestep, --all or --list")
+
+
+if __name__ == "__main__":
+    renderCommLineIntf()
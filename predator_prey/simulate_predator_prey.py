@@ -3,11 +3,27 @@
 Version 3.0, last updated in September 2023.
 '''
 from argparse import ArgumentParser
+import os
 import numpy as np
 from .Landscape import Landscape
 from .Animal import Fox, Mice
 from .Simulation import Simulation
-from .Helpers import SimulationHelpers
+from .Runner import create_simulation, ENGINES, PRECISIONS
+from .Helpers import SimulationHelpers, PPM_FORMATS
+from .Output import AsyncOutputWriter
+from .Recorder import TimeSeriesRecorder, AVERAGES_FORMATS
+from .Checkpoint import save_checkpoint, resume_checkpoint
+from .Profiler import Profiler
+from .Convergence import ConvergenceMonitor
+from .Archive import FrameArchiveWriter, ARCHIVE_FILE, ARCHIVE_MODES
+
+
+# Parameters that must match for a checkpoint to be resumed
+CHECKPOINT_PARAMETERS = ("mice birth rate", "mice death rate", "mice diffusion", "fox birth rate", "fox death rate",
+                         "fox diffusion", "time step", "mice seed", "fox seed", "precision", "integrator", "tolerance")
+
+# Record of a run that stopped early, relative to the output directory
+STOP_FILE = "stopped.csv"
 
 
 def simCommLineIntf():
@@ -25,54 +41,287 @@ def simCommLineIntf():
     par.add_argument("-t","--time_step",type=int,default=10,help="Number of time steps at which to output files")
     par.add_argument("-d","--duration",type=int,default=500,help="Time to run the simulation (in timesteps)")
     par.add_argument("-f","--landscape-file",type=str,required=True,
-                        help="Input landscape file")
+                        help="Input landscape file, a text map or a binary '.npy' landscape")
+    par.add_argument("-pr","--precision",type=str,default="float64",choices=PRECISIONS,help="Floating point type of the populations")
+    par.add_argument("-c","--compact",action="store_true",help="Store the landscape as uint8 and the neighbour counts as int8")
+    par.add_argument("-fu","--fused-stats",action="store_true",help="Compute the averages and maxima while stepping (inplace, threaded and active engines)")
+    par.add_argument("-lc","--landscape-cache",action="store_true",help="Cache a text landscape in binary form and reuse the cache while the file is unchanged")
     par.add_argument("-ms","--mouse-seed",type=int,default=1,help="Random seed for initialising mouse densities")
     par.add_argument("-fs","--fox-seed",type=int,default=1,help="Random seed for initialising fox densities")
+    par.add_argument("-li","--legacy-init",action="store_true",help="Initialise the densities with the values of versions before the vectorized initialisation")
+    par.add_argument("-e","--engine",type=str,default="loop",choices=ENGINES,help="Engine used to step the populations")
+    par.add_argument("-in","--integrator",type=str,default="euler",choices=Simulation.INTEGRATORS,help="Time integrator, heun and rk4 need the vectorized engine")
+    par.add_argument("-tol","--tolerance",type=float,default=None,help="Error allowed per step of an adaptive heun or rk4 integrator")
+    par.add_argument("-w","--workers",type=int,default=os.cpu_count(),help="Number of workers of the parallel engines")
+    par.add_argument("-p","--ppm-format",type=str,default="P3",choices=PPM_FORMATS,help="Format of the population maps: plain-text P3 or binary P6")
+    par.add_argument("-ao","--async-output",action="store_true",help="Write the output files on a background thread while the simulation continues")
+    par.add_argument("-af","--averages-format",type=str,default="csv",choices=AVERAGES_FORMATS,help="Format of the averages file: averages.csv or binary averages.npy")
+    par.add_argument("-fe","--flush-every",type=int,default=1024,help="Number of averages rows buffered before they are written")
+    par.add_argument("-ce","--checkpoint-every",type=int,default=0,help="Number of time steps between checkpoints, 0 for none")
+    par.add_argument("-cf","--checkpoint-file",type=str,default="checkpoint.ppc",help="Checkpoint file, relative to the output directory")
+    par.add_argument("--resume",action="store_true",help="Resume from the checkpoint file if it exists")
+    par.add_argument("-pf","--profile",action="store_true",help="Print the time spent in each phase of the run at the end")
+    par.add_argument("-pt","--profile-trace",type=str,default=None,help="Write the profile and every timed phase to this JSON trace file")
+    par.add_argument("-ct","--convergence-tolerance",type=float,default=None,help="Stop once the populations change by at most this much per unit of time")
+    par.add_argument("-cw","--convergence-window",type=int,default=0,help="Compare the averages of this many output intervals with the convergence tolerance instead, 0 for none")
+    par.add_argument("-et","--extinction-threshold",type=float,default=None,help="Stop once no population is above this threshold")
+    par.add_argument("-fr","--fill-remaining",action="store_true",help="After an early stop, write the outputs of the remaining intervals from the final state")
+    par.add_argument("-ma","--map-archive",type=str,default=None,choices=ARCHIVE_MODES,help="Append the maps as colour codes or raw populations to one compressed archive, maps.ppa, instead of PPM files")
+    par.add_argument("-mc","--archive-chunk",type=int,default=64,help="Number of maps per compressed chunk of the archive")
     # Parsing arguments
     args=par.parse_args()
+    if args.convergence_window and args.convergence_tolerance is None:
+        par.error("-cw/--convergence-window requires -ct/--convergence-tolerance")
     # Running the simulation with arguments
-    sim(args.birth_mice,args.death_mice,args.diffusion_mice,args.birth_foxes,args.death_foxes,args.diffusion_foxes,args.delta_t,args.time_step,args.duration,args.landscape_file,args.mouse_seed,args.fox_seed)
+    sim(args.birth_mice,args.death_mice,args.diffusion_mice,args.birth_foxes,args.death_foxes,args.diffusion_foxes,args.delta_t,args.time_step,args.duration,args.landscape_file,args.mouse_seed,args.fox_seed,args.engine,workers=args.workers,ppm_format=args.ppm_format,async_output=args.async_output,averages_format=args.averages_format,flush_every=args.flush_every,
+        checkpoint_every=args.checkpoint_every,checkpoint_file=args.checkpoint_file,resume=args.resume,
+        landscape_cache=args.landscape_cache,precision=args.precision,compact=args.compact,
+        fused_statistics=args.fused_stats,legacy_init=args.legacy_init,
+        profile=args.profile,profile_trace=args.profile_trace,
+        integrator=args.integrator,tolerance=args.tolerance,
+        convergence_tolerance=args.convergence_tolerance,convergence_window=args.convergence_window,
+        extinction_threshold=args.extinction_threshold,fill_remaining=args.fill_remaining,
+        map_archive=args.map_archive,archive_chunk=args.archive_chunk)
+
+
+def next_event(i, total_time_steps, print_interval, checkpoint_every):
+    """
+    Finds the first time step after 'i' at which an output or checkpoint is due, or the run ends.
 
+    Args:
+        i (int): The current time step.
+        total_time_steps (int): The number of time steps of the run.
+        print_interval (int): The number of time steps between outputs.
+        checkpoint_every (int): The number of time steps between checkpoints, 0 for none.
 
-def sim(r,a,k,b,m,l,dt,t,d,lfile,mseed,fseed):
+    Returns:
+        int: The time step of the next event.
+    """
+    events = [total_time_steps, (i // print_interval + 1) * print_interval]
+    if checkpoint_every > 0:
+        events.append((i // checkpoint_every + 1) * checkpoint_every)
+    return min(events)
+
+
+def sim(r,a,k,b,m,l,dt,t,d,lfile,mseed,fseed,engine="loop",outdir=".",workers=1,ppm_format="P3",async_output=False,averages_format="csv",flush_every=1024,
+        checkpoint_every=0,checkpoint_file="checkpoint.ppc",resume=False,
+        landscape_cache=False,precision="float64",compact=False,
+        fused_statistics=False,legacy_init=False,
+        profile=False,profile_trace=None,
+        integrator="euler",tolerance=None,
+        convergence_tolerance=None,convergence_window=0,extinction_threshold=None,fill_remaining=False,
+        map_archive=None,archive_chunk=64):
     """
     The main function for running the simulation based on parsed arguments.
+
+    The landscape may be given either as a file name or as an already loaded Landscape.
+    With 'landscape_cache' a text landscape file is cached in binary form next to the file.
+    'precision' is the floating point type of the populations, "float64" or "float32", and with
+    'compact' a landscape loaded from a file is stored as uint8 with int8 neighbour counts.
+    With 'fused_statistics' the kernel engines compute the averages and maxima while stepping.
+    With 'legacy_init' the initial densities are the same as those drawn with the 'random' module
+    by earlier versions, for comparisons with their outputs.
+    The averages file and the population maps are written into the directory 'outdir'.
+    'workers' sets the number of worker threads or processes of the 'threaded' and 'shared' engines.
+    'ppm_format' selects plain-text ("P3") or binary ("P6") population maps.
+    With 'async_output' the outputs are written on a background thread while the simulation continues.
+    The averages are written to 'averages.csv', or 'averages.npy' if 'averages_format' is "npy",
+    in batches of 'flush_every' rows.
+    Every 'checkpoint_every' time steps the state is saved to 'checkpoint_file' (relative to 'outdir').
+    With 'resume' the run continues from that checkpoint, if it exists, and produces the same outputs
+    as an uninterrupted run.
+    'integrator' selects forward Euler ("euler"), Heun's method ("heun") or the classic Runge-Kutta
+    method ("rk4"), the latter two with the "vectorized" engine. With a 'tolerance' their step size
+    adapts to the error of each step and steps may span several time steps 'dt', but every output
+    and checkpoint is still made exactly at its time.
+    With 'profile' the time spent in each phase (stepping, statistics, logging, map and averages
+    writing, checkpoints) is printed at the end, and with 'profile_trace' it is also written, with
+    every timed phase, to that JSON trace file.
+    The run stops early once no population is above 'extinction_threshold', or once it is steady:
+    with a 'convergence_tolerance', when the populations change by at most that much per unit of
+    time over a step, or, with a 'convergence_window', when the averages of that many output
+    intervals differ by at most that fraction. The criteria are checked at every output interval
+    after the first step. The reason is logged and written to 'stopped.csv', and with
+    'fill_remaining' the remaining intervals are output from the final state, as if it did not
+    change any more.
+    With 'map_archive' the population maps are appended to one compressed archive, 'maps.ppa',
+    instead of being written as PPM files: "colours" stores their 8-bit colour codes and "raw" the
+    populations, in chunks of 'archive_chunk' maps. render_archive writes any of them as a PPM file.
+
+    Returns:
+        dict: The averages and maxima recorded at the last output interval, and the 'stop reason'
+              of a run that stopped early.
     """
-    helper = SimulationHelpers()
+    profiler = Profiler(enabled=profile or profile_trace is not None, trace=profile_trace is not None)
+    helper = SimulationHelpers(profiler)
 
     # Validating simulation parameters
     helper.validate_delta(dt)
     helper.validate_duration(d)
     helper.validate_log_interval(t, d)
+    monitor = ConvergenceMonitor(convergence_tolerance, convergence_window, extinction_threshold)
     
     # Setting up parameters for simulation
     parameters = {"mice birth rate": r, "mice death rate": a, "mice diffusion": k, "fox birth rate": b,
                   "fox death rate": m, "fox diffusion": l, "time step": dt, "print interval": t, "duration": d, 
-                  "landscape file": lfile, "mice seed": mseed, "fox seed": fseed}
+                  "landscape file": lfile, "mice seed": mseed, "fox seed": fseed,
+                  "engine": engine, "workers": workers, "ppm format": ppm_format,
+                  "async output": async_output, "averages format": averages_format, "flush every": flush_every,
+                  "checkpoint every": checkpoint_every, "checkpoint file": checkpoint_file, "resume": resume,
+                  "landscape cache": landscape_cache, "precision": precision, "compact": compact,
+                  "fused statistics": fused_statistics, "legacy init": legacy_init,
+                  "profile": profile, "profile trace": profile_trace,
+                  "integrator": integrator, "tolerance": tolerance,
+                  "convergence tolerance": convergence_tolerance, "convergence window": convergence_window,
+                  "extinction threshold": extinction_threshold, "fill remaining": fill_remaining,
+                  "map archive": map_archive, "archive chunk": archive_chunk}
 
     # Load the landscape from the given file and calculate the number of land cells
-    landscape = Landscape(parameters["landscape file"])
+    with profiler.phase("landscape"):
+        if isinstance(parameters["landscape file"], Landscape):
+            landscape = parameters["landscape file"]
+        else:
+            landscape = Landscape(parameters["landscape file"], parameters["landscape cache"], parameters["compact"])
+
+    if parameters["precision"] not in PRECISIONS:
+        raise ValueError("Precision must be one of {}.".format(", ".join(PRECISIONS)))
+    if (parameters["integrator"] != "euler" or parameters["tolerance"] is not None) and parameters["engine"] != "vectorized":
+        raise ValueError("The {} integrator and a tolerance require the vectorized engine.".format(parameters["integrator"]))
 
     # Initialize mice and fox populations from the given seed files and parameters
-    mice = Mice(parameters["mice seed"], parameters["mice diffusion"], parameters["mice birth rate"], parameters["mice death rate"], landscape)
-    fox = Fox(parameters["fox seed"], parameters["fox diffusion"], parameters["fox birth rate"], parameters["fox death rate"], landscape)
-    predator_prey = Simulation(mice, fox, landscape, parameters["time step"])
-    
+    with profiler.phase("initialisation"):
+        mice = Mice(parameters["mice seed"], parameters["mice diffusion"], parameters["mice birth rate"], parameters["mice death rate"], landscape, parameters["precision"], parameters["legacy init"])
+        fox = Fox(parameters["fox seed"], parameters["fox diffusion"], parameters["fox birth rate"], parameters["fox death rate"], landscape, parameters["precision"], parameters["legacy init"])
+        predator_prey = create_simulation(mice, fox, landscape, parameters["time step"], parameters["engine"], parameters["workers"], parameters["fused statistics"],
+                                          parameters["integrator"], parameters["tolerance"])
+
     total_time_steps = int(parameters["duration"] / parameters["time step"])
-    helper.log_averages(0, 0, predator_prey.get_mice_avg, predator_prey.get_fox_avg)
 
-    with open("averages.csv","w") as f:
-        hdr="Timestep,Time,Mice,Foxes\n"
-        f.write(hdr)
+    # Resume from the checkpoint if asked to and one exists
+    checkpoint_file = os.path.join(outdir, parameters["checkpoint file"])
+    state_parameters = {key: parameters[key] for key in CHECKPOINT_PARAMETERS}
+    start = 0
+    if parameters["resume"] and os.path.isfile(checkpoint_file):
+        try:
+            start = resume_checkpoint(checkpoint_file, predator_prey, state_parameters)
+        except Exception:
+            predator_prey.close()
+            raise
+        print("Resuming from checkpoint {} at timestep {}".format(checkpoint_file, start))
+    helper.log_averages(start, start * parameters["time step"], predator_prey.get_mice_avg, predator_prey.get_fox_avg)
+
+    avg_file = os.path.join(outdir, "averages." + parameters["averages format"])
+    recorder = TimeSeriesRecorder(avg_file, parameters["flush every"], parameters["averages format"], start if start else None)
+
+    archive = None
+    if parameters["map archive"] is not None:
+        try:
+            archive = FrameArchiveWriter(os.path.join(outdir, ARCHIVE_FILE), landscape.landscape, parameters["map archive"], mice.dtype,
+                                         parameters["archive chunk"], resume_step=start if start else None, helper=helper)
+        except Exception:
+            predator_prey.close()
+            recorder.close()
+            raise
+
+    writer = None
+    if parameters["async output"]:
+        writer = AsyncOutputWriter(landscape.landscape.shape, landscape.landscape, outdir, parameters["ppm format"], helper=helper, archive=archive,
+                                   dtype=mice.dtype)
+
+    # A record of an earlier run stopping early no longer applies
+    stop_file = os.path.join(outdir, STOP_FILE)
+    if os.path.isfile(stop_file):
+        os.remove(stop_file)
+
+    def write_outputs(i, summary):
+        # Records the averages of the summary and writes the population maps of timestep i
+        with profiler.phase("averages"):
+            recorder.record(i, summary["time"], summary["mice avg"], summary["fox avg"])
+        profiler.count("intervals")
+        if writer is not None:
+            with profiler.phase("output submit"):
+                writer.submit(i, summary["time"], summary["mice avg"], summary["fox avg"], summary["mice max"], summary["fox max"], predator_prey.current_mice_pop, predator_prey.current_fox_pop)
+        else:
+            helper.log_averages(i, summary["time"], summary["mice avg"], summary["fox avg"])
+            if archive is not None:
+                archive.append(i, predator_prey.current_mice_pop, predator_prey.current_fox_pop, summary["mice max"], summary["fox max"])
+            else:
+                helper.write_population_map(i, predator_prey.current_mice_pop, predator_prey.current_fox_pop, summary["mice max"], summary["fox max"], landscape.landscape, outdir, parameters["ppm format"])
 
     # Loop over each time step
-    for i in range(0, total_time_steps):
-        if not i % parameters["print interval"]:
-            helper.write_avg_file("averages.csv", i, i * parameters["time step"], predator_prey.get_mice_avg, predator_prey.get_fox_avg)
-            helper.log_averages(i, i * parameters["time step"], predator_prey.get_mice_avg, predator_prey.get_fox_avg)
-            helper.write_population_map(i, mice.population, fox.population, predator_prey.get_mice_max, predator_prey.get_fox_max, landscape.landscape)
+    summary = {}
+    stop_reason = None
+    try:
+        i = start
+        while i < total_time_steps:
+            if parameters["checkpoint every"] > 0 and i > start and not i % parameters["checkpoint every"]:
+                # All outputs of the earlier time steps must be on disk before the checkpoint
+                with profiler.phase("checkpoint"):
+                    recorder.flush()
+                    if writer is not None:
+                        writer.flush()
+                    if archive is not None:
+                        archive.flush()
+                    save_checkpoint(checkpoint_file, predator_prey, i, state_parameters)
+                profiler.count("checkpoint bytes", os.path.getsize(checkpoint_file))
+            if not i % parameters["print interval"]:
+                with profiler.phase("statistics"):
+                    summary = {"timestep": i, "time": i * parameters["time step"],
+                               "mice avg": predator_prey.get_mice_avg, "fox avg": predator_prey.get_fox_avg,
+                               "mice max": predator_prey.get_mice_max, "fox max": predator_prey.get_fox_max}
+                write_outputs(i, summary)
+                if monitor.enabled and i > start:
+                    with profiler.phase("convergence"):
+                        stop_reason = monitor.check(predator_prey, summary)
+                    if stop_reason is not None:
+                        break
+
+            if parameters["tolerance"] is not None:
+                # Adaptive steps span all time steps up to the next output, checkpoint or the end
+                steps = next_event(i, total_time_steps, parameters["print interval"], parameters["checkpoint every"]) - i
+                taken = predator_prey.steps_taken
+                with profiler.phase("step"):
+                    predator_prey.advance(steps * parameters["time step"])
+                profiler.count("steps", predator_prey.steps_taken - taken)
+            else:
+                steps = 1
+                with profiler.phase("step"):
+                    predator_prey.run()
+                profiler.count("steps")
+            i += steps
+        if stop_reason is not None:
+            helper.log_stop(i, summary["time"], stop_reason)
+            helper.write_stop_record(stop_file, i, summary["time"], stop_reason, parameters["fill remaining"])
+            summary["stop reason"] = stop_reason
+            if parameters["fill remaining"]:
+                final = summary
+                for j in range(i + parameters["print interval"], total_time_steps, parameters["print interval"]):
+                    summary = dict(final, timestep=j, time=j * parameters["time step"])
+                    write_outputs(j, summary)
+        if parameters["engine"] == "active":
+            helper.log_activity(predator_prey.tiles_stepped, predator_prey.tiles_skipped)
+        if parameters["tolerance"] is not None:
+            helper.log_adaptive_steps(predator_prey.steps_taken, predator_prey.steps_rejected)
+    finally:
+        with profiler.phase("close"):
+            predator_prey.close()
+            # Flush the buffered averages and queued outputs, also when the loop is left with an exception
+            try:
+                if writer is not None:
+                    writer.close()
+            finally:
+                try:
+                    if archive is not None:
+                        archive.close()
+                finally:
+                    recorder.close()
+                profiler.count("averages bytes", recorder.bytes_written)
 
-        predator_prey.run()
+    if profile:
+        print(profiler.report())
+    if profile_trace is not None:
+        profiler.write_trace(os.path.join(outdir, profile_trace))
+    return summary
 
 
 if __name__ == "__main__":
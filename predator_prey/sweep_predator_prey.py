@@ -0,0 +1,211 @@
+'''Predator-prey parameter sweep. Runs many simulations over a process pool.
+
+Every combination of the given parameter values is run with sim(), each one in its
+own output directory, and a consolidated results table is written at the end.
+A run that fails is recorded in the table with its error, and the others carry on.
+'''
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import csv
+import itertools
+import os
+import traceback
+import numpy as np
+from .Landscape import Landscape
+from .Simulation import Simulation
+from .Sparse import SparseSimulation
+from .Implicit import ImexSimulation, AdiSimulation
+from .simulate_predator_prey import sim
+
+# Order of the swept parameters, matching the positional arguments of sim()
+SWEEP_PARAMETERS = ("r", "a", "k", "b", "m", "l", "dt", "mseed", "fseed")
+RESULT_COLUMNS = ("run",) + SWEEP_PARAMETERS + ("timestep", "time", "mice avg", "fox avg", "mice max", "fox max", "stop reason", "status", "error", "directory")
+
+# Landscape loaded once by each worker process, see init_worker()
+worker_landscape = None
+
+
+def parse_values(spec, cast=float):
+    """
+    Parses a parameter specification into a list of values.
+
+    The specification is a comma separated list whose items are either single values
+    or 'start:stop:num' ranges of num evenly spaced values from start to stop inclusive,
+    e.g. '0.1,0.2' or '0.05:0.2:4' or '1:8:8'.
+
+    Args:
+        spec (str): The specification to parse.
+        cast (type): The type of the values, float or int.
+
+    Returns:
+        list: The parameter values.
+
+    Raises:
+        ValueError: If the specification cannot be parsed.
+    """
+    values = []
+    for item in spec.split(","):
+        parts = item.split(":")
+        if len(parts) == 1:
+            values.append(cast(parts[0]))
+        elif len(parts) == 3:
+            start, stop, num = float(parts[0]), float(parts[1]), int(parts[2])
+            values.extend(cast(v) for v in np.linspace(start, stop, num))
+        else:
+            raise ValueError(f"Invalid parameter specification: {item}")
+    return values
+
+
+def build_grid(values):
+    """
+    Builds the list of parameter combinations of the sweep.
+
+    Args:
+        values (dict): Lists of values keyed by the names in SWEEP_PARAMETERS.
+
+    Returns:
+        list: One dict per combination, keyed by the names in SWEEP_PARAMETERS.
+    """
+    return [dict(zip(SWEEP_PARAMETERS, combination))
+            for combination in itertools.product(*(values[name] for name in SWEEP_PARAMETERS))]
+
+
+def init_worker(lfile):
+    """
+    Loads the landscape once in each worker process.
+
+    Args:
+        lfile (str): The landscape file.
+    """
+    global worker_landscape
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        worker_landscape = Landscape(lfile)
+
+
+def run_case(task):
+    """
+    Runs one combination of the sweep in its own output directory.
+
+    The console log of the run is written to 'log.txt' in the output directory. An error
+    raised by the run is caught, so that it does not end the sweep: its traceback is
+    appended to the log and the row records the error instead of the results.
+
+    Args:
+        task (tuple): Run index, parameter dict, print interval, duration, engine, output root and
+                      the early stopping options of sim().
+
+    Returns:
+        dict: One row of the results table, with status "ok" or "failed".
+    """
+    index, params, t, d, engine, outroot, stopping = task
+    outdir = os.path.join(outroot, "run_{:05d}".format(index))
+    row = {"run": index, "directory": outdir}
+    row.update(params)
+    try:
+        os.makedirs(outdir, exist_ok=True)
+        with open(os.path.join(outdir, "log.txt"), "w") as log, contextlib.redirect_stdout(log):
+            try:
+                summary = sim(params["r"], params["a"], params["k"], params["b"], params["m"], params["l"], params["dt"],
+                              t, d, worker_landscape, params["mseed"], params["fseed"], engine, outdir, **stopping)
+            except Exception:
+                traceback.print_exc(file=log)
+                raise
+    except Exception as error:
+        row.update({"status": "failed", "error": "{}: {}".format(type(error).__name__, error)})
+        return row
+    row["status"] = "ok"
+    row.update(summary)
+    return row
+
+
+def write_results(filename, rows):
+    """
+    Writes the consolidated results table of the sweep.
+
+    Args:
+        filename (str): The CSV file to write.
+        rows (list): The result rows returned by run_case().
+    """
+    with open(filename, "w", newline="") as f:
+        # Error messages may hold commas, the writer quotes them
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(c.replace(" ", "_") for c in RESULT_COLUMNS)
+        for row in sorted(rows, key=lambda row: row["run"]):
+            cells = [row.get(c, "") for c in RESULT_COLUMNS]
+            writer.writerow(repr(float(v)) if isinstance(v, float) else str(v) for v in cells)
+
+
+def sweep(values, t, d, lfile, engine="vectorized", outroot="sweep", workers=None,
+          convergence_tolerance=None, convergence_window=0, extinction_threshold=None):
+    """
+    Runs every parameter combination over a process pool and writes the results table.
+
+    Args:
+        values (dict): Lists of values keyed by the names in SWEEP_PARAMETERS.
+        t (int): Number of time steps at which to output files.
+        d (int): Duration of each simulation.
+        lfile (str): The landscape file, loaded once per worker.
+        engine (str): The stepping engine of every run.
+        outroot (str): Directory receiving one sub-directory per run and 'sweep_results.csv'.
+        workers (int): Number of worker processes, defaults to the number of CPUs.
+        convergence_tolerance (float): Stops each run once it is steady, see sim().
+        convergence_window (int): Number of output intervals compared by the steady averages criterion of sim().
+        extinction_threshold (float): Stops each run once no population is above it.
+
+    Returns:
+        list: The result rows, ordered by run index. Failed runs have status "failed" and their error.
+    """
+    grid = build_grid(values)
+    workers = workers or os.cpu_count()
+    os.makedirs(outroot, exist_ok=True)
+    stopping = {"convergence_tolerance": convergence_tolerance, "convergence_window": convergence_window,
+                "extinction_threshold": extinction_threshold}
+    tasks = [(index, params, t, d, engine, outroot, stopping) for index, params in enumerate(grid)]
+    # Hand out several runs per message so short runs are not dominated by IPC
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(lfile,)) as pool:
+        rows = list(pool.map(run_case, tasks, chunksize=chunksize))
+    write_results(os.path.join(outroot, "sweep_results.csv"), rows)
+    return rows
+
+
+def sweepCommLineIntf():
+    """
+    The command-line interface for the parameter sweep. Each rate, the time step size and the
+    seeds accept a comma separated list of values or 'start:stop:num' ranges.
+    """
+    par=ArgumentParser()
+    par.add_argument("-r","--birth-mice",type=str,default="0.1",help="Birth rates of mice")
+    par.add_argument("-a","--death-mice",type=str,default="0.05",help="Rates at which foxes eat mice")
+    par.add_argument("-k","--diffusion-mice",type=str,default="0.2",help="Diffusion rates of mice")
+    par.add_argument("-b","--birth-foxes",type=str,default="0.03",help="Birth rates of foxes")
+    par.add_argument("-m","--death-foxes",type=str,default="0.09",help="Rates at which foxes starve")
+    par.add_argument("-l","--diffusion-foxes",type=str,default="0.2",help="Diffusion rates of foxes")
+    par.add_argument("-dt","--delta-t",type=str,default="0.5",help="Time step sizes")
+    par.add_argument("-t","--time_step",type=int,default=10,help="Number of time steps at which to output files")
+    par.add_argument("-d","--duration",type=int,default=500,help="Time to run each simulation (in timesteps)")
+    par.add_argument("-f","--landscape-file",type=str,required=True,help="Input landscape file")
+    par.add_argument("-ms","--mouse-seed",type=str,default="1",help="Random seeds for initialising mouse densities")
+    par.add_argument("-fs","--fox-seed",type=str,default="1",help="Random seeds for initialising fox densities")
+    par.add_argument("-e","--engine",type=str,default="vectorized",choices=Simulation.ENGINES+SparseSimulation.ENGINES+ImexSimulation.ENGINES+AdiSimulation.ENGINES,help="Engine used to step the populations")
+    par.add_argument("-o","--output-dir",type=str,default="sweep",help="Directory receiving the runs and the results table")
+    par.add_argument("-w","--workers",type=int,default=None,help="Number of worker processes (default: number of CPUs)")
+    par.add_argument("-ct","--convergence-tolerance",type=float,default=None,help="Stop each run once its populations change by at most this much per unit of time")
+    par.add_argument("-cw","--convergence-window",type=int,default=0,help="Compare the averages of this many output intervals with the convergence tolerance instead, 0 for none")
+    par.add_argument("-et","--extinction-threshold",type=float,default=None,help="Stop each run once no population is above this threshold")
+    args=par.parse_args()
+    if args.convergence_window and args.convergence_tolerance is None:
+        par.error("-cw/--convergence-window requires -ct/--convergence-tolerance")
+    values = {"r": parse_values(args.birth_mice), "a": parse_values(args.death_mice), "k": parse_values(args.diffusion_mice),
+              "b": parse_values(args.birth_foxes), "m": parse_values(args.death_foxes), "l": parse_values(args.diffusion_foxes),
+              "dt": parse_values(args.delta_t), "mseed": parse_values(args.mouse_seed, int), "fseed": parse_values(args.fox_seed, int)}
+    rows = sweep(values, args.time_step, args.duration, args.landscape_file, args.engine, args.output_dir, args.workers,
+                 args.convergence_tolerance, args.convergence_window, args.extinction_threshold)
+    failed = [row for row in rows if row["status"] != "ok"]
+    if failed:
+        print("{} of {} runs failed, see {}".format(len(failed), len(rows), os.path.join(args.output_dir, "sweep_results.csv")))
+
+
+if __name__ == "__main__":
+    sweepCommLineIntf()
@@ -0,0 +1,4 @@
+import os
+
+# Landscape used by the tests, found from this package rather than from the working directory
+MAP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map.dat")
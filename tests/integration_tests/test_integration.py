@@ -1,9 +1,12 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from predator_prey.Animal import Mice
 from predator_prey.Animal import Fox
 from predator_prey.Landscape import Landscape
 from predator_prey.Simulation import Simulation
+from tests import MAP_FILE
 
 class TestIntegration(unittest.TestCase):
 
@@ -11,7 +14,7 @@ class TestIntegration(unittest.TestCase):
         """
         Set up data for the tests. This method is run before each test.
         """
-        self.landscape = Landscape("map.dat")
+        self.landscape = Landscape(MAP_FILE)
         self.mice = Mice(birth_rate=0.1, death_rate=0.01, diffusion_rate=0.1, seed=1, landscape=self.landscape)
         self.fox = Fox(birth_rate=0.05, death_rate=0.1, diffusion_rate=0.05, seed=1, landscape=self.landscape)
         
@@ -29,6 +32,39 @@ class TestIntegration(unittest.TestCase):
         self.assertNotEqual(self.simulation.current_mice_pop.tolist(), self.mice.population.tolist())
         self.assertNotEqual(self.simulation.current_fox_pop.tolist(), self.fox.population.tolist())
 
+    def test_engines_match_loop(self):
+        """
+        Test that every engine gives the same populations as the 'loop' engine
+        on a landscape that mixes land and water.
+        """
+        rows = ["1 1 1 1 0 1", "1 0 1 1 0 1", "1 1 1 0 0 0", "0 1 1 1 1 1"]
+        with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as f:
+            f.write("6 4\n" + "\n".join(rows) + "\n")
+        try:
+            landscape = Landscape(f.name)
+        finally:
+            os.remove(f.name)
+
+        simulations = []
+        for engine in Simulation.ENGINES:
+            mice = Mice(birth_rate=0.1, death_rate=0.05, diffusion_rate=0.2, seed=1, landscape=landscape)
+            fox = Fox(birth_rate=0.03, death_rate=0.09, diffusion_rate=0.2, seed=2, landscape=landscape)
+            simulations.append(Simulation(mice, fox, landscape, 0.5, engine=engine, workers=3))
+
+        for _ in range(20):
+            for simulation in simulations:
+                simulation.run()
+
+        for simulation in simulations:
+            simulation.close()
+
+        loop = simulations[0]
+        for simulation in simulations[1:]:
+            np.testing.assert_allclose(simulation.current_mice_pop, loop.current_mice_pop, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(simulation.current_fox_pop, loop.current_fox_pop, rtol=0, atol=1e-12)
+            # Water cells are never populated
+            self.assertEqual(np.count_nonzero(simulation.current_mice_pop[landscape.landscape == 0]), 0)
+
     # Add more tests as needed...
 
 
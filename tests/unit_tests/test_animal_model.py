@@ -1,3 +1,4 @@
+import random
 import unittest
 import numpy as np
 from io import StringIO
@@ -68,6 +69,63 @@ class TestAnimalModel(unittest.TestCase):
         self.animal.seed = 0
         self.assertEqual(self.animal.initialize_population().tolist(), [[0.0, 1.0], [1.0, 0.0]])  # with seed = 0
 
+    def test_population_dtype(self):
+        """
+        Test that a float32 population holds the float64 initial values rounded to float32,
+        and that non floating point types are rejected.
+        """
+        self.mock_landscape.landscape = np.ones((4, 4))
+        wide = AnimalModel(1, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal')
+        narrow = AnimalModel(1, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal', np.float32)
+        self.assertEqual(narrow.population.dtype, np.float32)
+        np.testing.assert_array_equal(narrow.population, wide.population.astype(np.float32))
+        with self.assertRaises(ValueError):
+            AnimalModel(1, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal', int)
+
+    def test_initialize_population_generator(self):
+        """
+        Test that the initial population is drawn between 0 and 5.0 on the land squares only,
+        that it depends only on the seed and that it leaves the global 'random' state alone.
+        """
+        self.mock_landscape.landscape = np.pad(np.array([[1, 0, 1], [1, 1, 0]]), 1)
+        random.seed(3)
+        expected = random.random()
+        random.seed(3)
+        first = AnimalModel(7, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal').population
+        self.assertEqual(random.random(), expected)
+        second = AnimalModel(7, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal').population
+        np.testing.assert_array_equal(first, second)
+        land = self.mock_landscape.landscape != 0
+        self.assertTrue(((first[land] > 0) & (first[land] < 5.0)).all())
+        self.assertTrue((first[~land] == 0).all())
+        other = AnimalModel(8, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal').population
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_initialize_population_negative_seed(self):
+        """
+        Test that a negative seed is accepted and, as with random.seed, gives the population
+        of its absolute value.
+        """
+        self.mock_landscape.landscape = np.pad(np.array([[1, 0, 1], [1, 1, 0]]), 1)
+        negative = AnimalModel(-3, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal').population
+        positive = AnimalModel(3, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal').population
+        np.testing.assert_array_equal(negative, positive)
+        self.assertTrue((negative[self.mock_landscape.landscape != 0] > 0).all())
+
+    def test_initialize_population_legacy(self):
+        """
+        Test that with legacy_init the initial population holds the values of random.uniform(0, 5.0)
+        drawn square by square after random.seed(seed), for small, large and negative seeds.
+        """
+        self.mock_landscape.landscape = np.pad(np.array([[1, 0, 1, 1], [0, 1, 1, 0], [1, 1, 0, 1]]), 1)
+        for seed in (1, 42, -5, 2**40 + 3):
+            random.seed(seed)
+            expected = np.zeros((5, 6))
+            for x, y in zip(*np.nonzero(self.mock_landscape.landscape)):
+                expected[x, y] = random.uniform(0, 5.0)
+            animal = AnimalModel(seed, 0.5, 0.5, 0.5, self.mock_landscape, 'Animal', legacy_init=True)
+            self.assertEqual(animal.population.tolist(), expected.tolist())
+
 
 class CustomTestRunner(unittest.TextTestRunner):
     """
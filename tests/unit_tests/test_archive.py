@@ -0,0 +1,160 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Archive import FrameArchiveWriter, FrameArchive, ARCHIVE_FILE
+from predator_prey.Helpers import SimulationHelpers
+from predator_prey.simulate_predator_prey import sim
+from predator_prey.render_archive import render
+
+class TestArchive(unittest.TestCase):
+    """
+    Unit test class for testing the frame archive and its rendering.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a temporary directory, a padded landscape with a
+        lake and a series of population frames.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, ARCHIVE_FILE)
+        grid = np.ones((6, 9), int)
+        grid[1:3, 2:5] = 0
+        self.grid = grid
+        self.lscape = np.zeros((8, 11), int)
+        self.lscape[1:-1, 1:-1] = grid
+        rng = np.random.default_rng(3)
+        self.mice = rng.uniform(0, 5, (10,) + self.lscape.shape) * self.lscape
+        self.fox = rng.uniform(0, 5, (10,) + self.lscape.shape) * self.lscape
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def write(self, mode, count=10, chunk_frames=4, **kwargs):
+        """
+        Writes the first 'count' frames, at timesteps 0, 5, 10..., and returns the unclosed writer.
+        """
+        writer = FrameArchiveWriter(self.filename, self.lscape, mode, chunk_frames=chunk_frames, **kwargs)
+        for n in range(count):
+            writer.append(5 * n, self.mice[n], self.fox[n], self.mice[n].max(), self.fox[n].max())
+        return writer
+
+    def test_round_trip(self):
+        """
+        Test that raw frames are read back exactly in any order, and colour frames as the
+        colour codes of the maps.
+        """
+        self.write("raw").close()
+        with FrameArchive(self.filename) as archive:
+            self.assertEqual(len(archive), 10)
+            self.assertEqual(archive.timesteps.tolist(), list(range(0, 50, 5)))
+            for n in (7, 0, 9, 3, 4):
+                mice, fox = archive.read(5 * n)
+                np.testing.assert_array_equal(mice, self.mice[n, 1:-1, 1:-1])
+                np.testing.assert_array_equal(fox, self.fox[n, 1:-1, 1:-1])
+            np.testing.assert_array_equal(archive.land, self.grid != 0)
+            with self.assertRaises(KeyError):
+                archive.read(3)
+
+        helper = SimulationHelpers()
+        self.write("colours").close()
+        with FrameArchive(self.filename) as archive:
+            self.assertEqual(archive.dtype, np.uint8)
+            mice, fox = archive.read(30)
+            mcols, fcols = helper.calculate_color_codes(self.mice[6], self.fox[6], self.mice[6].max(), self.fox[6].max(), self.lscape)
+            np.testing.assert_array_equal(mice, mcols)
+            np.testing.assert_array_equal(fox, fcols)
+
+        with self.assertRaises(ValueError):
+            FrameArchiveWriter(self.filename, self.lscape, "jpeg")
+        with open(self.filename, "wb") as f:
+            f.write(b"P6\n9 6\n255\n")
+        with self.assertRaises(ValueError):
+            FrameArchive(self.filename)
+
+    def test_recovery_without_index(self):
+        """
+        Test that the chunks of an archive left without index are found, and that a chunk
+        cut short is ignored.
+        """
+        writer = self.write("raw")
+        writer.flush()
+        writer.file.close()
+        with FrameArchive(self.filename) as archive:
+            self.assertEqual(archive.timesteps.tolist(), list(range(0, 50, 5)))
+            np.testing.assert_array_equal(archive.read(40)[1], self.fox[8, 1:-1, 1:-1])
+        with open(self.filename, "r+b") as f:
+            f.truncate(os.path.getsize(self.filename) - 10)
+        with FrameArchive(self.filename) as archive:
+            self.assertEqual(archive.timesteps.tolist(), list(range(0, 40, 5)))
+
+    def test_resume(self):
+        """
+        Test that resuming drops the frames from the resumed timestep on, keeping the earlier
+        frames of its chunk, and that an archive of other settings is not resumed.
+        """
+        self.write("raw").close()
+        writer = FrameArchiveWriter(self.filename, self.lscape, "raw", chunk_frames=4, resume_step=30)
+        self.assertEqual(writer.timesteps, [20, 25])
+        for n in range(6, 10):
+            writer.append(5 * n, self.mice[n] + 1, self.fox[n], 0, 0)
+        writer.close()
+        with FrameArchive(self.filename) as archive:
+            self.assertEqual(archive.timesteps.tolist(), list(range(0, 50, 5)))
+            np.testing.assert_array_equal(archive.read(25)[0], self.mice[5, 1:-1, 1:-1])
+            np.testing.assert_array_equal(archive.read(30)[0], self.mice[6, 1:-1, 1:-1] + 1)
+        with self.assertRaises(ValueError):
+            FrameArchiveWriter(self.filename, self.lscape, "colours", chunk_frames=4, resume_step=30)
+
+    def test_sim_archive_matches_maps(self):
+        """
+        Test that a run writing an archive writes no map files, and that the rendered maps are
+        those the run writes without archive, from colour codes and from raw populations.
+        """
+        lfile = os.path.join(self.directory.name, "lake.dat")
+        with open(lfile, "w") as f:
+            f.write("9 6\n" + "".join(" ".join(map(str, row)) + "\n" for row in self.grid))
+        expected = os.path.join(self.directory.name, "expected")
+        os.makedirs(expected)
+        with contextlib.redirect_stdout(io.StringIO()):
+            sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.4, 7, 20, lfile, 3, 4, "vectorized", expected)
+        maps = sorted(name for name in os.listdir(expected) if name.endswith(".ppm"))
+        for mode, async_output in (("colours", False), ("raw", True)):
+            outdir = os.path.join(self.directory.name, mode)
+            rendered = os.path.join(outdir, "rendered")
+            os.makedirs(rendered)
+            with contextlib.redirect_stdout(io.StringIO()):
+                sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.4, 7, 20, lfile, 3, 4, "vectorized", outdir,
+                    async_output=async_output, map_archive=mode, archive_chunk=3)
+            self.assertEqual(sorted(os.listdir(outdir)), ["averages.csv", ARCHIVE_FILE, "rendered"])
+            render(os.path.join(outdir, ARCHIVE_FILE), None, rendered)
+            self.assertEqual(sorted(os.listdir(rendered)), maps)
+            for name in maps:
+                with open(os.path.join(rendered, name)) as f, open(os.path.join(expected, name)) as g:
+                    self.assertEqual(f.read(), g.read(), name)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,156 @@
+import unittest
+import filecmp
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Runner import create_simulation
+from predator_prey.Checkpoint import save_checkpoint, load_checkpoint, resume_checkpoint
+from predator_prey.simulate_predator_prey import sim
+from tests import MAP_FILE
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Unit test class for testing the checkpoint functions.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Loads the landscape and creates a temporary directory.
+        """
+        self.landscape = Landscape(MAP_FILE)
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "checkpoint.ppc")
+        self.parameters = {"mice birth rate": 0.1, "time step": 0.5, "mice seed": 1}
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def make_simulation(self, engine="loop", precision="float64"):
+        """
+        Creates a simulation on the landscape.
+        """
+        mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=self.landscape, dtype=precision)
+        fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=self.landscape, dtype=precision)
+        return create_simulation(mice, fox, self.landscape, 0.5, engine)
+
+    def test_save_and_resume(self):
+        """
+        Test that a checkpoint is saved without leaving a temporary file, is loaded as
+        memory mapped arrays, and that a resumed simulation continues exactly like the original.
+        """
+        original = self.make_simulation()
+        for _ in range(3):
+            original.run()
+        save_checkpoint(self.filename, original, 3, self.parameters)
+        self.assertEqual(os.listdir(self.directory.name), ["checkpoint.ppc"])
+
+        header, arrays = load_checkpoint(self.filename)
+        self.assertEqual(header["step"], 3)
+        self.assertIsInstance(arrays["current_mice_pop"], np.memmap)
+        np.testing.assert_array_equal(arrays["current_fox_pop"], original.current_fox_pop)
+        del arrays
+
+        resumed = self.make_simulation("inplace")
+        self.assertEqual(resume_checkpoint(self.filename, resumed, self.parameters), 3)
+        for _ in range(3):
+            original.run()
+            resumed.run()
+        np.testing.assert_array_equal(resumed.current_mice_pop, original.current_mice_pop)
+        np.testing.assert_array_equal(resumed.current_fox_pop, original.current_fox_pop)
+
+    def test_resume_float32(self):
+        """
+        Test that a float32 checkpoint keeps its type, and that the sparse, imex and adi engines
+        resume from it in float32 and continue exactly like the original.
+        """
+        for engine in ("sparse", "imex", "adi", "vectorized"):
+            original = self.make_simulation(engine, "float32")
+            for _ in range(10):
+                original.run()
+            save_checkpoint(self.filename, original, 10, self.parameters)
+            header, arrays = load_checkpoint(self.filename)
+            self.assertEqual(arrays["current_mice_pop"].dtype, np.float32)
+            del arrays
+
+            resumed = self.make_simulation(engine, "float32")
+            resume_checkpoint(self.filename, resumed, self.parameters)
+            for _ in range(30):
+                original.run()
+                resumed.run()
+            self.assertEqual(resumed.current_mice_pop.dtype, np.float32, engine)
+            np.testing.assert_array_equal(resumed.current_mice_pop, original.current_mice_pop, engine)
+            np.testing.assert_array_equal(resumed.current_fox_pop, original.current_fox_pop, engine)
+
+    def test_resume_mismatch(self):
+        """
+        Test that resuming on another landscape, with other parameters or from a file that
+        is not a checkpoint raises a ValueError.
+        """
+        save_checkpoint(self.filename, self.make_simulation(), 1, self.parameters)
+        with self.assertRaises(ValueError):
+            resume_checkpoint(self.filename, self.make_simulation(), dict(self.parameters, **{"mice seed": 2}))
+
+        simulation = self.make_simulation()
+        self.landscape.landscape[3, 3] = 0
+        with self.assertRaises(ValueError):
+            resume_checkpoint(self.filename, simulation, self.parameters)
+
+        with open(self.filename, "wb") as f:
+            f.write(b"P6\n")
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.filename)
+
+    def test_interrupted_run_resumes_identically(self):
+        """
+        Test that a run stopped after a checkpoint and resumed with 'resume' writes the same
+        averages and maps as an uninterrupted run, also with an adaptive integrator, whose
+        next step size is saved in the checkpoint, and with the statistics fused into the
+        kernels, whose per-tile sums are recomputed on resume.
+        """
+        adaptive = {"engine": "vectorized", "integrator": "rk4", "tolerance": 1e-6, "checkpoint_every": 7}
+        cases = [("euler", {}), ("adaptive", adaptive)]
+        # The fused runs resume at an output interval, whose averages come from the recomputed sums
+        cases += [("fused-" + engine, {"engine": engine, "fused_statistics": True, "checkpoint_every": 6})
+                  for engine in ("inplace", "active", "threaded")]
+        for name, options in cases:
+            full = os.path.join(self.directory.name, name + "-full")
+            part = os.path.join(self.directory.name, name + "-part")
+            os.mkdir(full)
+            os.mkdir(part)
+            sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 3, 10, self.landscape, 1, 1, outdir=full, flush_every=2, **options)
+            options = dict(options, checkpoint_every=options.get("checkpoint_every", 7))
+            # The stopped run has written outputs past its last checkpoint, at timestep 7 or 6
+            sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 3, 5, self.landscape, 1, 1, outdir=part, flush_every=2, **options)
+            sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.5, 3, 10, self.landscape, 1, 1, outdir=part, flush_every=2, resume=True, **options)
+            for directory in (full, part):
+                if os.path.exists(os.path.join(directory, "checkpoint.ppc")):
+                    os.remove(os.path.join(directory, "checkpoint.ppc"))
+
+            comparison = filecmp.dircmp(full, part)
+            self.assertEqual(comparison.left_only + comparison.right_only, [])
+            self.assertEqual(filecmp.cmpfiles(full, part, comparison.common_files, shallow=False)[0], sorted(comparison.common_files))
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,153 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Sparse import SparseSimulation
+from predator_prey.Convergence import ConvergenceMonitor, EXTINCTION, STEADY_STATE, STEADY_AVERAGES
+from predator_prey.simulate_predator_prey import sim, STOP_FILE
+
+class TestConvergence(unittest.TestCase):
+    """
+    Unit test class for testing the early termination of converged runs.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Writes a small landscape with a lake into a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        grid = np.ones((10, 12), int)
+        grid[3:6, 4:8] = 0
+        self.lfile = os.path.join(self.directory.name, "island.dat")
+        with open(self.lfile, "w") as f:
+            f.write("12 10\n" + "".join(" ".join(map(str, row)) + "\n" for row in grid))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.landscape = Landscape(self.lfile)
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def run_sim(self, outdir, **kwargs):
+        """
+        Runs a pure diffusion simulation, which settles to uniform populations, without console output.
+        """
+        os.makedirs(outdir, exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sim(0, 0, 0.2, 0, 0, 0.2, 0.5, 10, 500, self.lfile, 1, 2, "inplace", outdir, **kwargs)
+
+    def test_max_change_rate(self):
+        """
+        Test that every engine reports the largest change of the last step per unit of time.
+        """
+        for engine in ("loop", "vectorized", "active", "sparse"):
+            mice = Mice(1, 0.2, 0.1, 0.05, self.landscape)
+            fox = Fox(2, 0.2, 0.03, 0.09, self.landscape)
+            if engine == "sparse":
+                simulation = SparseSimulation(mice, fox, self.landscape, 0.4)
+            else:
+                simulation = Simulation(mice, fox, self.landscape, 0.4, engine)
+            before = np.stack((simulation.current_mice_pop, simulation.current_fox_pop)).copy()
+            simulation.run()
+            after = np.stack((simulation.current_mice_pop, simulation.current_fox_pop))
+            self.assertAlmostEqual(simulation.max_change_rate(), np.max(np.abs(after - before)) / 0.4, places=12, msg=engine)
+
+    def test_monitor_criteria(self):
+        """
+        Test the extinction and steady averages criteria, and that invalid settings are rejected.
+        """
+        summary = {"mice max": 1e-4, "fox max": 0.0, "mice avg": 1e-5, "fox avg": 0.0}
+        self.assertEqual(ConvergenceMonitor(extinction=1e-3).check(None, summary), EXTINCTION)
+        self.assertIsNone(ConvergenceMonitor(extinction=1e-5).check(None, summary))
+        self.assertFalse(ConvergenceMonitor().enabled)
+
+        monitor = ConvergenceMonitor(tolerance=0.01, window=3)
+        results = [monitor.check(None, {"mice max": 5, "fox max": 5, "mice avg": mice, "fox avg": 1.0})
+                   for mice in (2.0, 3.0, 3.01, 3.02, 3.02)]
+        self.assertEqual(results, [None, None, None, STEADY_AVERAGES, STEADY_AVERAGES])
+
+        for kwargs in ({"tolerance": -1}, {"window": 1}, {"extinction": -1}, {"window": 3}, {"window": 3, "extinction": 0.1}):
+            with self.assertRaises(ValueError):
+                ConvergenceMonitor(**kwargs)
+
+    def test_early_stop_and_fill(self):
+        """
+        Test that a settled run stops early with a stop record, and that the remaining intervals
+        are skipped or filled with the final state.
+        """
+        full = os.path.join(self.directory.name, "full")
+        self.run_sim(full)
+        self.assertFalse(os.path.exists(os.path.join(full, STOP_FILE)))
+        rows = np.genfromtxt(os.path.join(full, "averages.csv"), delimiter=",", skip_header=1)
+
+        skipped = os.path.join(self.directory.name, "skipped")
+        summary = self.run_sim(skipped, convergence_tolerance=1e-4)
+        self.assertEqual(summary["stop reason"], STEADY_STATE)
+        with open(os.path.join(skipped, STOP_FILE)) as f:
+            record = f.read().splitlines()[1].split(",")
+        stop = int(record[0])
+        self.assertEqual(record[2:], [STEADY_STATE, "0"])
+        self.assertEqual(stop, summary["timestep"])
+        self.assertLess(stop, 1000)
+        skipped_rows = np.genfromtxt(os.path.join(skipped, "averages.csv"), delimiter=",", skip_header=1)
+        # The outputs up to the stop are those of the full run
+        np.testing.assert_array_equal(skipped_rows, rows[:len(skipped_rows)])
+        self.assertEqual(skipped_rows[-1, 0], stop)
+        self.assertFalse(os.path.exists(os.path.join(skipped, "map_{:04d}.ppm".format(stop + 10))))
+
+        filled = os.path.join(self.directory.name, "filled")
+        summary = self.run_sim(filled, convergence_tolerance=1e-4, fill_remaining=True)
+        filled_rows = np.genfromtxt(os.path.join(filled, "averages.csv"), delimiter=",", skip_header=1)
+        np.testing.assert_array_equal(filled_rows[:, :2], rows[:, :2])
+        np.testing.assert_array_equal(filled_rows[len(skipped_rows):, 2:], np.tile(skipped_rows[-1, 2:], (len(rows) - len(skipped_rows), 1)))
+        np.testing.assert_allclose(filled_rows[:, 2:], rows[:, 2:], rtol=1e-4)
+        self.assertEqual(summary["timestep"], rows[-1, 0])
+        with open(os.path.join(filled, "map_{:04d}.ppm".format(stop))) as f, \
+                open(os.path.join(filled, "map_{:04d}.ppm".format(int(rows[-1, 0])))) as g:
+            self.assertEqual(f.read(), g.read())
+
+        # A run that does not stop removes the record of an earlier early stop
+        self.run_sim(filled, convergence_tolerance=1e-12)
+        self.assertFalse(os.path.exists(os.path.join(filled, STOP_FILE)))
+
+    def test_extinction(self):
+        """
+        Test that a run whose populations die out stops at the first output interval below the threshold.
+        """
+        outdir = os.path.join(self.directory.name, "extinct")
+        os.makedirs(outdir)
+        # The foxes eat the mice quickly, then starve
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = sim(0, 1, 0.2, 0, 0.1, 0.2, 0.1, 10, 500, self.lfile, 1, 2, "vectorized", outdir, extinction_threshold=1e-3)
+        self.assertEqual(summary["stop reason"], EXTINCTION)
+        self.assertLessEqual(max(summary["mice max"], summary["fox max"]), 1e-3)
+        self.assertLess(summary["timestep"], 5000)
+        rows = np.genfromtxt(os.path.join(outdir, "averages.csv"), delimiter=",", skip_header=1)
+        self.assertEqual(rows[-1, 0], summary["timestep"])
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
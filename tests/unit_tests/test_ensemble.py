@@ -0,0 +1,112 @@
+import unittest
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Ensemble import EnsembleSimulation
+from tests import MAP_FILE
+
+class TestEnsembleSimulation(unittest.TestCase):
+    """
+    Unit test class for testing the EnsembleSimulation class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates three members with different seeds and rates.
+        """
+        self.landscape = Landscape(MAP_FILE)
+        self.landscape.landscape[5, 5] = 0  # Add some water
+        self.landscape.neighbours = self.landscape.calculate_neighbours()
+        self.settings = [((1, 0.2, 0.1, 0.05), (1, 0.2, 0.03, 0.09)),
+                         ((2, 0.1, 0.08, 0.04), (3, 0.3, 0.02, 0.06)),
+                         ((0, 0.2, 0.1, 0.05), (4, 0.2, 0.03, 0.09))]
+
+    def make_animals(self, dtype=float):
+        """
+        Creates fresh Mice and Fox instances for every member.
+        """
+        mice = [Mice(*m, landscape=self.landscape, dtype=dtype) for m, _ in self.settings]
+        fox = [Fox(*f, landscape=self.landscape, dtype=dtype) for _, f in self.settings]
+        return mice, fox
+
+    def test_init(self):
+        """
+        Test that populations are stacked and rates collected per member.
+        """
+        ensemble = EnsembleSimulation(*self.make_animals(), self.landscape, 0.5)
+        self.assertEqual(ensemble.members, 3)
+        self.assertEqual(ensemble.current_mice_pop.shape, (3, 22, 12))
+        self.assertEqual(ensemble.fox_rates["diffusion"].ravel().tolist(), [0.2, 0.3, 0.2])
+
+    def test_invalid_members(self):
+        """
+        Test that mismatched or empty member lists are rejected with a ValueError.
+        """
+        mice, fox = self.make_animals()
+        with self.assertRaises(ValueError):
+            EnsembleSimulation(mice, fox[:2], self.landscape, 0.5)
+        with self.assertRaises(ValueError):
+            EnsembleSimulation([], [], self.landscape, 0.5)
+        with self.assertRaises(ValueError):
+            EnsembleSimulation(fox, mice, self.landscape, 0.5)
+
+    def test_run_matches_simulation(self):
+        """
+        Test that each member evolves exactly like a separate Simulation, and that the
+        per-member averages and maxima match those of the separate simulations.
+        """
+        ensemble = EnsembleSimulation(*self.make_animals(), self.landscape, 0.5)
+        simulations = [Simulation(m, f, self.landscape, 0.5, engine="vectorized") for m, f in zip(*self.make_animals())]
+
+        for _ in range(10):
+            ensemble.run()
+            for simulation in simulations:
+                simulation.run()
+
+        for i, simulation in enumerate(simulations):
+            np.testing.assert_array_equal(ensemble.current_mice_pop[i], simulation.current_mice_pop)
+            np.testing.assert_array_equal(ensemble.current_fox_pop[i], simulation.current_fox_pop)
+            self.assertEqual(ensemble.get_mice_avg[i], simulation.get_mice_avg)
+            self.assertEqual(ensemble.get_fox_avg[i], simulation.get_fox_avg)
+            self.assertEqual(ensemble.get_mice_max[i], simulation.get_mice_max)
+            self.assertEqual(ensemble.get_fox_max[i], simulation.get_fox_max)
+
+    def test_float32(self):
+        """
+        Test that float32 members are stepped in float32 and evolve like separate float32
+        simulations, to float32 rounding.
+        """
+        ensemble = EnsembleSimulation(*self.make_animals(np.float32), self.landscape, 0.5)
+        simulations = [Simulation(m, f, self.landscape, 0.5, engine="vectorized") for m, f in zip(*self.make_animals(np.float32))]
+        for _ in range(10):
+            ensemble.run()
+            for simulation in simulations:
+                simulation.run()
+
+        self.assertEqual(ensemble.current_mice_pop.dtype, np.float32)
+        self.assertEqual(ensemble.mice_rates["birth"].dtype, np.float32)
+        for i, simulation in enumerate(simulations):
+            np.testing.assert_allclose(ensemble.current_mice_pop[i], simulation.current_mice_pop, rtol=1e-5)
+            np.testing.assert_allclose(ensemble.current_fox_pop[i], simulation.current_fox_pop, rtol=1e-5)
+            self.assertAlmostEqual(ensemble.get_mice_avg[i], simulation.get_mice_avg, places=5)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -1,5 +1,6 @@
 import unittest
 import os
+import tempfile
 import numpy as np
 from predator_prey.Helpers import SimulationHelpers
 
@@ -46,6 +47,38 @@ class TestSimulationHelpers(unittest.TestCase):
         # Clean up
         os.remove('map_0001.ppm')
 
+        # The map can also be written into another directory
+        with tempfile.TemporaryDirectory() as directory:
+            self.sim_helpers.write_population_map(2, mice, fox, 10, 20, lscape, directory)
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'map_0002.ppm')))
+
+    def test_write_population_map_formats(self):
+        """
+        Test that the plain-text P3 and binary P6 maps hold the same pixels, with water
+        cells coloured (0, 200, 255), and that unknown formats are rejected.
+        """
+        lscape = np.zeros((4, 5), int)
+        lscape[1, 1:4] = 1
+        lscape[2, 1] = 1
+        mice = np.arange(20, dtype=float).reshape(4, 5)
+        fox = np.full((4, 5), 2.0)
+        expected = [127, 139, 0, 127, 162, 0, 127, 185, 0, 127, 255, 0, 0, 200, 255, 0, 200, 255]
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.sim_helpers.write_population_map(1, mice, fox, 11.0, 4.0, lscape, directory)
+            self.sim_helpers.write_population_map(2, mice, fox, 11.0, 4.0, lscape, directory, "P6")
+            with open(os.path.join(directory, 'map_0001.ppm')) as f:
+                plain = f.read().split("\n")
+            with open(os.path.join(directory, 'map_0002.ppm'), 'rb') as f:
+                binary = f.read()
+            with self.assertRaises(ValueError):
+                self.sim_helpers.write_population_map(3, mice, fox, 11.0, 4.0, lscape, directory, "P5")
+
+        self.assertEqual(plain[:3], ["P3", "3 2", "255"])
+        self.assertTrue(binary.startswith(b"P6\n3 2\n255\n"))
+        self.assertEqual([int(v) for line in plain[3:] if line for v in line.split()], expected)
+        self.assertEqual(list(binary[len(b"P6\n3 2\n255\n"):]), expected)
+
     def test_write_avg_file(self):
         """
         Test the method 'write_avg_file' correctly generates a '.txt' file 
@@ -0,0 +1,137 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Sparse import SparseSimulation, LandGraph
+from predator_prey.Implicit import ImexSimulation, AdiSimulation, laplacian_matrix
+
+class TestImplicit(unittest.TestCase):
+    """
+    Unit test class for testing the implicit diffusion engines.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Writes and loads a small landscape with a lake and a bay.
+        """
+        grid = np.ones((14, 18), int)
+        grid[4:8, 5:11] = 0
+        grid[10:, :4] = 0
+        grid[0, 9] = 0
+        with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as f:
+            f.write("18 14\n" + "".join(" ".join(map(str, row)) + "\n" for row in grid))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.landscape = Landscape(f.name)
+        os.remove(f.name)
+
+    def make_simulation(self, cls, timestep, diffusion_rate=1.0, rates=(0.1, 0.05, 0.03, 0.09)):
+        """
+        Creates a simulation of the given class on the landscape.
+        """
+        mice = Mice(seed=1, diffusion_rate=diffusion_rate, birth_rate=rates[0], death_rate=rates[1], landscape=self.landscape)
+        fox = Fox(seed=2, diffusion_rate=diffusion_rate, birth_rate=rates[2], death_rate=rates[3], landscape=self.landscape)
+        return cls(mice, fox, self.landscape, timestep)
+
+    def test_laplacian_matches_stencil(self):
+        """
+        Test that the Laplacian matrix applied to the land squares gives the diffusion of the
+        dense stencil, and that it is symmetric with zero row sums.
+        """
+        simulation = self.make_simulation(Simulation, 0.5)
+        graph = LandGraph(self.landscape)
+        laplacian = laplacian_matrix(graph)
+        population = simulation.current_mice_pop
+        expected = simulation.calculate_grid_diffusion(population, 1.0)[simulation.land_mask]
+        np.testing.assert_allclose(laplacian @ graph.gather(population)[:graph.size], expected, atol=1e-12)
+        self.assertEqual(abs(laplacian - laplacian.T).max(), 0)
+        np.testing.assert_allclose(laplacian.sum(axis=1), 0)
+
+    def test_stable_beyond_explicit_limit(self):
+        """
+        Test that with a diffusion rate of 1 and a timestep of 1, four times the explicit limit,
+        the explicit update blows up while both implicit engines stay close to a fine explicit run.
+        """
+        reference = self.make_simulation(SparseSimulation, 0.01)
+        for _ in range(1000):
+            reference.run()
+        explicit = self.make_simulation(SparseSimulation, 1.0)
+        for _ in range(10):
+            explicit.run()
+        self.assertGreater(explicit.get_mice_max, 1e3)
+        for cls in (ImexSimulation, AdiSimulation):
+            simulation = self.make_simulation(cls, 1.0)
+            for _ in range(10):
+                simulation.run()
+            self.assertLess(simulation.get_mice_max, 2 * reference.get_mice_max)
+            self.assertAlmostEqual(simulation.get_mice_avg, reference.get_mice_avg, delta=0.05 * reference.get_mice_avg)
+            self.assertAlmostEqual(simulation.get_fox_avg, reference.get_fox_avg, delta=0.05 * reference.get_fox_avg)
+
+    def test_convergence_and_conservation(self):
+        """
+        Test that pure diffusion conserves the total population, that species with the same
+        diffusion rate share one factorization and that the error shrinks with the timestep.
+        """
+        for cls in (ImexSimulation, AdiSimulation):
+            simulation = self.make_simulation(cls, 1.0, rates=(0, 0, 0, 0))
+            total = simulation.mice_land.sum()
+            for _ in range(20):
+                simulation.run()
+            self.assertAlmostEqual(simulation.mice_land.sum(), total, delta=1e-10 * total)
+            self.assertEqual(len(simulation.factors), 1)
+
+        reference = self.make_simulation(SparseSimulation, 0.01, 0.2)
+        for _ in range(500):
+            reference.run()
+        for cls in (ImexSimulation, AdiSimulation):
+            errors = []
+            for timestep in (0.5, 0.05):
+                simulation = self.make_simulation(cls, timestep, 0.2)
+                for _ in range(int(round(5 / timestep))):
+                    simulation.run()
+                errors.append(np.max(np.abs(simulation.mice_land - reference.mice_land)))
+            self.assertLess(errors[1], errors[0] / 5)
+
+    def test_adi_factors(self):
+        """
+        Test that the alternating-direction solver inverts the product of the row and column factors.
+        """
+        simulation = self.make_simulation(AdiSimulation, 0.7)
+        graph = simulation.graph
+        size = graph.size
+        rows = np.zeros((size, size))
+        columns = np.zeros((size, size))
+        for square in range(size):
+            for operator, directions in ((rows, graph.directions[2:]), (columns, graph.directions[:2])):
+                for neighbour in directions[:, square]:
+                    if neighbour < size:
+                        operator[square, neighbour] = 1
+                        operator[square, square] -= 1
+        values = np.random.default_rng(0).random(size)
+        solution = simulation.mice_solver.solve(values)
+        identity = np.eye(size)
+        np.testing.assert_allclose((identity - 0.7 * rows) @ (identity - 0.7 * columns) @ solution, values, atol=1e-12)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message 
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+    
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,118 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Integrators import RungeKuttaIntegrator, EULER, HEUN, RK4
+
+class TestIntegrators(unittest.TestCase):
+    """
+    Unit test class for testing the Runge-Kutta integrators of the Simulation class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Writes and loads a small landscape with some water.
+        """
+        grid = np.ones((12, 16), int)
+        grid[3:6, 4:9] = 0
+        grid[9:, :3] = 0
+        with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as f:
+            f.write("16 12\n" + "".join(" ".join(map(str, row)) + "\n" for row in grid))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.landscape = Landscape(f.name)
+        os.remove(f.name)
+
+    def make_simulation(self, integrator="euler", timestep=0.5, tolerance=None):
+        """
+        Creates a simulation of the vectorized engine with the given integrator.
+        """
+        mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=self.landscape)
+        fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=self.landscape)
+        return Simulation(mice, fox, self.landscape, timestep, "vectorized", integrator=integrator, tolerance=tolerance)
+
+    def test_euler_tableau_matches_engine(self):
+        """
+        Test that the Runge-Kutta integrator with the forward Euler tableau gives exactly
+        the populations of the vectorized engine.
+        """
+        engine = self.make_simulation()
+        integrated = self.make_simulation("heun")
+        integrated.stepper = RungeKuttaIntegrator(EULER, integrated.calculate_derivatives)
+        for _ in range(10):
+            engine.run()
+            integrated.run()
+        np.testing.assert_array_equal(integrated.current_mice_pop, engine.current_mice_pop)
+        np.testing.assert_array_equal(integrated.current_fox_pop, engine.current_fox_pop)
+
+    def test_order_of_convergence(self):
+        """
+        Test that halving the step size divides the error by about 4 for Heun's method and
+        by about 16 for the classic Runge-Kutta method, and that water stays empty.
+        """
+        reference = self.make_simulation("rk4", 0.0625)
+        reference.advance(8)
+        for integrator, order in (("heun", HEUN.order), ("rk4", RK4.order)):
+            errors = []
+            for timestep in (1.0, 0.5):
+                simulation = self.make_simulation(integrator, timestep)
+                simulation.advance(8)
+                errors.append(np.max(np.abs(simulation.current_mice_pop - reference.current_mice_pop)))
+                self.assertTrue((simulation.current_fox_pop[self.landscape.landscape == 0] == 0).all())
+            self.assertGreater(errors[0] / errors[1], 0.7 * 2 ** order)
+
+    def test_adaptive_step(self):
+        """
+        Test that the adaptive integrators meet their tolerance over several calls of
+        advance(), and that the classic Runge-Kutta method grows its step size and needs
+        fewer steps than the fixed step size.
+        """
+        reference = self.make_simulation("rk4", 0.0625)
+        reference.advance(20)
+        for integrator, tolerance in (("heun", 1e-4), ("rk4", 1e-4)):
+            simulation = self.make_simulation(integrator, 0.5, tolerance=tolerance)
+            for _ in range(4):
+                simulation.advance(5)
+            self.assertLess(abs(simulation.get_mice_avg - reference.get_mice_avg), 10 * tolerance)
+        self.assertGreater(simulation.adaptive_step, 0.5)
+        self.assertLess(simulation.steps_taken, 40)
+
+    def test_invalid_integrators(self):
+        """
+        Test that unknown integrators, integrators on other engines and tolerances without an
+        error estimate are rejected.
+        """
+        mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=self.landscape)
+        fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=self.landscape)
+        with self.assertRaises(ValueError):
+            Simulation(mice, fox, self.landscape, 0.5, "vectorized", integrator="rk5")
+        with self.assertRaises(ValueError):
+            Simulation(mice, fox, self.landscape, 0.5, "inplace", integrator="rk4")
+        with self.assertRaises(ValueError):
+            Simulation(mice, fox, self.landscape, 0.5, "vectorized", tolerance=1e-4)
+        with self.assertRaises(ValueError):
+            Simulation(mice, fox, self.landscape, 0.5, "vectorized", integrator="heun", tolerance=0)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message 
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+    
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
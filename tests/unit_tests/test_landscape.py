@@ -1,8 +1,12 @@
 import unittest
+import os
+import tempfile
 import numpy as np
 from io import StringIO
 from unittest.mock import patch
-from predator_prey.Landscape import Landscape
+from predator_prey.Landscape import Landscape, CACHE_SUFFIX
+from predator_prey.convert_landscape import convert
+from tests import MAP_FILE
 
 class TestLandscape(unittest.TestCase):
     """
@@ -13,7 +17,7 @@ class TestLandscape(unittest.TestCase):
         """
         Set up method for unit tests. Creates an instance of the Landscape class.
         """
-        self.landscape = Landscape("map.dat")
+        self.landscape = Landscape(MAP_FILE)
         
     def test_init(self):
         """
@@ -40,22 +44,95 @@ class TestLandscape(unittest.TestCase):
         # Test invalid landscape: non-integer dimensions
         with patch('builtins.open', return_value=StringIO('10a 20\n' + (('1 '*10).strip()+'\n')*20)) as mock_file:
             with self.assertRaises(RuntimeError):
-                Landscape("map.dat")
+                Landscape(MAP_FILE)
 
         # Test invalid landscape: wrong line length
         with patch('builtins.open', return_value=StringIO('10 20\n' + (('1 '*9).strip()+'\n')*20)) as mock_file:
             with self.assertRaises(RuntimeError):
-                Landscape("map.dat")
+                Landscape(MAP_FILE)
 
 
 
+    def test_parse_landscape(self):
+        """
+        Test that maps of single digits, parsed all at once, and other maps, parsed line by
+        line, give the same landscape, and that invalid lines are still reported.
+        """
+        lines = ["3 2", "1 0 1", "0 1 1"]
+        expected = np.array([[0, 0, 0, 0, 0], [0, 1, 0, 1, 0], [0, 0, 1, 1, 0], [0, 0, 0, 0, 0]])
+        np.testing.assert_array_equal(self.landscape.parse_landscape(lines), expected)
+        np.testing.assert_array_equal(self.landscape.parse_landscape(["3 2", " 1  0 1", "0 1 1 "]), expected)
+        self.assertEqual((self.landscape.width, self.landscape.height), (3, 2))
+        with self.assertRaises(ValueError):
+            self.landscape.parse_landscape(["3 2", "1 0 1", "0 1"])
+        with self.assertRaises(ValueError):
+            self.landscape.parse_landscape(["3 2", "1 0 1", "0 x 1"])
+        with self.assertRaises(ValueError):
+            self.landscape.parse_landscape(["3 2", "1 0 1"])
+
+    def test_binary_landscape_and_cache(self):
+        """
+        Test that a landscape converted to the binary format loads identically, and that
+        the binary cache is written, reused while the file is unchanged and refreshed after.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            binary = os.path.join(directory, "map.npy")
+            text = os.path.join(directory, "map.dat")
+            self.assertEqual(convert(MAP_FILE, binary), (10, 20))
+            self.assertEqual(np.load(binary).dtype, np.uint8)
+            loaded = Landscape(binary)
+            np.testing.assert_array_equal(loaded.landscape, self.landscape.landscape)
+            self.assertEqual((loaded.width, loaded.height), (10, 20))
+
+            convert(binary, text)
+            cached = Landscape(text, cache=True)
+            np.testing.assert_array_equal(cached.landscape, self.landscape.landscape)
+            self.assertTrue(os.path.isfile(text + CACHE_SUFFIX))
+
+            # The cache is used while the file is unchanged
+            with patch('builtins.open', side_effect=open) as mock_open:
+                np.testing.assert_array_equal(Landscape(text, cache=True).landscape, self.landscape.landscape)
+                self.assertNotIn(text, [call.args[0] for call in mock_open.call_args_list])
+
+            # A modified file is parsed again
+            with open(text, "w") as f:
+                f.write("2 1\n1 0\n")
+            self.assertEqual(Landscape(text, cache=True).landscape.shape, (3, 4))
+            self.assertEqual(np.load(text + CACHE_SUFFIX).shape, (1, 2))
+
+            with self.assertRaises(ValueError):
+                convert(text, text)
+
+    def test_compact(self):
+        """
+        Test that a compact landscape holds the same values as uint8, with int8 neighbour counts,
+        whether it is parsed, memory mapped from a binary landscape or given as an array, and
+        that values above 255 are rejected.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            binary = os.path.join(directory, "map.npy")
+            convert(MAP_FILE, binary)
+            for source in (MAP_FILE, binary, self.landscape.landscape[1:-1, 1:-1]):
+                compact = Landscape(source, compact=True)
+                self.assertEqual(compact.landscape.dtype, np.uint8)
+                self.assertEqual(compact.neighbours.dtype, np.int8)
+                np.testing.assert_array_equal(compact.landscape, self.landscape.landscape)
+                np.testing.assert_array_equal(compact.neighbours, self.landscape.neighbours)
+
+            text = os.path.join(directory, "wide.dat")
+            with open(text, "w") as f:
+                f.write("2 1\n1  3\n")
+            self.assertEqual(Landscape(text, compact=True).landscape.dtype, np.uint8)
+            with self.assertRaises(RuntimeError):
+                Landscape(np.array([[1, 256]]), compact=True)
+
     def test_calculate_neighbours(self):
         """
         Test the 'calculate_neighbours' method. It checks the 
         generated neighbours matrix against the expected matrix.
         """
         # Load the landscape from the 'map.dat' file
-        landscape_file = "map.dat"
+        landscape_file = MAP_FILE
         landscape = Landscape(landscape_file)
 
         # Generate the neighbours matrix
@@ -82,6 +159,13 @@ class TestLandscape(unittest.TestCase):
         """
         self.assertEqual(self.landscape.land_squares, 200)
 
+        # The count is cached until the landscape is edited and its neighbours recalculated
+        self.landscape.landscape[1, 1:4] = 0
+        self.landscape.calculate_neighbours()
+        self.assertEqual(self.landscape.land_squares, 197)
+        self.landscape.landscape = np.ones((3, 3), int)
+        self.assertEqual(self.landscape.land_squares, 9)
+
 
     def test_repr(self):
         """
@@ -0,0 +1,119 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import AnimalModel, Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.MultiSpecies import MultiSpeciesSimulation
+
+class TestMultiSpecies(unittest.TestCase):
+    """
+    Unit test class for testing the MultiSpeciesSimulation class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Writes and loads a small landscape with a lake.
+        """
+        grid = np.ones((9, 11), int)
+        grid[3:5, 4:7] = 0
+        grid[8, 0] = 0
+        with tempfile.NamedTemporaryFile("w", suffix=".dat", delete=False) as f:
+            f.write("11 9\n" + "".join(" ".join(map(str, row)) + "\n" for row in grid))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.landscape = Landscape(f.name)
+        os.remove(f.name)
+
+    def test_matches_predator_prey(self):
+        """
+        Test that the two-species special case follows the vectorized engine of Simulation.
+        """
+        simulation = Simulation(Mice(1, 0.2, 0.1, 0.05, self.landscape), Fox(2, 0.3, 0.03, 0.09, self.landscape),
+                                self.landscape, 0.4, "vectorized")
+        multi = MultiSpeciesSimulation.predator_prey(Mice(1, 0.2, 0.1, 0.05, self.landscape), Fox(2, 0.3, 0.03, 0.09, self.landscape),
+                                                     self.landscape, 0.4)
+        self.assertEqual(multi.names, ["Mice", "Fox"])
+        for _ in range(200):
+            simulation.run()
+            multi.run()
+        np.testing.assert_allclose(multi.current_pop[0], simulation.current_mice_pop, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(multi.current_pop[1], simulation.current_fox_pop, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(multi.get_avg, [simulation.get_mice_avg, simulation.get_fox_avg], rtol=1e-12)
+        np.testing.assert_allclose(multi.get_max, [simulation.get_mice_max, simulation.get_fox_max], rtol=1e-12)
+
+    def test_three_species_against_loop(self):
+        """
+        Test a food web of two competing prey and a predator against a cell by cell update.
+        """
+        species = [AnimalModel(1, 0.2, 0.3, 0.0, self.landscape, "Mice"),
+                   AnimalModel(2, 0.1, 0.2, 0.0, self.landscape, "Voles"),
+                   AnimalModel(3, 0.3, 0.0, 0.1, self.landscape, "Fox")]
+        interactions = [[-0.01, -0.02, -0.05], [-0.03, -0.01, -0.04], [0.02, 0.03, 0.0]]
+        multi = MultiSpeciesSimulation(species, interactions, self.landscape, 0.25)
+        populations = np.stack([animal.population for animal in species])
+        growth = [animal.birth_rate - animal.death_rate for animal in species]
+        land = self.landscape.landscape
+        for _ in range(20):
+            multi.run()
+            following = np.zeros_like(populations)
+            for s, animal in enumerate(species):
+                for x, y in zip(*np.nonzero(land)):
+                    p = populations[:, x, y]
+                    neighbours = populations[s, x - 1, y] + populations[s, x + 1, y] + populations[s, x, y - 1] + populations[s, x, y + 1]
+                    diffusion = animal.diffusion_rate * (neighbours - self.landscape.neighbours[x, y] * p[s])
+                    rate = growth[s] + np.dot(interactions[s], p)
+                    following[s, x, y] = max(0, p[s] + 0.25 * (rate * p[s] + diffusion))
+            populations = following
+        np.testing.assert_allclose(multi.current_pop, populations, rtol=1e-12, atol=1e-12)
+        # Water and the halo hold no population
+        self.assertTrue(np.all(multi.current_pop[:, land == 0] == 0))
+        self.assertTrue(np.all(multi.get_max > 0))
+
+    def test_float32(self):
+        """
+        Test that the stack keeps the floating point type of the populations.
+        """
+        species = [AnimalModel(seed, 0.2, 0.1, 0.05, self.landscape, "s{}".format(seed), np.float32) for seed in (1, 2, 3)]
+        multi = MultiSpeciesSimulation(species, np.zeros((3, 3)), self.landscape, 0.5)
+        multi.run()
+        self.assertEqual(multi.current_pop.dtype, np.float32)
+        self.assertEqual(multi.current_pop.shape, (3,) + self.landscape.landscape.shape)
+
+    def test_validation(self):
+        """
+        Test that invalid species, interaction matrices and landscapes are rejected.
+        """
+        species = [AnimalModel(seed, 0.2, 0.1, 0.05, self.landscape, "s{}".format(seed)) for seed in (1, 2, 3)]
+        with self.assertRaises(ValueError):
+            MultiSpeciesSimulation([], [], self.landscape, 0.5)
+        with self.assertRaises(ValueError):
+            MultiSpeciesSimulation(species, np.zeros((2, 2)), self.landscape, 0.5)
+        with self.assertRaises(ValueError):
+            MultiSpeciesSimulation(species, np.full((3, 3), np.nan), self.landscape, 0.5)
+        with self.assertRaises(ValueError):
+            MultiSpeciesSimulation(species, np.zeros((3, 3)), None, 0.5)
+        with self.assertRaises(ValueError):
+            MultiSpeciesSimulation.predator_prey(species[0], species[1], self.landscape, 0.5)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,107 @@
+import unittest
+import os
+import tempfile
+import threading
+import numpy as np
+from predator_prey.Helpers import SimulationHelpers
+from predator_prey.Output import AsyncOutputWriter
+
+class TestAsyncOutputWriter(unittest.TestCase):
+    """
+    Unit test class for testing the AsyncOutputWriter class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a small landscape, populations and a temporary directory.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.lscape = np.zeros((4, 5), int)
+        self.lscape[1:3, 1:4] = 1
+        self.mice = np.full((4, 5), 2.0)
+        self.fox = np.full((4, 5), 1.0)
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_writes_match_synchronous_output(self):
+        """
+        Test that the writer produces the same files, in the same order, as the synchronous
+        helpers, even though the populations are overwritten right after each submit().
+        """
+        with AsyncOutputWriter(self.mice.shape, self.lscape, self.directory, depth=1) as writer:
+            for i in range(3):
+                writer.submit(i, i * 0.5, 2.0 + i, 1.0, 4.0, 2.0, self.mice, self.fox)
+                self.mice += 1
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ["map_0000.ppm", "map_0001.ppm", "map_0002.ppm"])
+        with tempfile.TemporaryDirectory() as directory:
+            SimulationHelpers().write_population_map(2, np.full((4, 5), 4.0), self.fox, 4.0, 2.0, self.lscape, directory)
+            with open(os.path.join(directory, "map_0002.ppm")) as expected, open(os.path.join(self.directory, "map_0002.ppm")) as written:
+                self.assertEqual(written.read(), expected.read())
+
+    def test_snapshot_dtype(self):
+        """
+        Test that the snapshot buffers are allocated in the floating point type of the populations.
+        """
+        with AsyncOutputWriter(self.mice.shape, self.lscape, self.directory, depth=2, dtype=np.float32) as writer:
+            buffers = list(writer.free.queue)
+        self.assertEqual([(m.dtype, f.dtype) for m, f in buffers], [(np.float32, np.float32)] * 2)
+
+    def test_back_pressure(self):
+        """
+        Test that submit() blocks while every snapshot buffer is waiting to be written.
+        """
+        release = threading.Event()
+
+        class SlowHelpers(SimulationHelpers):
+            def log_averages(self, *args):
+                release.wait(10)
+
+        writer = AsyncOutputWriter(self.mice.shape, self.lscape, self.directory, depth=1, helper=SlowHelpers())
+        writer.submit(0, 0.0, 1.0, 1.0, 1.0, 1.0, self.mice, self.fox)
+        second = threading.Thread(target=writer.submit, args=(1, 0.5, 1.0, 1.0, 1.0, 1.0, self.mice, self.fox))
+        second.start()
+        second.join(0.2)
+        self.assertTrue(second.is_alive())
+        release.set()
+        second.join(10)
+        self.assertFalse(second.is_alive())
+        writer.close()
+
+    def test_error_is_raised_on_close(self):
+        """
+        Test that an error raised by the writer thread is re-raised by close(), and that
+        the writer cannot be used once closed.
+        """
+        writer = AsyncOutputWriter(self.mice.shape, self.lscape, os.path.join(self.directory, "missing"))
+        writer.submit(0, 0.0, 1.0, 1.0, 1.0, 1.0, self.mice, self.fox)
+        with self.assertRaises(FileNotFoundError):
+            writer.close()
+        with self.assertRaises(RuntimeError):
+            writer.submit(1, 0.5, 1.0, 1.0, 1.0, 1.0, self.mice, self.fox)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
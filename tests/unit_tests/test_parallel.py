@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Parallel import SharedMemorySimulation, split_rows
+from tests import MAP_FILE
+
+class TestSharedMemorySimulation(unittest.TestCase):
+    """
+    Unit test class for testing the SharedMemorySimulation class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Loads the landscape and adds some water.
+        """
+        self.landscape = Landscape(MAP_FILE)
+        self.landscape.landscape[3, 4:7] = 0
+        self.landscape.landscape[12, 2] = 0
+        self.landscape.neighbours = self.landscape.calculate_neighbours()
+
+    def make_animals(self):
+        """
+        Creates fresh Mice and Fox instances.
+        """
+        return (Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=self.landscape),
+                Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=self.landscape))
+
+    def test_split_rows(self):
+        """
+        Test that 'split_rows' covers the interior rows with contiguous, non-empty bands.
+        """
+        self.assertEqual(split_rows(20, 3), [(1, 8), (8, 14), (14, 21)])
+        self.assertEqual(split_rows(2, 4), [(1, 2), (2, 3)])
+
+    def test_invalid_workers(self):
+        """
+        Test that fewer than one worker is rejected with a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            SharedMemorySimulation(*self.make_animals(), self.landscape, 0.5, workers=0)
+
+    def test_run_matches_serial(self):
+        """
+        Test that the populations are bitwise identical to the serial 'loop' engine, that
+        the averages and maxima match, and that they remain readable after close().
+        """
+        serial = Simulation(*self.make_animals(), self.landscape, 0.5)
+        for _ in range(5):
+            serial.run()
+
+        with SharedMemorySimulation(*self.make_animals(), self.landscape, 0.5, workers=3) as parallel:
+            parallel.run()
+            parallel.run_steps(4)
+            np.testing.assert_array_equal(parallel.current_mice_pop, serial.current_mice_pop)
+            np.testing.assert_array_equal(parallel.current_fox_pop, serial.current_fox_pop)
+            self.assertEqual(parallel.get_mice_avg, serial.get_mice_avg)
+            self.assertEqual(parallel.get_fox_max, serial.get_fox_max)
+            parallel.exact_averages = False
+            self.assertAlmostEqual(parallel.get_fox_avg, serial.get_fox_avg, places=12)
+
+        self.assertAlmostEqual(parallel.get_mice_avg, serial.get_mice_avg, places=12)
+        with self.assertRaises(RuntimeError):
+            parallel.run()
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,120 @@
+import unittest
+import json
+import os
+import tempfile
+import numpy as np
+from predator_prey.Helpers import SimulationHelpers
+from predator_prey.Profiler import Profiler, NULL_PHASE
+from predator_prey.Recorder import TimeSeriesRecorder
+
+class TestProfiler(unittest.TestCase):
+    """
+    Unit test class for testing the Profiler class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def test_phases_and_counters(self):
+        """
+        Test that phases accumulate their calls and time, that counters add up and that
+        the report lists every phase and counter.
+        """
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.phase("step"):
+                sum(range(1000))
+            profiler.count("steps")
+        profiler.count("map bytes", 100)
+        profiler.count("map bytes", 50)
+        summary = profiler.summary()
+        self.assertEqual(summary["phases"]["step"]["calls"], 3)
+        self.assertGreater(summary["phases"]["step"]["seconds"], 0)
+        self.assertLessEqual(summary["phases"]["step"]["seconds"], summary["wall seconds"])
+        self.assertEqual(summary["counters"], {"steps": 3, "map bytes": 150})
+        self.assertGreater(summary["steps per second"], summary["steps per wall second"])
+        report = profiler.report()
+        self.assertIn("step", report)
+        self.assertIn("map bytes", report)
+
+    def test_disabled(self):
+        """
+        Test that a disabled profiler hands out the do-nothing phase and records nothing.
+        """
+        profiler = Profiler(enabled=False, trace=True)
+        with profiler.phase("step"):
+            pass
+        profiler.count("steps")
+        self.assertIs(profiler.phase("step"), NULL_PHASE)
+        self.assertEqual(profiler.summary()["phases"], {})
+        self.assertEqual(profiler.summary()["counters"], {})
+        self.assertIsNone(profiler.events)
+
+    def test_write_trace(self):
+        """
+        Test that the trace holds one complete event per phase call and the summary.
+        """
+        profiler = Profiler(trace=True)
+        for name in ("step", "step", "log"):
+            with profiler.phase(name):
+                pass
+        filename = os.path.join(self.directory.name, "trace.json")
+        profiler.write_trace(filename)
+        with open(filename) as f:
+            trace = json.load(f)
+        self.assertEqual([event["name"] for event in trace["traceEvents"]], ["step", "step", "log"])
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"]))
+        self.assertEqual(trace["summary"]["phases"]["step"]["calls"], 2)
+
+    def test_helpers_instrumentation(self):
+        """
+        Test that the helpers time the map phases and count the bytes written, and that the
+        recorder counts the bytes of its rows.
+        """
+        profiler = Profiler()
+        helper = SimulationHelpers(profiler)
+        lscape = np.pad(np.ones((2, 3), int), 1)
+        population = np.pad(np.arange(6, dtype=float).reshape(2, 3), 1)
+        for ppm_format in ("P3", "P6"):
+            helper.write_population_map(0, population, population, 5.0, 5.0, lscape, self.directory.name, ppm_format)
+        helper.log_averages(0, 0.0, 1.0, 2.0)
+        # The P6 map overwrote the P3 one, the counter holds the bytes of both
+        p6_bytes = os.path.getsize(os.path.join(self.directory.name, "map_0000.ppm"))
+        for name in ("map colours", "map pixels", "map format", "map write"):
+            self.assertEqual(profiler.timers[name].calls, 2)
+        self.assertEqual(profiler.timers["log"].calls, 1)
+        self.assertGreater(profiler.counters["map bytes"], 2 * p6_bytes)
+
+        filename = os.path.join(self.directory.name, "averages.csv")
+        with TimeSeriesRecorder(filename) as recorder:
+            recorder.record(0, 0.0, 1.0, 2.0)
+        self.assertEqual(recorder.bytes_written, os.path.getsize(filename) - len("Timestep,Time,Mice,Foxes\n"))
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message 
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+    
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -0,0 +1,94 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from flexmock import flexmock
+from predator_prey.Helpers import SimulationHelpers
+from predator_prey.Recorder import TimeSeriesRecorder, read_npy_records
+
+class TestTimeSeriesRecorder(unittest.TestCase):
+    """
+    Unit test class for testing the TimeSeriesRecorder class.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a temporary directory and some averages.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.rows = [(i, i * 0.5, 1 / (i + 3), 2 / (i + 7)) for i in range(7)]
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def test_csv_matches_write_avg_file(self):
+        """
+        Test that the buffered CSV is identical to the file written row by row with
+        'write_avg_file', and that rows are written in batches of the capacity.
+        """
+        expected = os.path.join(self.directory.name, "expected.csv")
+        with open(expected, "w") as f:
+            f.write("Timestep,Time,Mice,Foxes\n")
+        for row in self.rows:
+            SimulationHelpers().write_avg_file(expected, *row)
+
+        filename = os.path.join(self.directory.name, "averages.csv")
+        recorder = TimeSeriesRecorder(filename, capacity=3)
+        flexmock(recorder).should_call("flush").times(3)
+        for row in self.rows:
+            recorder.record(*row)
+        self.assertEqual(recorder.written, 6)
+        recorder.close()
+
+        with open(expected) as f, open(filename) as g:
+            self.assertEqual(g.read(), f.read())
+        with self.assertRaises(RuntimeError):
+            recorder.record(*self.rows[0])
+
+    def test_npy(self):
+        """
+        Test that the binary time series is a valid '.npy' file after every batch.
+        """
+        filename = os.path.join(self.directory.name, "averages.npy")
+        with TimeSeriesRecorder(filename, capacity=4, file_format="npy") as recorder:
+            for row in self.rows:
+                recorder.record(*row)
+            self.assertEqual(read_npy_records(filename), 4)
+            self.assertEqual(np.load(filename).shape, (4,))
+
+        records = np.load(filename)
+        self.assertEqual(records.dtype.names, ("Timestep", "Time", "Mice", "Foxes"))
+        self.assertEqual([tuple(record) for record in records.tolist()], self.rows)
+
+    def test_invalid_arguments(self):
+        """
+        Test that an invalid capacity or format is rejected with a ValueError.
+        """
+        filename = os.path.join(self.directory.name, "averages.csv")
+        with self.assertRaises(ValueError):
+            TimeSeriesRecorder(filename, capacity=0)
+        with self.assertRaises(ValueError):
+            TimeSeriesRecorder(filename, file_format="json")
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
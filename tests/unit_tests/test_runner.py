@@ -0,0 +1,127 @@
+import unittest
+import contextlib
+import io
+import os
+import tempfile
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Runner import run_simulation, SimulationParameters
+from predator_prey.simulate_predator_prey import sim
+
+class TestRunner(unittest.TestCase):
+    """
+    Unit test class for testing the in-memory run API.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a temporary directory and a grid with a lake.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.grid = np.ones((8, 13), int)
+        self.grid[2:5, 3:9] = 0
+        self.lfile = os.path.join(self.directory.name, "lake.dat")
+        with open(self.lfile, "w") as f:
+            f.write("13 8\n" + "".join(" ".join(map(str, row)) + "\n" for row in self.grid))
+        self.parameters = SimulationParameters(delta_t=0.4, time_step=7, duration=20, mouse_seed=3, fox_seed=4, engine="inplace")
+
+    def tearDown(self):
+        """
+        Clean up the temporary directory.
+        """
+        self.directory.cleanup()
+
+    def test_matches_sim(self):
+        """
+        Test that a run from a grid array records the same averages and maxima as sim(),
+        without printing anything.
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = run_simulation(self.parameters, self.grid)
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(result.timesteps.tolist(), [0, 7, 14, 21, 28, 35, 42, 49])
+        np.testing.assert_array_equal(result.times, result.timesteps * 0.4)
+        self.assertEqual(result.mice_frames.shape, (0, 8, 13))
+
+        outdir = os.path.join(self.directory.name, "sim")
+        os.makedirs(outdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.4, 7, 20, self.lfile, 3, 4, "inplace", outdir, averages_format="npy")
+        averages = np.load(os.path.join(outdir, "averages.npy"))
+        np.testing.assert_array_equal(result.timesteps, averages["Timestep"])
+        np.testing.assert_array_equal(result.mice_avg, averages["Mice"])
+        np.testing.assert_array_equal(result.fox_avg, averages["Foxes"])
+        self.assertEqual((result.mice_max[-1], result.fox_max[-1]), (summary["mice max"], summary["fox max"]))
+
+    def test_frames(self):
+        """
+        Test that the selected frames hold the populations of their timesteps, and that frames
+        between output intervals are rejected.
+        """
+        with contextlib.redirect_stdout(io.StringIO()):
+            landscape = Landscape(self.lfile)
+        result = run_simulation(self.parameters, landscape, frames=[14, 0])
+        self.assertEqual(result.frame_timesteps.tolist(), [0, 14])
+        simulation = Simulation(Mice(3, 0.2, 0.1, 0.05, landscape), Fox(4, 0.2, 0.03, 0.09, landscape), landscape, 0.4, "inplace")
+        np.testing.assert_array_equal(result.mice_frames[0], simulation.current_mice_pop[1:-1, 1:-1])
+        for _ in range(14):
+            simulation.run()
+        np.testing.assert_array_equal(result.mice_frames[1], simulation.current_mice_pop[1:-1, 1:-1])
+        np.testing.assert_array_equal(result.fox_frames[1], simulation.current_fox_pop[1:-1, 1:-1])
+        self.assertEqual(len(run_simulation(self.parameters, landscape, frames="all").mice_frames), len(result))
+
+        with self.assertRaises(ValueError):
+            run_simulation(self.parameters, landscape, frames=[3])
+        with self.assertRaises(ValueError):
+            run_simulation(SimulationParameters(engine="unknown"), landscape)
+        with self.assertRaises(ValueError):
+            run_simulation(SimulationParameters(integrator="rk4", engine="sparse"), landscape)
+
+    def test_logging_and_files(self):
+        """
+        Test that logging and file output are switched on separately, and that the files are those of sim().
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_simulation(self.parameters, self.lfile, log=True)
+        self.assertEqual(len(output.getvalue().splitlines()), 8)
+        self.assertTrue(output.getvalue().startswith("Averages. Timestep: 0 "))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["lake.dat"])
+
+        files = os.path.join(self.directory.name, "files")
+        expected = os.path.join(self.directory.name, "expected")
+        os.makedirs(files)
+        os.makedirs(expected)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_simulation(self.parameters, self.grid, outdir=files, ppm_format="P6")
+        self.assertEqual(output.getvalue(), "")
+        with contextlib.redirect_stdout(io.StringIO()):
+            sim(0.1, 0.05, 0.2, 0.03, 0.09, 0.2, 0.4, 7, 20, self.lfile, 3, 4, "inplace", expected, ppm_format="P6")
+        self.assertEqual(sorted(os.listdir(files)), sorted(os.listdir(expected)))
+        for name in os.listdir(expected):
+            with open(os.path.join(files, name), "rb") as f, open(os.path.join(expected, name), "rb") as g:
+                self.assertEqual(f.read(), g.read(), name)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
@@ -1,10 +1,12 @@
 import unittest
+import tracemalloc
 from unittest.mock import Mock
 import numpy as np
 from predator_prey.Simulation import Simulation
 from flexmock import flexmock
 from predator_prey.Animal import Mice, Fox
 from predator_prey.Simulation import Landscape
+from tests import MAP_FILE
 
 class TestSimulation(unittest.TestCase):
     """
@@ -15,7 +17,7 @@ class TestSimulation(unittest.TestCase):
         """
         Set up method for unit tests. It creates mocks for the entities involved in the simulation.
         """
-        self.landscape = flexmock(Landscape("map.dat"))
+        self.landscape = flexmock(Landscape(MAP_FILE))
         self.mice = flexmock(Mice(seed=0, diffusion_rate=0.1, birth_rate=0.2, death_rate=0.1, landscape=self.landscape))
         self.fox = flexmock(Fox(seed=0, diffusion_rate=0.1, birth_rate=0.2, death_rate=0.1, landscape=self.landscape))
         self.timestep = 1
@@ -102,6 +104,197 @@ class TestSimulation(unittest.TestCase):
         self.simulation.update_fox_population(x, y)
         self.assertTrue(self.simulation.next_fox_pop[x, y] >= 0)
 
+    def test_calculate_grid_diffusion(self):
+        """
+        Test the 'calculate_grid_diffusion' method of Simulation class. It checks that the
+        whole-grid stencil agrees with the per-cell 'calculate_diffusion' for every interior cell.
+        """
+        current_pop = np.arange(25, dtype=float).reshape(5, 5)
+        self.landscape.neighbours = np.full((5, 5), 4)
+        diffusion = self.simulation.calculate_grid_diffusion(current_pop, 0.1)
+        self.assertEqual(diffusion.shape, (3, 3))
+        for x in range(1, 4):
+            for y in range(1, 4):
+                self.assertEqual(diffusion[x-1, y-1], self.simulation.calculate_diffusion(current_pop, x, y, 0.1))
+
+    def test_invalid_engine(self):
+        """
+        Test that an unknown engine name is rejected with a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            Simulation(self.mice, self.fox, self.landscape, self.timestep, engine="unknown")
+        with self.assertRaises(ValueError):
+            Simulation(self.mice, self.fox, self.landscape, self.timestep, engine="threaded", workers=0)
+
+    def test_threaded_engine_tiles(self):
+        """
+        Test that the 'threaded' engine creates one kernel per tile of rows, covering every
+        interior row exactly once, and releases its thread pool on close.
+        """
+        landscape = Landscape(MAP_FILE)
+        mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape)
+        fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape)
+        with Simulation(mice, fox, landscape, 0.5, engine="threaded", workers=4) as simulation:
+            rows = [(kernel.first_row, kernel.last_row) for kernel in simulation.kernels]
+            simulation.run()
+        self.assertEqual(rows, [(1, 6), (6, 11), (11, 16), (16, 21)])
+        self.assertIsNone(simulation.executor)
+
+    def test_active_engine_skips_empty_tiles(self):
+        """
+        Test that the 'active' engine skips tiles far from any population, grows the active
+        region with diffusion, and gives the same populations as the 'loop' engine.
+        """
+        landscape = flexmock(Landscape(MAP_FILE))
+        landscape.landscape = np.ones((82, 12), int)
+        landscape.landscape[0, :] = landscape.landscape[-1, :] = landscape.landscape[:, 0] = landscape.landscape[:, -1] = 0
+        landscape.neighbours = landscape.calculate_neighbours()
+        landscape.height, landscape.width = 80, 10
+
+        def make_simulation(engine):
+            mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape)
+            fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape)
+            mice.population[10:, :] = 0
+            fox.population[10:, :] = 0
+            return Simulation(mice, fox, landscape, 0.5, engine=engine)
+
+        loop, active = make_simulation("loop"), make_simulation("active")
+        self.assertEqual(active.current_activity.tolist(), [True, False, False, False, False])
+        for _ in range(20):
+            loop.run()
+            active.run()
+        np.testing.assert_array_equal(active.current_mice_pop, loop.current_mice_pop)
+        np.testing.assert_array_equal(active.current_fox_pop, loop.current_fox_pop)
+        self.assertTrue(active.current_activity[1])
+        self.assertEqual(active.tiles_stepped + active.tiles_skipped, 100)
+        self.assertGreater(active.skipped_fraction, 0.4)
+
+    def test_fused_statistics(self):
+        """
+        Test that the statistics computed while stepping give the exact maxima and averages
+        agreeing with a full pass, and that they are recomputed when the populations are replaced.
+        """
+        landscape = Landscape(MAP_FILE)
+        landscape.landscape[3, 4:7] = 0
+        landscape.neighbours = landscape.calculate_neighbours()
+        for engine in ("inplace", "threaded", "active"):
+            mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape)
+            fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape)
+            with Simulation(mice, fox, landscape, 0.5, engine=engine, workers=3, fused_statistics=True) as simulation:
+                for _ in range(3):
+                    simulation.run()
+                self.assertTrue(simulation.statistics_fresh)
+                self.assertEqual(simulation.get_mice_max, np.max(simulation.current_mice_pop))
+                self.assertEqual(simulation.get_fox_max, np.max(simulation.current_fox_pop))
+                self.assertAlmostEqual(simulation.get_mice_avg, np.sum(simulation.current_mice_pop) / landscape.land_squares, places=13)
+                self.assertAlmostEqual(simulation.get_fox_avg, np.sum(simulation.current_fox_pop) / landscape.land_squares, places=13)
+
+                simulation.restore(simulation.current_mice_pop * 2, simulation.current_fox_pop)
+                self.assertTrue(simulation.statistics_fresh)
+                self.assertEqual(simulation.get_mice_max, np.max(simulation.current_mice_pop))
+                self.assertAlmostEqual(simulation.get_mice_avg, np.sum(simulation.current_mice_pop) / landscape.land_squares, places=13)
+
+    def test_float32_engines(self):
+        """
+        Test that float32 populations on a compact landscape are stepped in float32, that
+        the engines agree exactly, and that the averages stay close to float64.
+        """
+        landscape = Landscape(MAP_FILE, compact=True)
+        landscape.landscape[3, 4:7] = 0
+        landscape.neighbours = landscape.calculate_neighbours()
+
+        def make_simulation(engine, dtype):
+            mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape, dtype=dtype)
+            fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape, dtype=dtype)
+            return Simulation(mice, fox, landscape, 0.5, engine=engine)
+
+        simulations = [make_simulation(engine, np.float32) for engine in ("loop", "vectorized", "inplace")]
+        wide = make_simulation("inplace", float)
+        self.assertEqual(simulations[2].kernels[0].scratch[0].dtype, np.float32)
+        for _ in range(10):
+            for simulation in simulations + [wide]:
+                simulation.run()
+        for simulation in simulations:
+            self.assertEqual(simulation.current_mice_pop.dtype, np.float32)
+            np.testing.assert_array_equal(simulation.current_fox_pop, simulations[0].current_fox_pop)
+        self.assertAlmostEqual(simulations[2].get_mice_avg, wide.get_mice_avg, delta=1e-5 * wide.get_mice_avg)
+
+    def test_inplace_engine_does_not_allocate(self):
+        """
+        Test that the 'inplace' engine steps without allocating temporary arrays. The
+        traced memory must stay flat and its peak must stay far below the size of one
+        population grid.
+        """
+        landscape = flexmock(Landscape(MAP_FILE))
+        landscape.landscape = np.ones((302, 302), int)
+        landscape.landscape[0, :] = landscape.landscape[-1, :] = landscape.landscape[:, 0] = landscape.landscape[:, -1] = 0
+        landscape.neighbours = landscape.calculate_neighbours()
+        landscape.height = landscape.width = 300
+        mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape)
+        fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape)
+        simulation = Simulation(mice, fox, landscape, 0.5, engine="inplace")
+        simulation.run()
+        simulation.run()
+
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            for _ in range(20):
+                simulation.run()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(current - start, 1024)
+        self.assertLess(peak - start, simulation.current_mice_pop.nbytes // 100)
+
+    def test_iter_steps(self):
+        """
+        Test that iter_steps yields the states of a manually stepped simulation as read-only
+        views of the current buffers, or as copies on request.
+        """
+        landscape = Landscape(MAP_FILE)
+
+        def make_simulation(engine="inplace", **kwargs):
+            mice = Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=landscape)
+            fox = Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=landscape)
+            return Simulation(mice, fox, landscape, 0.5, engine=engine, **kwargs)
+
+        reference = make_simulation()
+        simulation = make_simulation()
+        records = []
+        for record in simulation.iter_steps(25, every=10, start=100):
+            self.assertTrue(np.shares_memory(record.mice, simulation.current_mice_pop))
+            self.assertFalse(record.mice.flags.writeable)
+            with self.assertRaises(ValueError):
+                record.fox[0, 0] = 1
+            while reference.steps_taken < record.timestep - 100:
+                reference.run()
+            np.testing.assert_array_equal(record.mice, reference.current_mice_pop[1:-1, 1:-1])
+            np.testing.assert_array_equal(record.fox, reference.current_fox_pop[1:-1, 1:-1])
+            self.assertEqual((record.mice_avg, record.fox_max), (reference.get_mice_avg, reference.get_fox_max))
+            self.assertEqual(record.time, record.timestep * 0.5)
+            records.append(record.timestep)
+        self.assertEqual(records, [100, 110, 120, 125])
+
+        copies = list(make_simulation().iter_steps(4, every=2, copy=True))
+        self.assertEqual([record.timestep for record in copies], [0, 2, 4])
+        self.assertTrue(copies[2].mice.flags.writeable)
+        np.testing.assert_array_equal(copies[1].mice, list(make_simulation().iter_steps(2, copy=True))[2].mice)
+        self.assertFalse(np.array_equal(copies[0].mice, copies[2].mice))
+
+        # An adaptive integrator advances exactly to every record
+        adaptive = make_simulation("vectorized", integrator="rk4", tolerance=1e-6)
+        last = list(adaptive.iter_steps(20, every=10))[-1]
+        expected = make_simulation("vectorized", integrator="rk4", tolerance=1e-6)
+        expected.advance(5.0)
+        expected.advance(5.0)
+        self.assertEqual(last.time, 10.0)
+        np.testing.assert_array_equal(last.mice, expected.current_mice_pop[1:-1, 1:-1])
+        with self.assertRaises(ValueError):
+            next(simulation.iter_steps(10, every=0))
+
     def test_run(self):
         """
         Test the 'run' method of Simulation class. It checks if the method properly 
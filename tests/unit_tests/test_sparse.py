@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from predator_prey.Animal import Mice, Fox
+from predator_prey.Landscape import Landscape
+from predator_prey.Simulation import Simulation
+from predator_prey.Sparse import LandGraph, SparseSimulation
+from tests import MAP_FILE
+
+class TestSparseSimulation(unittest.TestCase):
+    """
+    Unit test class for testing the LandGraph and SparseSimulation classes.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Loads the landscape and turns most of it into water.
+        """
+        self.landscape = Landscape(MAP_FILE)
+        self.landscape.landscape[1:-1, 1:-1] = np.random.default_rng(3).random((20, 10)) < 0.3
+        self.landscape.landscape[2, 2:5] = 1
+        self.landscape.neighbours = self.landscape.calculate_neighbours()
+
+    def make_animals(self):
+        """
+        Creates fresh Mice and Fox instances.
+        """
+        return (Mice(seed=1, diffusion_rate=0.2, birth_rate=0.1, death_rate=0.05, landscape=self.landscape),
+                Fox(seed=2, diffusion_rate=0.2, birth_rate=0.03, death_rate=0.09, landscape=self.landscape))
+
+    def test_land_graph(self):
+        """
+        Test that the CSR index lists the land neighbours of each land square and that the
+        neighbour counts agree with Landscape.neighbours.
+        """
+        graph = LandGraph(self.landscape)
+        self.assertEqual(graph.size, self.landscape.land_squares)
+        counts = np.diff(graph.indptr)
+        np.testing.assert_array_equal(counts, graph.neighbours[:-1])
+
+        # The square at (2, 3) has land to its left and right
+        square = np.searchsorted(graph.positions, 2 * 12 + 3)
+        neighbours = graph.positions[graph.indices[graph.indptr[square]:graph.indptr[square + 1]]]
+        self.assertIn(2 * 12 + 2, neighbours)
+        self.assertIn(2 * 12 + 4, neighbours)
+
+    def test_gather_scatter(self):
+        """
+        Test that scattering a gathered grid restores the land squares and leaves water at zero.
+        """
+        graph = LandGraph(self.landscape)
+        grid = np.random.default_rng(0).random(self.landscape.landscape.shape) * self.landscape.landscape
+        values = graph.gather(grid)
+        self.assertEqual(values.shape, (graph.size + 1,))
+        self.assertEqual(values[-1], 0)
+        np.testing.assert_array_equal(graph.scatter(values), grid)
+
+    def test_run_matches_loop(self):
+        """
+        Test that the populations are identical to the 'loop' engine and the statistics agree.
+        """
+        dense = Simulation(*self.make_animals(), self.landscape, 0.5)
+        sparse = SparseSimulation(*self.make_animals(), self.landscape, 0.5)
+        for _ in range(7):
+            dense.run()
+            sparse.run()
+        np.testing.assert_array_equal(sparse.current_mice_pop, dense.current_mice_pop)
+        np.testing.assert_array_equal(sparse.current_fox_pop, dense.current_fox_pop)
+        self.assertEqual(sparse.get_mice_max, dense.get_mice_max)
+        self.assertAlmostEqual(sparse.get_fox_avg, dense.get_fox_avg, places=12)
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())
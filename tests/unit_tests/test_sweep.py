@@ -0,0 +1,101 @@
+import unittest
+import os
+import shutil
+import tempfile
+from predator_prey.sweep_predator_prey import parse_values, build_grid, sweep, SWEEP_PARAMETERS
+from tests import MAP_FILE
+
+class TestSweep(unittest.TestCase):
+    """
+    Unit test class for testing the parameter sweep runner.
+    """
+
+    def setUp(self):
+        """
+        Set up method for unit tests. Creates a temporary output directory.
+        """
+        self.outroot = tempfile.mkdtemp()
+        self.values = {name: [0.1] for name in SWEEP_PARAMETERS}
+        self.values.update({"dt": [0.5], "mseed": [1, 2], "fseed": [1], "r": [0.05, 0.1]})
+
+    def tearDown(self):
+        """
+        Clean up the temporary output directory.
+        """
+        shutil.rmtree(self.outroot)
+
+    def test_parse_values(self):
+        """
+        Test that 'parse_values' accepts lists and inclusive 'start:stop:num' ranges, and
+        rejects malformed items.
+        """
+        self.assertEqual(parse_values("0.1,0.2"), [0.1, 0.2])
+        self.assertEqual(parse_values("0:1:3"), [0.0, 0.5, 1.0])
+        self.assertEqual(parse_values("1:4:4,9", int), [1, 2, 3, 4, 9])
+        with self.assertRaises(ValueError):
+            parse_values("0:1")
+
+    def test_build_grid(self):
+        """
+        Test that 'build_grid' returns every combination of the parameter values.
+        """
+        grid = build_grid(self.values)
+        self.assertEqual(len(grid), 4)
+        self.assertEqual({(p["r"], p["mseed"]) for p in grid}, {(0.05, 1), (0.05, 2), (0.1, 1), (0.1, 2)})
+
+    def test_sweep(self):
+        """
+        Test that 'sweep' runs every combination in its own directory and writes the
+        consolidated results table.
+        """
+        rows = sweep(self.values, 2, 4, MAP_FILE, outroot=self.outroot, workers=2)
+        self.assertEqual([row["run"] for row in rows], [0, 1, 2, 3])
+        for row in rows:
+            self.assertTrue(os.path.isfile(os.path.join(row["directory"], "averages.csv")))
+            self.assertTrue(os.path.isfile(os.path.join(row["directory"], "map_0006.ppm")))
+            self.assertEqual(row["timestep"], 6)
+            self.assertEqual(row["status"], "ok")
+
+        with open(os.path.join(self.outroot, "sweep_results.csv")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith("run,r,a,k,b,m,l,dt,mseed,fseed,"))
+
+    def test_failed_run(self):
+        """
+        Test that a failing combination is recorded with its error, without losing the
+        results of the other runs.
+        """
+        self.values.update({"mseed": [1], "r": [0.1, 1.5]})
+        rows = sweep(self.values, 2, 4, MAP_FILE, outroot=self.outroot, workers=2)
+        self.assertEqual([row["status"] for row in rows], ["ok", "failed"])
+        self.assertEqual(rows[0]["timestep"], 6)
+        self.assertEqual(rows[1]["error"], "ValueError: Rate must be between 0 and 1.")
+        with open(os.path.join(rows[1]["directory"], "log.txt")) as f:
+            self.assertIn("Traceback", f.read())
+
+        with open(os.path.join(self.outroot, "sweep_results.csv")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn(",ok,,", lines[1])
+        self.assertIn(",failed,ValueError: Rate must be between 0 and 1.,", lines[2])
+
+
+class CustomTestRunner(unittest.TextTestRunner):
+    """
+    Custom Test Runner class that overrides the 'run' method of TextTestRunner to print a success message
+    when all tests pass.
+    """
+
+    def run(self, test):
+        """
+        Run the given test case or test suite.
+        """
+        result = super().run(test)
+        if result.wasSuccessful():
+            print("All tests ran successfully.")
+        return result
+
+if __name__ == "__main__":
+    # Run unit tests with the custom test runner
+    unittest.main(testRunner=CustomTestRunner())